@@ -1,798 +1,3456 @@
-"""
-    gameEngine.py 
-    high-level tools to simplify pygame programming
-    for Game Programming - The L-Line
-    by Andy Harris, 2006
-"""
-
-import pygame, math
-pygame.init()
-
-class BasicSprite(pygame.sprite.Sprite):
-    """ use this sprite when you want to 
-        direcectly control the sprite with dx and dy
-        or want to extend in another direcection than DirSprite
-    """
-    def __init__(self, scene):
-        pygame.sprite.Sprite.__init__(self)
-        self.screen = scene.screen
-        self.image = pygame.Surface((25, 25))
-        self.image.fill((255, 0, 0))
-        self.rect = self.image.get_rect()
-        self.x = 100
-        self.y = 100
-        self.dx = 0
-        self.dy = 0
-
-    def update(self):
-        self.x += self.dx
-        self.y += self.dy
-        self.checkBounds()
-        self.rect.left = self.x 
-        self.rect.bottom = self.y
-        
-    def __checkBounds(self):
-        scrWidth = self.screen.get_width()
-        scrHeight = self.screen.get_height()
-        
-        if self.x + self.rect.width > scrWidth:
-            self.x = 0
-        if self.x < 0:
-            self.x = scrWidth
-        if self.y > scrHeight:
-            self.y = 0
-        if self.y - self.rect.height < 0:
-            self.y = scrHeight
-
-class SuperSprite(pygame.sprite.Sprite):
-    """ An enhanced Sprite class
-        expects a gameEngine.Scene class as its one parameter
-        Use methods to change image, direction, speed
-        Will automatically travel in direction and speed indicated
-        Automatically rotates to point in indicated direction
-        Five kinds of boundary collision
-    """
-
-    def __init__(self, scene):
-        pygame.sprite.Sprite.__init__(self)
-        self.scene = scene
-        self.screen = scene.screen
-        
-        #create constants
-        self.WRAP = 0
-        self.BOUNCE = 1
-        self.STOP = 2
-        self.HIDE = 3
-        self.CONTINUE = 4
-        
-        #create a default text image as a placeholder
-        #This will usually be changed by a setImage call
-        self.font = pygame.font.Font("freesansbold.ttf", 30)
-        self.imageMaster = self.font.render(">sprite>", True, (0, 0,0), (0xFF, 0xFF, 0xFF))
-        self.image = self.imageMaster
-        self.rect = self.image.get_rect()
-        
-        #create properties
-        #most will be changed through method calls
-        self.x = 200
-        self.y = 200
-        self.dx = 0
-        self.dy = 0
-        self.direc = 0
-        self.rotation = 0
-        self.speed = 0
-        self.maxSpeed = 10
-        self.minSpeed = -3
-        self.boundAction = self.WRAP
-        self.pressed = False
-        self.oldCenter = (100, 100)
-    
-    def update(self):
-        self.oldCenter = self.rect.center
-        self.checkEvents()
-        self.rotate()
-        self.calcVector()
-        self.calcPosition()
-        self.checkBounds()
-        self.rect.left = self.x 
-        self.rect.bottom = self.y
-    
-    def checkEvents(self):
-        """ overwrite this method to add your own event code """
-        pass
-
-    def rotate(self):
-        """ PRIVATE METHOD
-            change visual orientation based on 
-            rotation property.
-            automatically called in update.
-            change rotation property directly or with 
-            rotateBy(), setAngle() methods
-        """
-        oldCenter = self.rect.center
-        self.oldCenter = oldCenter
-        self.image = pygame.transform.rotate(self.imageMaster, self.rotation)
-        self.rect = self.image.get_rect()
-        self.rect.center = oldCenter
-    
-    def calcVector(self):
-        """ calculates dx and dy based on speed, direc
-            automatically called in update() 
-        """
-        theta = self.direc / 180.0 * math.pi
-        self.dx = math.cos(theta) * self.speed
-        self.dy = math.sin(theta) * self.speed
-        self.dy *= -1
-    
-    def calcPosition(self):
-        """ calculates the sprites position adding
-            dx and dy to x and y.
-            automatically called in update()
-        """
-        self.x += self.dx
-        self.y += self.dy
-
-    def checkBounds(self):
-        """ checks boundary and acts based on 
-            self.BoundAction.
-            WRAP: wrap around screen (default)
-            BOUNCE: bounce off screen
-            STOP: stop at edge of screen
-            HIDE: move off stage and wait
-            CONTINUE: keep going at present course and speed
-            
-            automatically called by update()
-        """
-        
-        scrWidth = self.screen.get_width()
-        scrHeight = self.screen.get_height()
-        
-        #create variables to simplify checking
-        offRight = offLeft = offTop = offBottom = offScreen = False
-        
-        if (self.x + self.rect.width) > scrWidth:
-            offRight = True
-        if self.x < 0:
-            offLeft = True
-        if self.y > scrHeight:
-            offBottom = True
-        if (self.y - self.rect.height) < 0:
-            offTop = True
-            
-        if offRight or offLeft or offTop or offBottom:
-            offScreen = True
-        
-        if self.boundAction == self.WRAP:
-            if offRight:
-                self.x = 0
-            if offLeft:
-                self.x = scrWidth
-            if offBottom:
-                self.y = 0
-            if offTop:
-                self.y = scrHeight
-        
-        elif self.boundAction == self.BOUNCE:
-            if offLeft or offRight:
-                self.dx *= -1
-            if offTop or offBottom:
-                self.dy *= -1
-                
-            self.updateVector()
-            self.rotation = self.direc
-        
-        elif self.boundAction == self.STOP:
-            if offScreen:
-                self.speed = 0
-        
-        elif self.boundAction == self.HIDE:
-            if offScreen:
-                self.speed = 0
-                self.setPosition((-1000, -1000))
-        
-        elif self.boundAction == self.CONTINUE:
-            pass
-            
-        else:
-            # assume it's CONTINUE - keep going forever
-            pass    
-    
-    def setSpeed(self, speed):
-        """ immediately sets the objects speed to the 
-            given value.
-        """
-        self.speed = speed
-
-    def speedUp(self, amount):
-        """ changes speed by the given amount
-            Use a negative value to slow down
-        """
-        self.speed += amount
-        if self.speed < self.minSpeed:
-            self.speed = self.minSpeed
-        if self.speed > self.maxSpeed:
-            self.speed = self.maxSpeed
-    
-    def setAngle(self, direc):
-        """ sets both the direcection of motion 
-            and visual rotation to the given angle
-            If you want to set one or the other, 
-            set them direcectly. Angle measured in degrees
-        """            
-        self.direc = direc
-        self.rotation = direc
-    
-    def turnBy (self, amt):
-        """ turn by given number of degrees. Changes
-            both motion and visual rotation. Positive is
-            counter-clockwise, negative is clockwise 
-        """
-        self.direc += amt
-        if self.direc > 360:
-            self.direc = amt
-        if self.direc < 0:
-            self.direc = 360 - amt
-        self.rotation = self.direc
-    
-    def rotateBy(self, amt):
-        """ change visual orientation by given
-            number of degrees. Does not change direcection
-            of travel. 
-        """
-        self.rotation += amt
-        if self.rotation > 360:
-            self.rotation = amt
-        if self.rotation < 0:
-            self.rotation = 360 - amt
-    
-    def setImage (self, image):
-        """ loads the given file name as the master image
-            default setting should be facing east.  Image
-            will be rotated automatically """
-        self.imageMaster = pygame.image.load(image)
-        self.imageMaster = self.imageMaster.convert()
-    
-    def setDX(self, dx):
-        """ changes dx value and updates vector """
-        self.dx = dx
-        self.updateVector()
-    
-    def addDX(self, amt):
-        """ adds amt to dx, updates vector """
-        self.dx += amt
-        self.updateVector()
-        
-    def setDY(self, dy):
-        """ changes dy value and updates vector """
-        self.dy = dy
-        self.updateVector()
-
-    def addDY(self, amt):
-        """ adds amt to dy and updates vector """
-        self.dy += amt
-        self.updateVector()
-    
-    def setComponents(self, components):
-        """ expects (dx, dy) for components
-            change speed and angle according to dx, dy values """
-            
-        (self.dx, self.dy) = components
-        self.updateVector()
-        
-    def setBoundAction (self, action):
-        """ sets action for boundary.  Values are
-            self.WRAP (wrap around edge - default)
-            self.BOUNCE (bounce off screen changing direction)
-            self.STOP (stop at edge of screen)
-            self.HIDE (move off-stage and stop)
-            self.CONTINUE (move on forever)
-            Any other value allows the sprite to move on forever
-        """
-        self.boundAction = action
-
-    def setPosition (self, position):
-        """ place the sprite direcectly at the given position
-            expects an (x, y) tuple
-        """
-        (self.x, self.y) = position
-        
-    def moveBy (self, vector):
-        """ move the sprite by the (dx, dy) values in vector
-            automatically calls checkBounds. Doesn't change 
-            speed or angle settings.
-        """
-        (dx, dy) = vector
-        self.x += dx
-        self.y += dy
-        print(dy)
-        print(dx)
-        self.__checkBounds()
-
-    def forward(self, amt):
-        """ move amt pixels in the current direcection
-            of travel
-        """
-        
-        #calculate dx dy based on current direcection
-        radians = self.direc * math.pi / 180
-        dx = amt * math.cos(radians)
-        dy = amt * math.sin(radians) * -1
-        
-        self.x += dx
-        self.y += dy
-        
-    def addForce(self, amt, angle):
-        """ apply amt of thrust in angle.
-            change speed and direc accordingly
-            add a force straight down to simulate gravity
-            in rotation direcection to simulate spacecraft thrust
-            in direc direcection to accelerate forward
-            at an angle for retro-rockets, etc.
-        """
-
-        #calculate dx dy based on angle
-        radians = angle * math.pi / 180
-        dx = amt * math.cos(radians)
-        dy = amt * math.sin(radians) * -1
-        
-        self.dx += dx
-        self.dy += dy
-        self.updateVector()
-        
-    def updateVector(self):
-        #calculate new speed and angle based on dx, dy
-        #call this any time you change dx or dy
-        
-        self.speed = math.sqrt((self.dx * self.dx) + (self.dy * self.dy))
-        
-        dy = self.dy * -1
-        dx = self.dx
-        
-        radians = math.atan2(dy, dx)
-        self.direc = radians / math.pi * 180
-
-    def setSpeedLimits(self, maxSpeed, minSpeed):
-        """ determines maximum and minimum
-            speeds you will allow through
-            speedUp() method.  You can still
-            direcectly set any speed you want
-            with setSpeed() Default values:
-                max: 10
-                min: -3
-        """
-        self.maxSpeed = maxSpeed
-        self.minSpeed = minSpeed
-
-    def dataTrace(self):
-        """ utility method for debugging
-            print major properties
-            extend to add your own properties
-        """
-        print("x: %d, y: %d, speed: %.2f, direc: %.f, dx: %.2f, dy: %.2f" % \
-              (self.x, self.y, self.speed, self.direc, self.dx, self.dy))
-            
-    def mouseDown(self):
-        """ boolean function. Returns True if the mouse is 
-            clicked over the sprite, False otherwise
-        """
-        self.pressed = False
-        if pygame.mouse.get_pressed() == (1, 0, 0):
-            if self.rect.collidepoint(pygame.mouse.get_pos()):
-                self.pressed = True
-        return self.pressed
-    
-    def clicked(self):
-        """ Boolean function. Returns True only if mouse
-            is pressed and released over sprite
-            
-        """
-        released = False
-        if self.pressed:
-            if pygame.mouse.get_pressed() == (0, 0, 0):
-                if self.rect.collidepoint(pygame.mouse.get_pos()):
-                    released = True
-            return released
-        
-    def collidesWith(self, target):
-        """ boolean function. Returns True if the sprite
-            is currently colliding with the target sprite,
-            False otherwise
-        """
-        collision = False
-        if self.rect.colliderect(target.rect):
-            collision = True
-        return collision
-    
-    def collidesGroup(self, target):
-        """ wrapper for pygame.sprite.spritecollideany() function
-            simplifies checking sprite - group collisions
-            returns result of collision check (sprite from group 
-            that was hit or None)
-        """
-        collision = pygame.sprite.spritecollideany(self, target)
-        return collision
-        
-    def distanceTo(self, point):
-        """ returns distance to any point in pixels
-            can be used in circular collision detection
-        """
-        (pointx, pointy) = point
-        dx = self.x - pointx
-        dy = self.y - pointy
-        
-        dist = math.sqrt((dx * dx) + (dy * dy))
-        return dist
-    
-    def direcTo(self, point):
-        """ returns direcection (in degrees) to 
-            a point """
-        
-        (pointx, pointy) = point
-        dx = self.x - pointx
-        dy = self.y - pointy
-        dy *= -1
-        
-        radians = math.atan2(dy, dx)
-        direc = radians * 180 / math.pi
-        direc += 180
-        return direc
-    
-    def drawTrace(self, color=(0x00, 0x00, 0x00)):
-        """ traces a line between previous position
-            and current position of object 
-        """
-        pygame.draw.line(self.scene.background, color, self.oldCenter,
-                         self.rect.center, 3)
-        self.screen.blit(self.scene.background, (0, 0))
-    
-class Scene(object):
-    """ encapsulates the IDEA / ALTER framework
-        properties:
-        sprites - a list of sprite objects
-            that forms the primary sprite group
-        background - the background surface
-        screen - the display screen
-        
-        it's generally best to add all sprites 
-        as attributes, so they can have access
-        to each other if needed   
-        
-        --- custom game scence --- 
-    """
-    
-    def __init__(self):
-        """ initialize the game engine
-            set up a sample sprite for testing
-        """
-        pygame.init()
-        
-        self.size = (640, 480)
-        
-        self.screen = pygame.display.set_mode(self.size)
-        
-        
-        self.screen
-        self.background = pygame.Surface(self.screen.get_size())
-        self.background.fill((0, 0, 0))
-        
-        self.sampleSprite = SuperSprite(self)
-        self.sampleSprite.setSpeed(3)
-        self.sampleSprite.setAngle(0)
-        self.sampleSprite.boundAction = self.sampleSprite.WRAP
-        self.sprites = [self.sampleSprite]
-        self.groups = []
-    
-        self.exitProgram = False
-    
-    def start(self):
-        """ sets up the sprite groups
-            begins the main loop
-        """
-        self.mainSprites = pygame.sprite.OrderedUpdates(self.sprites)
-        self.groups.append(self.mainSprites)
-        
-        self.screen.blit(self.background, (0, 0))
-        self.clock = pygame.time.Clock()
-        self.keepGoing = True
-        while self.keepGoing:
-            self.__mainLoop()
-
-    def stop(self):
-        """stops the loop"""
-        self.keepGoing = False
-    
-    def __mainLoop(self):
-        """ manage all the main events 
-            automatically called by start
-        """
-        self.clock.tick(30)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.keepGoing = False
-                self.exitProgram = True
-            self.doEvents(event)
-        
-        self.update()
-        for group in self.groups:
-            group.clear(self.screen, self.background)
-            group.update()
-            group.draw(self.screen)
-        
-        pygame.display.flip()
-
-    def makeSpriteGroup(self, sprites):
-        """ create a group called groupName
-            containing all the sprites in the sprites 
-            list.  This group will be added after the 
-            sprites group, and will automatically
-            clear, update, and draw
-        """
-        tempGroup = pygame.sprite.OrderedUpdates(sprites)
-        return tempGroup
-    
-    def addGroup(self, group):
-        """ adds a sprite group to the groups list for
-            automatic processing 
-        """
-        self.groups.append(group)
-        
-    def setGroup(self, group):
-        
-        self.groups = [group]
-
-    def doEvents(self, event):
-        """ overwrite this method to add your own events.
-            Works like normal event handling, passes event
-            object
-        """
-        pass
-        
-    def update(self):
-        """ happens once per frame, after event parsing.
-            Overwrite to add your own code, esp event handling
-            that doesn't require event obj. (pygame.key.get_pressed, 
-            pygame.mouse.get_pos, etc)
-            Also a great place for collision detection
-        """
-        
-            
-    def setCaption(self, title):
-        """ set's the scene's title text """
-        pygame.display.set_caption(title)
-
-class Label(pygame.sprite.Sprite):
-    """ a basic label 
-        properties: 
-            font: font to use
-            text: text to display
-            fgColor: foreground color
-            bgColor: background color
-            center: position of label's center
-            size: (width, height) of label
-            fontSize: size of font
-            
-        Modifications: 
-            - fontSize, changeFont, fgColor, bgColor
-            - centered font in y position
-            
-    """
-    
-    def __init__(self, fgColor=((0x00, 0x00, 0x00)), 
-                 bgColor=((0xFF, 0xFF, 0xFF)), fontName="freesansbold.ttf"):
-        
-        pygame.sprite.Sprite.__init__(self)
-        self.text = ""
-        self.fgColor = fgColor
-        self.bgColor = bgColor
-        self.center = (100, 100)
-        
-        self.fontSize = 20
-        self.size = (150, 30)
-        
-        self.font = pygame.font.Font(fontName, self.fontSize)      
-        
-    def changeFont(self, fontSize=20, fontName="freesansbold.ttf"):
-        ''' changes the font to suit a different purpose '''
-        self.fontSize = fontSize
-        self.font = pygame.font.Font(fontName, fontSize)
-
-    def update(self):
-        self.image = pygame.Surface(self.size)
-        self.image.fill(self.bgColor)
-        fontSurface = self.font.render(self.text, True, self.fgColor, self.bgColor)
-        
-        # center the text inside the image
-        xPos = (self.image.get_width() - fontSurface.get_width()) / 2
-        yPos = (self.image.get_height() - fontSurface.get_height()) / 2
-        
-        self.image.blit(fontSurface, (xPos, yPos))
-        self.rect = self.image.get_rect()
-        self.rect.center = self.center
-
-class Button(Label):
-    """ a button based on the label 
-        same properties as label +
-        active: True if user is clicking on sprite
-                False if user is not currently clicking
-        clicked: True when user releases mouse over a 
-                 currently active button
-                 
-        Modifications:
-            - update method changed to emulate traditional button and scroller behavior
-    """
-
-    def __init__(self, scroller=False, fgColor=(0, 0, 0), bgColor=(0xCC, 0xCC, 0xCC)):
-        Label.__init__(self, fgColor, bgColor)
-        self.active = False
-        self.clicked = False
-        self.mouseDown = False
-        self.allowActive = True
-        
-        self.scroller = scroller
-        self.fgColor = fgColor
-        self.bgColor = bgColor
-        self.BUTTON_BG = bgColor  # reverts to this when pressed on
-    
-    def update(self):
-        ''' extensive modifications '''
-        
-        ''' make this area more organized:
-            have booleans hover, and the such to make this less ad hoc and nicer beginning
-        '''
-        
-        Label.update(self)
-        
-        self.clicked = False
-        
-        # hover look when over a button
-        if pygame.mouse.get_pressed() == (0, 0, 0) and self.scroller == False:
-            if self.rect.collidepoint(pygame.mouse.get_pos()):
-                self.bgColor = (105, 105, 105)
-            else:
-                self.bgColor = self.BUTTON_BG  # revert back
-        # simple boolean for code simplification
-        elif pygame.mouse.get_pressed() == (1, 0, 0):
-            self.mouseDown = True
-        
-        if self.mouseDown and self.allowActive:
-            # set active if the mouse is over the button, down,
-            # and with active detection allowed
-            if self.rect.collidepoint(pygame.mouse.get_pos()):
-                self.active = True
-                
-                # this occurs only for regular buttons; gives 'pressed' appearance
-                if self.scroller == False:
-                    self.bgColor = (50, 50, 50)
-                
-            self.allowActive = False  # no longer allowed to set active (regardless of whether hit or not)
-        
-        # only for the scroller to make it more usual:
-        # stops active the moment the mouse is no longer on the scroller (unlike regular butons)
-        if self.mouseDown and self.scroller:
-            if self.rect.collidepoint(pygame.mouse.get_pos()) == False:
-                self.active = False
-            
-        # once released will allow the user to set the button active again    
-        if pygame.mouse.get_pressed() == (0, 0, 0):
-            
-            self.allowActive = True
-            self.mouseDown = False
-
-            # special execution when mouse release and the button is active
-            if self.active == True:
-                self.active = False
-                self.bgColor = self.BUTTON_BG  # revert background
-                
-                if self.rect.collidepoint(pygame.mouse.get_pos()):
-                    self.clicked = True  # execute
-
-class Scroller(Button):
-    """ like a button, but has a numeric value that 
-        can be decremented by clicking on left half
-        and incremented by clicking on right half.
-        new atributes:
-            value: the scroller's numeric value
-            minValue: minimum value
-            maxValue: maximum value
-            increment: How much is added or subtracted
-            format: format of string interpolation
-            
-            Modifications:
-                - allowed constructor to set min, max, and inc values
-                - gives more of a delay for the values such that the user has
-                  finer control
-    """
-    
-    def __init__(self, iMin=0, iMax=10, iInc=1, fgColor=(0, 0, 0), bgColor=(0xCC, 0xCC, 0xCC)):
-        Button.__init__(self, True, fgColor, bgColor)
-        self.minValue = iMin
-        self.maxValue = iMax
-        self.increment = iInc
-        self.value = 5
-        self.format = "<<  %.2f  >>"
-        
-        self.pause = 0
-        self.delay = 3
-        
-    def update(self):
-        
-        Button.update(self)
-        
-        self.pause += 1
-        
-        if self.pause == self.delay:
-            self.pause = 0
-        
-            if self.active:
-                mousePos = pygame.mouse.get_pos()
-                
-                if mousePos[0] < self.rect.centerx:
-                    self.value -= self.increment
-                    if self.value < self.minValue:
-                        self.value = self.minValue
-                else:
-                    self.value += self.increment
-                    if self.value > self.maxValue:
-                        self.value = self.maxValue
-
-        self.text = self.format % self.value
-
-class MultiLabel(pygame.sprite.Sprite):
-    """ accepts a list of strings, creates a multi-line
-        label to display text 
-        same properties as label except textLines
-        is a list of strings. There is no text
-        property.
-        Set the size manually. Vertical size should be at 
-        least 30 pixels per line (with the default font)
-        
-        Modifications: 
-            - the vertical length of each line
-            - changeFont
-            - BUTTON_FG, BUTTON_BG
-    """
-    
-    def __init__(self, BUTTON_FG=((0x00, 0x00, 0x00)), BUTTON_BG=((0xFF, 0xFF, 0xFF))):
-        pygame.sprite.Sprite.__init__(self)
-        self.textLines = ["This", "is", "sample", "text"]
-        self.font = pygame.font.Font("freesansbold.ttf", 20)
-        self.fgColor = BUTTON_FG
-        self.bgColor = BUTTON_BG
-        self.center = (100, 100)
-        self.size = (400, 300)
-        
-    def changeFont(self, fontSize=20, fontName="freesansbold.ttf"):
-        ''' changes the font to suit a different purpose '''
-        self.fontSize = fontSize
-        self.font = pygame.font.Font(fontName, fontSize)        
-        
-    def update(self):
-        self.image = pygame.Surface(self.size)
-        self.image.fill(self.bgColor)
-        numLines = len(self.textLines)
-        vSize = 35
-        
-        for lineNum in range(numLines):
-            currentLine = self.textLines[lineNum]
-            fontSurface = self.font.render(currentLine, True, self.fgColor, self.bgColor)
-            # center the text
-            xPos = (self.image.get_width() - fontSurface.get_width())/2
-            yPos = (lineNum * vSize) + 5
-            self.image.blit(fontSurface, (xPos, yPos))
-        
-        self.rect = self.image.get_rect()
-        self.rect.center = self.center
-
-if __name__ == "__main__":
-    # change this code to test various features of the engine
-    # This code will not run when gameEngine is run as a module
-    # (as it usually will be)
-        
-    game = Scene()
-    thing = SuperSprite(game)
-    thing.setSpeed(5)
-    thing.setBoundAction(thing.BOUNCE)
-    thing.setAngle(230)
-    game.sprites = [thing]
-    
-    game.start()
+"""
+    gameEngine.py 
+    high-level tools to simplify pygame programming
+    for Game Programming - The L-Line
+    by Andy Harris, 2006
+"""
+
+import pygame, math, logging, time, collections, asyncio, gc
+import os, sys, queue, struct, threading, json, tracemalloc, inspect, itertools, concurrent.futures
+pygame.init()
+
+try:
+    import numpy
+    import numpy.random  # up front, not in the first ParticleSystem
+except ImportError:
+    numpy = None  # optional; ParticleSystem does nothing without it
+
+log = logging.getLogger("gameEngine")
+
+# events after which an idle scene draws even though no sprite changed
+REPAINT_EVENTS = tuple(getattr(pygame, name) for name in 
+                       ("VIDEOEXPOSE", "VIDEORESIZE", "WINDOWEXPOSED", "WINDOWSHOWN",
+                        "WINDOWRESTORED", "WINDOWSIZECHANGED")
+                       if hasattr(pygame, name))
+
+# where the framebuffer is drawn inside the window: (rect, framebuffer size)
+# None when the two line up (or the display scales it for us)
+view = None
+
+def getMousePos():
+    """ mouse position in framebuffer coordinates
+        use in place of pygame.mouse.get_pos() so clicks
+        still land when the framebuffer is scaled
+    """
+    (x, y) = pygame.mouse.get_pos()
+    if view is not None:
+        (rect, size) = view
+        x = (x - rect.left) * size[0] // rect.width
+        y = (y - rect.top) * size[1] // rect.height
+    return (x, y)
+
+class AssetLoader(object):
+    """ loads asset files ahead of time on a small thread pool
+        fetch() starts a load and returns its Future right away;
+        get() waits for it (loading right then if nobody fetched
+        it first). Each name is loaded once and kept until
+        discard(). Surfaces come back unconverted: convert them
+        once the display is set, on the main thread or in a load
+        function fetched after the display is.
+        properties:
+            loaders: file extension -> function(path) that loads it
+    """
+    
+    def __init__(self, workers=2):
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.loaders = {".png": pygame.image.load, ".gif": pygame.image.load, 
+                        ".jpg": pygame.image.load, ".bmp": pygame.image.load,
+                        ".ogg": pygame.mixer.Sound, ".wav": pygame.mixer.Sound}
+        
+    def fetch(self, name, load=None):
+        """ starts loading name (a path) in the background, with
+            load or the loader for its extension; returns a Future
+        """
+        with self.lock:
+            future = self.futures.get(name)
+            if future is None:
+                if load is None:
+                    load = self.loaders[os.path.splitext(name)[1].lower()]
+                future = self.futures[name] = self.executor.submit(load, name)
+        return future
+    
+    def get(self, name, load=None):
+        """ the loaded asset; waits for it if it is still loading """
+        return self.fetch(name, load).result()
+    
+    def ready(self, name):
+        """ True once name is loaded (or failed to) """
+        future = self.futures.get(name)
+        return future is not None and future.done()
+    
+    def discard(self, name):
+        """ forgets name, e.g. once it is converted and kept elsewhere """
+        with self.lock:
+            self.futures.pop(name, None)
+
+# shared by every scene
+assets = AssetLoader()
+
+class BasicSprite(pygame.sprite.Sprite):
+    """ use this sprite when you want to 
+        direcectly control the sprite with dx and dy
+        or want to extend in another direcection than DirSprite
+    """
+    def __init__(self, scene):
+        pygame.sprite.Sprite.__init__(self)
+        self.screen = scene.screen
+        self.image = pygame.Surface((25, 25))
+        self.image.fill((255, 0, 0))
+        self.rect = self.image.get_rect()
+        self.x = 100
+        self.y = 100
+        self.dx = 0
+        self.dy = 0
+
+    def update(self):
+        self.x += self.dx
+        self.y += self.dy
+        self.checkBounds()
+        self.rect.left = self.x 
+        self.rect.bottom = self.y
+        
+    def __checkBounds(self):
+        scrWidth = self.screen.get_width()
+        scrHeight = self.screen.get_height()
+        
+        if self.x + self.rect.width > scrWidth:
+            self.x = 0
+        if self.x < 0:
+            self.x = scrWidth
+        if self.y > scrHeight:
+            self.y = 0
+        if self.y - self.rect.height < 0:
+            self.y = scrHeight
+
+class SuperSprite(pygame.sprite.Sprite):
+    """ An enhanced Sprite class
+        expects a gameEngine.Scene class as its one parameter
+        Use methods to change image, direction, speed
+        Will automatically travel in direction and speed indicated
+        Automatically rotates to point in indicated direction
+        Five kinds of boundary collision
+        Two kinds of motion, set with setMotion:
+            POLAR: speed and direc drive dx and dy (default)
+            VECTOR: dx and dy are the truth; speed and direc 
+                are worked out only when read, and cached
+    """
+    
+    font = None
+    placeholder = None  # default image until setImage; see __init__
+
+    def __init__(self, scene):
+        pygame.sprite.Sprite.__init__(self)
+        self.scene = scene
+        self.screen = scene.screen
+        
+        #create constants
+        self.WRAP = 0
+        self.BOUNCE = 1
+        self.STOP = 2
+        self.HIDE = 3
+        self.CONTINUE = 4
+        
+        self.POLAR = 0
+        self.VECTOR = 1
+        
+        #create a default text image as a placeholder
+        #This will usually be changed by a setImage call
+        #made once and shared; sprites are often made many per frame
+        if SuperSprite.placeholder is None:
+            SuperSprite.font = pygame.font.Font("freesansbold.ttf", 30)
+            SuperSprite.placeholder = self.font.render(">sprite>", True, (0, 0,0), (0xFF, 0xFF, 0xFF))
+        self.imageMaster = self.placeholder
+        self.image = self.imageMaster
+        self.rect = self.image.get_rect()
+        
+        #create properties
+        #most will be changed through method calls
+        self.x = 200
+        self.y = 200
+        self.dx = 0
+        self.dy = 0
+        self.motion = self.POLAR
+        self.polarFor = None  # (dx, dy) the cached speed and direc belong to
+        self.direc = 0
+        self.rotation = 0
+        self.rotated = None  # (imageMaster, rotation, image) of the last rotate
+        self.speed = 0
+        self.maxSpeed = 10
+        self.minSpeed = -3
+        self.boundAction = self.WRAP
+        self.pressed = False
+        self.oldCenter = (100, 100)
+    
+    def update(self):
+        self.oldCenter = self.rect.center
+        self.checkEvents()
+        self.rotate()
+        self.calcVector()
+        self.calcPosition()
+        self.checkBounds()
+        self.rect.left = self.x 
+        self.rect.bottom = self.y
+    
+    def checkEvents(self):
+        """ overwrite this method to add your own event code """
+        pass
+
+    def rotate(self):
+        """ PRIVATE METHOD
+            change visual orientation based on 
+            rotation property.
+            automatically called in update.
+            change rotation property directly or with 
+            rotateBy(), setAngle() methods
+            only makes a new image when the master or the
+            rotation changed; unrotated, image is the master 
+            itself, so atlas frames stay atlas subsurfaces
+        """
+        oldCenter = self.rect.center
+        self.oldCenter = oldCenter
+        if self.rotated == (self.imageMaster, self.rotation, self.image):
+            return
+        
+        if self.rotation % 360 == 0:
+            self.image = self.imageMaster
+        else:
+            self.image = pygame.transform.rotate(self.imageMaster, self.rotation)
+        self.rotated = (self.imageMaster, self.rotation, self.image)
+        self.rect = self.image.get_rect()
+        self.rect.center = oldCenter
+    
+    def setMotion(self, motion):
+        """ self.POLAR (default) or self.VECTOR; see the class notes.
+            Keeps the current motion either way
+        """
+        if motion == self.VECTOR and self.motion == self.POLAR:
+            self.calcVector()
+            self.polarFor = (self.dx, self.dy)
+        self.motion = motion
+    
+    def getSpeed(self):
+        if self.motion == self.VECTOR and self.polarFor != (self.dx, self.dy):
+            self.updatePolar()
+        return self._speed
+    
+    def putSpeed(self, speed):
+        if self.motion == self.VECTOR and self.polarFor != (self.dx, self.dy):
+            self.updatePolar()  # keep the direction the components had
+        self._speed = speed
+        if self.motion == self.VECTOR:
+            self.updateComponents()
+    
+    def getDirec(self):
+        if self.motion == self.VECTOR and self.polarFor != (self.dx, self.dy):
+            self.updatePolar()
+        return self._direc
+    
+    def putDirec(self, direc):
+        if self.motion == self.VECTOR and self.polarFor != (self.dx, self.dy):
+            self.updatePolar()  # keep the speed the components had
+        self._direc = direc
+        if self.motion == self.VECTOR:
+            self.updateComponents()
+    
+    # plain attributes in POLAR motion, views of dx and dy in VECTOR motion
+    speed = property(getSpeed, putSpeed)
+    direc = property(getDirec, putDirec)
+    
+    def updatePolar(self):
+        """ PRIVATE METHOD
+            caches speed and direc for the current dx, dy
+        """
+        (dx, dy) = (self.dx, self.dy)
+        self._speed = math.sqrt((dx * dx) + (dy * dy))
+        # no direction to speak of when still; keep the last one
+        if dx or dy:
+            self._direc = math.atan2(-dy, dx) / math.pi * 180
+        self.polarFor = (dx, dy)
+        
+    def updateComponents(self):
+        """ PRIVATE METHOD
+            sets dx, dy from speed and direc (VECTOR motion)
+        """
+        theta = self._direc / 180.0 * math.pi
+        self.dx = math.cos(theta) * self._speed
+        self.dy = math.sin(theta) * self._speed * -1
+        self.polarFor = (self.dx, self.dy)
+    
+    def calcVector(self):
+        """ calculates dx and dy based on speed, direc
+            automatically called in update() 
+            nothing to do in VECTOR motion
+        """
+        if self.motion == self.VECTOR:
+            return
+        
+        # POLAR: plain attributes behind the properties
+        theta = self._direc / 180.0 * math.pi
+        self.dx = math.cos(theta) * self._speed
+        self.dy = math.sin(theta) * self._speed
+        self.dy *= -1
+    
+    def calcPosition(self):
+        """ calculates the sprites position adding
+            dx and dy to x and y.
+            automatically called in update()
+        """
+        self.x += self.dx
+        self.y += self.dy
+
+    def checkBounds(self):
+        """ checks boundary and acts based on 
+            self.BoundAction.
+            WRAP: wrap around screen (default)
+            BOUNCE: bounce off screen
+            STOP: stop at edge of screen
+            HIDE: move off stage and wait
+            CONTINUE: keep going at present course and speed
+            
+            automatically called by update()
+        """
+        
+        scrWidth = self.screen.get_width()
+        scrHeight = self.screen.get_height()
+        
+        #create variables to simplify checking
+        offRight = offLeft = offTop = offBottom = offScreen = False
+        
+        if (self.x + self.rect.width) > scrWidth:
+            offRight = True
+        if self.x < 0:
+            offLeft = True
+        if self.y > scrHeight:
+            offBottom = True
+        if (self.y - self.rect.height) < 0:
+            offTop = True
+            
+        if offRight or offLeft or offTop or offBottom:
+            offScreen = True
+        
+        if self.boundAction == self.WRAP:
+            if offRight:
+                self.x = 0
+            if offLeft:
+                self.x = scrWidth
+            if offBottom:
+                self.y = 0
+            if offTop:
+                self.y = scrHeight
+        
+        elif self.boundAction == self.BOUNCE:
+            if offLeft or offRight:
+                self.dx *= -1
+            if offTop or offBottom:
+                self.dy *= -1
+                
+            self.updateVector()
+            self.rotation = self.direc
+        
+        elif self.boundAction == self.STOP:
+            if offScreen:
+                self.speed = 0
+        
+        elif self.boundAction == self.HIDE:
+            if offScreen:
+                self.speed = 0
+                self.setPosition((-1000, -1000))
+                self.sleep()  # parked; nothing to update until moved
+        
+        elif self.boundAction == self.CONTINUE:
+            pass
+            
+        else:
+            # assume it's CONTINUE - keep going forever
+            pass    
+    
+    def setSpeed(self, speed):
+        """ immediately sets the objects speed to the 
+            given value.
+        """
+        self.speed = speed
+
+    def speedUp(self, amount):
+        """ changes speed by the given amount
+            Use a negative value to slow down
+        """
+        self.speed += amount
+        if self.speed < self.minSpeed:
+            self.speed = self.minSpeed
+        if self.speed > self.maxSpeed:
+            self.speed = self.maxSpeed
+    
+    def setAngle(self, direc):
+        """ sets both the direcection of motion 
+            and visual rotation to the given angle
+            If you want to set one or the other, 
+            set them direcectly. Angle measured in degrees
+        """            
+        self.direc = direc
+        self.rotation = direc
+    
+    def turnBy (self, amt):
+        """ turn by given number of degrees. Changes
+            both motion and visual rotation. Positive is
+            counter-clockwise, negative is clockwise 
+        """
+        self.direc += amt
+        if self.direc > 360:
+            self.direc = amt
+        if self.direc < 0:
+            self.direc = 360 - amt
+        self.rotation = self.direc
+    
+    def rotateBy(self, amt):
+        """ change visual orientation by given
+            number of degrees. Does not change direcection
+            of travel. 
+        """
+        self.rotation += amt
+        if self.rotation > 360:
+            self.rotation = amt
+        if self.rotation < 0:
+            self.rotation = 360 - amt
+    
+    def setImage (self, image):
+        """ loads the given file name as the master image
+            default setting should be facing east.  Image
+            will be rotated automatically """
+        self.imageMaster = pygame.image.load(image)
+        self.imageMaster = self.imageMaster.convert()
+    
+    def setDX(self, dx):
+        """ changes dx value and updates vector """
+        self.dx = dx
+        self.updateVector()
+    
+    def addDX(self, amt):
+        """ adds amt to dx, updates vector """
+        self.dx += amt
+        self.updateVector()
+        
+    def setDY(self, dy):
+        """ changes dy value and updates vector """
+        self.dy = dy
+        self.updateVector()
+
+    def addDY(self, amt):
+        """ adds amt to dy and updates vector """
+        self.dy += amt
+        self.updateVector()
+    
+    def setComponents(self, components):
+        """ expects (dx, dy) for components
+            change speed and angle according to dx, dy values """
+            
+        (self.dx, self.dy) = components
+        self.updateVector()
+        
+    def setBoundAction (self, action):
+        """ sets action for boundary.  Values are
+            self.WRAP (wrap around edge - default)
+            self.BOUNCE (bounce off screen changing direction)
+            self.STOP (stop at edge of screen)
+            self.HIDE (move off-stage and stop)
+            self.CONTINUE (move on forever)
+            Any other value allows the sprite to move on forever
+        """
+        self.boundAction = action
+
+    def setPosition (self, position):
+        """ place the sprite direcectly at the given position
+            expects an (x, y) tuple
+            wakes a sleeping sprite, unless parked by HIDE
+        """
+        (self.x, self.y) = position
+        if position != (-1000, -1000):
+            self.wake()
+            
+    def sleep(self):
+        """ takes the sprite off the update list of every
+            CullingGroup it is in, until wake(); for sprites
+            with nothing to do, e.g. parked or finished ones
+        """
+        for group in self.groups():
+            if isinstance(group, CullingGroup):
+                group.sleep(self)
+                
+    def wake(self):
+        """ puts a sleeping sprite back on the update lists """
+        for group in self.groups():
+            if isinstance(group, CullingGroup):
+                group.wake(self)
+        
+    def moveBy (self, vector):
+        """ move the sprite by the (dx, dy) values in vector
+            automatically calls checkBounds. Doesn't change 
+            speed or angle settings.
+        """
+        (dx, dy) = vector
+        self.x += dx
+        self.y += dy
+        print(dy)
+        print(dx)
+        self.__checkBounds()
+
+    def forward(self, amt):
+        """ move amt pixels in the current direcection
+            of travel
+        """
+        
+        #calculate dx dy based on current direcection
+        radians = self.direc * math.pi / 180
+        dx = amt * math.cos(radians)
+        dy = amt * math.sin(radians) * -1
+        
+        self.x += dx
+        self.y += dy
+        
+    def addForce(self, amt, angle):
+        """ apply amt of thrust in angle.
+            change speed and direc accordingly
+            add a force straight down to simulate gravity
+            in rotation direcection to simulate spacecraft thrust
+            in direc direcection to accelerate forward
+            at an angle for retro-rockets, etc.
+        """
+
+        #calculate dx dy based on angle
+        radians = angle * math.pi / 180
+        dx = amt * math.cos(radians)
+        dy = amt * math.sin(radians) * -1
+        
+        self.dx += dx
+        self.dy += dy
+        self.updateVector()
+        
+    def updateVector(self):
+        #calculate new speed and angle based on dx, dy
+        #call this any time you change dx or dy
+        #VECTOR motion does it lazily, when they are read
+        
+        if self.motion == self.VECTOR:
+            return
+        
+        # POLAR: plain attributes behind the properties
+        self._speed = math.sqrt((self.dx * self.dx) + (self.dy * self.dy))
+        
+        dy = self.dy * -1
+        dx = self.dx
+        
+        radians = math.atan2(dy, dx)
+        self._direc = radians / math.pi * 180
+
+    def setSpeedLimits(self, maxSpeed, minSpeed):
+        """ determines maximum and minimum
+            speeds you will allow through
+            speedUp() method.  You can still
+            direcectly set any speed you want
+            with setSpeed() Default values:
+                max: 10
+                min: -3
+        """
+        self.maxSpeed = maxSpeed
+        self.minSpeed = minSpeed
+
+    def dataTrace(self):
+        """ utility method for debugging
+            print major properties
+            extend to add your own properties
+        """
+        print("x: %d, y: %d, speed: %.2f, direc: %.f, dx: %.2f, dy: %.2f" % \
+              (self.x, self.y, self.speed, self.direc, self.dx, self.dy))
+            
+    def mouseDown(self):
+        """ boolean function. Returns True if the mouse is 
+            clicked over the sprite, False otherwise
+        """
+        self.pressed = False
+        if pygame.mouse.get_pressed() == (1, 0, 0):
+            if self.rect.collidepoint(getMousePos()):
+                self.pressed = True
+        return self.pressed
+    
+    def clicked(self):
+        """ Boolean function. Returns True only if mouse
+            is pressed and released over sprite
+            
+        """
+        released = False
+        if self.pressed:
+            if pygame.mouse.get_pressed() == (0, 0, 0):
+                if self.rect.collidepoint(getMousePos()):
+                    released = True
+            return released
+        
+    def collidesWith(self, target):
+        """ boolean function. Returns True if the sprite
+            is currently colliding with the target sprite,
+            False otherwise
+        """
+        collision = False
+        if self.rect.colliderect(target.rect):
+            collision = True
+        return collision
+    
+    def collidesGroup(self, target):
+        """ wrapper for pygame.sprite.spritecollideany() function
+            simplifies checking sprite - group collisions
+            returns result of collision check (sprite from group 
+            that was hit or None)
+        """
+        collision = pygame.sprite.spritecollideany(self, target)
+        return collision
+        
+    def distanceTo(self, point):
+        """ returns distance to any point in pixels
+            can be used in circular collision detection
+            (distancesTo does many sprites at once)
+        """
+        (pointx, pointy) = point
+        dx = self.x - pointx
+        dy = self.y - pointy
+        
+        dist = math.sqrt((dx * dx) + (dy * dy))
+        return dist
+    
+    def direcTo(self, point):
+        """ returns direcection (in degrees) to 
+            a point (directionsTo does many sprites at once) """
+        
+        (pointx, pointy) = point
+        dx = self.x - pointx
+        dy = self.y - pointy
+        dy *= -1
+        
+        radians = math.atan2(dy, dx)
+        direc = radians * 180 / math.pi
+        direc += 180
+        return direc
+    
+    def drawTrace(self, color=(0x00, 0x00, 0x00)):
+        """ traces a line between previous position
+            and current position of object 
+        """
+        pygame.draw.line(self.scene.background, color, self.oldCenter,
+                         self.rect.center, 3)
+        self.screen.blit(self.scene.background, (0, 0))
+    
+def pointsOf(items):
+    """ items as a float (N, 2) array of points: sprites, (x, y)
+        pairs, or an array of them. SuperSprites are taken at 
+        their x, y, as distanceTo and direcTo take them; other
+        sprites at their rect center. One sprite or point gives
+        a (1, 2) array. Needs NumPy
+    """
+    if isinstance(items, pygame.sprite.Sprite):
+        items = [items]
+    elif isinstance(items, numpy.ndarray):
+        return items.astype(numpy.float64, copy=False).reshape(-1, 2)
+    
+    items = list(items)
+    if items and isinstance(items[0], pygame.sprite.Sprite):
+        items = [(item.x, item.y) if isinstance(item, SuperSprite) else item.rect.center 
+                 for item in items]
+    elif items and numpy.isscalar(items[0]):
+        items = [items]  # one point
+    # flattened, as fromiter is about twice as quick as building from tuples
+    return numpy.fromiter(itertools.chain.from_iterable(items), numpy.float64, 
+                          2 * len(items)).reshape(-1, 2)
+
+def isOnePoint(target):
+    """ True for one sprite or one (x, y) pair, rather than 
+        a collection of them
+    """
+    if isinstance(target, pygame.sprite.Sprite):
+        return True
+    if isinstance(target, numpy.ndarray):
+        return target.shape == (2,)
+    return isinstance(target, (tuple, list, pygame.math.Vector2)) and len(target) == 2 and \
+           all(numpy.isscalar(value) for value in target)
+
+def offsetsTo(sources, targets):
+    """ (dx, dy) from every source to one target, as (N,)
+        arrays, or to each of M targets, as (N, M); what 
+        distancesTo and directionsTo are made of
+    """
+    if numpy is None:
+        raise RuntimeError("batched spatial queries need NumPy")
+    
+    single = isOnePoint(targets)
+    sources = pointsOf(sources)
+    targets = pointsOf(targets)
+    if single:
+        return (targets[0, 0] - sources[:, 0], targets[0, 1] - sources[:, 1])
+    return (targets[:, 0] - sources[:, 0, None], targets[:, 1] - sources[:, 1, None])
+
+def distancesTo(sources, targets):
+    """ SuperSprite.distanceTo for many sprites at once:
+        pixels from every source to one target, as an (N,)
+        array, or to each of M targets, as (N, M). Sources 
+        and targets are anything pointsOf takes
+    """
+    (dx, dy) = offsetsTo(sources, targets)
+    return numpy.hypot(dx, dy)
+
+def directionsTo(sources, targets):
+    """ SuperSprite.direcTo for many sprites at once: degrees
+        (counter-clockwise from east, 0 to 360) from every 
+        source to one target, as an (N,) array, or to each of
+        M targets, as (N, M)
+    """
+    (dx, dy) = offsetsTo(sources, targets)
+    # signed as direcTo has them (source - target, y flipped), zeros included, 
+    # so a target straight east is 0 degrees for both rather than 360 for one
+    return numpy.degrees(numpy.arctan2(-(0.0 - dy), 0.0 - dx)) + 180
+
+class TargetIndex(object):
+    """ uniform grid of target points for nearest-target queries
+        build() files the targets (sprites or points) once per 
+        tick; nearest() then answers for any number of sources 
+        at once. Up to directPairs sources times targets, every
+        source is measured against every target in one NumPy 
+        step, which is quicker than any grid at that size. Past
+        it sources are taken a grid cell at a time: each cell
+        gathers the targets in the rings of cells around it, 
+        just far enough out to be sure of the nearest, and 
+        settles all its sources in one step. Needs NumPy
+        properties:
+            targets: what was built from, in order
+            points: float (M, 2) array of their points
+            directPairs: largest query answered without the grid
+    """
+    
+    def __init__(self, cellSize=64, directPairs=100000):
+        if numpy is None:
+            raise RuntimeError("TargetIndex needs NumPy")
+        self.cellSize = cellSize
+        self.directPairs = directPairs
+        self.build(())
+        
+    def __len__(self):
+        return len(self.points)
+    
+    def build(self, targets):
+        """ files targets, replacing the last ones """
+        self.targets = list(targets)
+        self.points = pointsOf(self.targets)
+        self.cells = {}  # (column, row) -> target indices
+        
+        cells = (self.points // self.cellSize).astype(numpy.int64)
+        for (i, cell) in enumerate(map(tuple, cells.tolist())):
+            self.cells.setdefault(cell, []).append(i)
+        if len(cells):
+            self.low = cells.min(axis=0)
+            self.high = cells.max(axis=0)
+        
+    def nearest(self, sources, maxDistance=None):
+        """ nearest target to every source; returns (indices,
+            distances), (N,) arrays. The index is into targets,
+            or -1 (with distance inf) where no target is within
+            maxDistance, or there are none
+        """
+        sources = pointsOf(sources)
+        indices = numpy.full(len(sources), -1, numpy.int64)
+        distances = numpy.full(len(sources), numpy.inf)
+        if not len(sources) or not self.cells:
+            return (indices, distances)
+        
+        if len(sources) * len(self.points) <= self.directPairs:
+            near = distancesTo(sources, self.points)
+            indices = near.argmin(axis=1)
+            distances = near[numpy.arange(len(sources)), indices]
+        else:
+            self.__nearestByCell(sources, indices, distances, maxDistance)
+            
+        if maxDistance is not None:
+            beyond = distances > maxDistance
+            indices[beyond] = -1
+            distances[beyond] = numpy.inf
+        return (indices, distances)
+    
+    def __nearestByCell(self, sources, indices, distances, maxDistance):
+        """ nearest() through the grid; fills indices and distances """
+        size = self.cellSize
+        cells = (sources // size).astype(numpy.int64)
+        
+        # sources grouped by cell
+        (cellKeys, groupOf) = numpy.unique(cells, axis=0, return_inverse=True)
+        groupOf = groupOf.reshape(-1)
+        order = numpy.argsort(groupOf, kind="stable")
+        bounds = numpy.searchsorted(groupOf[order], numpy.arange(len(cellKeys) + 1))
+        
+        limit = None
+        if maxDistance is not None:
+            limit = int(maxDistance // size) + 1
+        
+        for (group, (column, row)) in enumerate(cellKeys.tolist()):
+            members = order[bounds[group]:bounds[group + 1]]
+            points = sources[members]
+            
+            # no target can be further out than the grid reaches
+            reach = int(max(abs(column - self.low[0]), abs(column - self.high[0]),
+                            abs(row - self.low[1]), abs(row - self.high[1])))
+            if limit is not None:
+                reach = min(reach, limit)
+            
+            # rings out to the first target; a closer one may still sit in
+            # the next rings, out as far as the worst distance found
+            found = []
+            ring = 0
+            while not found and ring <= reach:
+                found = self.__ring(column, row, ring)
+                ring += 1
+            if not found:
+                continue
+            candidates = self.points[found]
+            best = numpy.hypot(candidates[:, 0] - points[:, 0, None], 
+                               candidates[:, 1] - points[:, 1, None]).min(axis=1).max()
+            outer = min(reach, int(best // size) + 1)
+            for ring in range(ring, outer + 1):
+                found.extend(self.__ring(column, row, ring))
+            
+            candidates = self.points[found]
+            near = numpy.hypot(candidates[:, 0] - points[:, 0, None], 
+                               candidates[:, 1] - points[:, 1, None])
+            closest = near.argmin(axis=1)
+            indices[members] = numpy.asarray(found)[closest]
+            distances[members] = near[numpy.arange(len(members)), closest]
+    
+    def nearestTargets(self, sources, maxDistance=None):
+        """ nearest() as the targets themselves, None where there is none """
+        (indices, distances) = self.nearest(sources, maxDistance)
+        return [self.targets[i] if i >= 0 else None for i in indices.tolist()]
+    
+    def __ring(self, column, row, ring):
+        """ target indices in the square ring of cells ring
+            steps out from (column, row)
+        """
+        cells = self.cells
+        if ring == 0:
+            return list(cells.get((column, row), ()))
+        found = []
+        for x in range(column - ring, column + ring + 1):
+            found.extend(cells.get((x, row - ring), ()))
+            found.extend(cells.get((x, row + ring), ()))
+        for y in range(row - ring + 1, row + ring):
+            found.extend(cells.get((column - ring, y), ()))
+            found.extend(cells.get((column + ring, y), ()))
+        return found
+
+class CullingGroup(pygame.sprite.RenderUpdates):
+    """ a RenderUpdates that skips work on sprites that need none
+        draw() only blits sprites whose rect touches the surface
+        (or view, when set); the rest are culled. update() only
+        updates awake sprites: sleep() takes a sprite off the
+        update list, wake() puts it back in its place
+        properties:
+            view: rect drawing is culled to; None for the whole surface
+            culled: sprites left out of the last draw
+            sleeping: sprites not being updated
+    """
+    
+    def __init__(self, *sprites):
+        self.awake = {}  # sprites to update, in group order
+        self.sleeping = set()
+        self.view = None
+        self.culled = 0
+        self.renderer = BatchRenderer()  # draw() goes through it
+        pygame.sprite.RenderUpdates.__init__(self, *sprites)
+        
+    def add_internal(self, sprite, layer=None):
+        pygame.sprite.RenderUpdates.add_internal(self, sprite)
+        self.awake[sprite] = None
+        
+    def remove_internal(self, sprite):
+        pygame.sprite.RenderUpdates.remove_internal(self, sprite)
+        self.awake.pop(sprite, None)
+        self.sleeping.discard(sprite)
+        
+    def sleep(self, sprite):
+        """ stops updating sprite until wake() """
+        if sprite in self.awake:
+            del self.awake[sprite]
+            self.sleeping.add(sprite)
+            
+    def wake(self, sprite):
+        """ updates sprite again; it keeps its place in the update order """
+        if sprite in self.sleeping:
+            self.sleeping.discard(sprite)
+            # waking is rare; rebuild so the order matches the group's
+            self.awake = dict((member, None) for member in self.spritedict 
+                              if member not in self.sleeping)
+        
+    def update(self, *args, **kwargs):
+        # a copy; sprites may sleep, die or spawn others while updating
+        for sprite in list(self.awake):
+            sprite.update(*args, **kwargs)
+            
+    def draw(self, surface, bgsurf=None, special_flags=0):
+        # culled and batched exactly as a BatchRenderer draws any group
+        self.renderer.begin()
+        return self.renderer.draw(self, surface, special_flags)
+        
+    def clear(self, surface, bgd):
+        # one batch too
+        self.renderer.clear(self, surface, bgd)
+
+class BatchRenderer(object):
+    """ draws sprite groups with one Surface.blits call each
+        every group is a layer, drawn in turn. draw() collects
+        the (image, rect) pairs of the group's visible sprites
+        and hands them to blits at once. The group's dirty rects
+        are kept as its own draw() keeps them, so group.clear()
+        works as before; clear() does the same in one batch too.
+        
+        With sort set each batch is sorted by source surface
+        (the atlas page, for atlas frames). The sort is stable,
+        so sprites sharing a source keep group order; sprites 
+        from different sources that overlap may swap. Software
+        blits gain nothing from it, so it is off by default.
+        properties:
+            sort: sort each batch by source surface
+            batches: blits in each batch this frame, in order
+    """
+    
+    def __init__(self, sort=False):
+        self.sort = sort
+        self.batches = []
+        
+    def begin(self):
+        """ call once per frame, before the first batch """
+        self.batches = []
+        
+    @staticmethod
+    def source(image):
+        """ sort key: the surface image's pixels live in """
+        return id(image.get_parent() or image)
+        
+    def draw(self, group, surface, special_flags=0):
+        """ draws group onto surface in one batch; returns the
+            dirty rects, as group.draw() would. Sprites outside
+            the surface (or the group's view) are culled, and a
+            CullingGroup's count of them kept
+        """
+        view = getattr(group, "view", None) or surface.get_rect()
+        spritedict = group.spritedict
+        dirty = group.lostsprites
+        group.lostsprites = []
+        
+        visible = []
+        for sprite in group.sprites():  # group order; OrderedUpdates keeps its own
+            oldRect = spritedict[sprite]
+            if oldRect:
+                dirty.append(oldRect)
+            if view.colliderect(sprite.rect):
+                visible.append(sprite)
+            else:
+                spritedict[sprite] = None  # nothing of it to clear next frame
+        if isinstance(group, CullingGroup):
+            group.culled = len(spritedict) - len(visible)
+        
+        if self.sort:
+            # source() inlined; this runs for every sprite drawn
+            visible.sort(key=lambda sprite: id(sprite.image.get_parent() or sprite.image))
+        if special_flags:
+            pairs = [(sprite.image, sprite.rect, None, special_flags) for sprite in visible]
+        else:
+            pairs = [(sprite.image, sprite.rect) for sprite in visible]
+        rects = self.__submit(surface, pairs)
+        for (sprite, rect) in zip(visible, rects):
+            spritedict[sprite] = rect
+        dirty.extend(rects)
+        return dirty
+        
+    def clear(self, group, surface, background):
+        """ group.clear() in one batch: blits background over
+            every rect the group's sprites were last drawn in
+        """
+        if callable(background):
+            pygame.sprite.AbstractGroup.clear(group, surface, background)
+            return
+        rects = [rect for rect in group.spritedict.values() if rect]
+        rects.extend(group.lostsprites)
+        self.erase(surface, background, rects)
+        
+    def erase(self, surface, background, rects):
+        """ blits background over each of rects on surface, in one batch """
+        if rects:
+            surface.blits([(background, rect, rect) for rect in rects], False)
+        
+    def submit(self, surface, pairs):
+        """ blits (image, rect) pairs onto surface in one batch;
+            returns the rects drawn
+        """
+        if self.sort:
+            source = self.source
+            pairs = sorted(pairs, key=lambda pair: source(pair[0]))
+        return self.__submit(surface, pairs)
+        
+    def __submit(self, surface, pairs):
+        self.batches.append(len(pairs))
+        if not pairs:
+            return []
+        return surface.blits(pairs)
+        
+    def report(self):
+        """ this frame's batches and the blits in them """
+        return {"batches": list(self.batches), "blits": sum(self.batches)}
+
+class Scene(object):
+    """ encapsulates the IDEA / ALTER framework
+        properties:
+        sprites - a list of sprite objects
+            that forms the primary sprite group
+        background - the background surface
+        screen - the fixed size framebuffer everything draws on
+        display - the window the framebuffer is presented on
+        size - framebuffer resolution; all game coordinates use it
+        
+        display settings are class attributes shared by every
+        scene; set them before the first scene is created:
+            resolution - internal framebuffer size
+            windowSize - window size, or None to let pygame's 
+                SCALED mode pick one and scale on the GPU
+            fullscreen - use the whole screen
+            vsync - wait for vsync when presenting (SCALED only)
+            recorder - FrameRecorder fed every finished frame
+            telemetry - Telemetry that scenes emit events into
+            tracer - Tracer that frames, phases and scene events
+                are recorded in
+            threaded - simulate on a worker thread; see startThreaded
+        
+        idleTimeout - for scenes that sit still until the user
+            does something (menus): milliseconds start() waits 
+            for input between frames, drawing only frames in 
+            which a sprite changed; None (the default) runs and 
+            draws every frame at fps
+        
+        it's generally best to add all sprites 
+        as attributes, so they can have access
+        to each other if needed   
+        
+        --- custom game scence --- 
+    """
+    
+    resolution = (640, 480)
+    windowSize = None
+    fullscreen = False
+    vsync = True
+    recorder = None  # a FrameRecorder shared by every scene, when recording
+    telemetry = None  # a Telemetry stream shared by every scene, when enabled
+    tracer = None  # a Tracer shared by every scene, when tracing
+    threaded = False  # run start() through startThreaded()
+    
+    def __init__(self):
+        """ initialize the game engine
+            set up a sample sprite for testing
+        """
+        global view
+        
+        pygame.init()
+        
+        self.size = tuple(self.resolution)
+        self.display = self.openDisplay()
+        
+        if self.display.get_size() == self.size:
+            # draw straight on the display; SCALED mode does any scaling
+            self.screen = self.display
+            self.viewRect = self.display.get_rect()
+            view = None
+        else:
+            self.screen = pygame.Surface(self.size).convert()
+            self.viewRect = self.fitView(self.display.get_size())
+            self.viewSurface = self.display.subsurface(self.viewRect)
+            self.display.fill((0, 0, 0))
+            view = (self.viewRect, self.size)
+        
+        self.background = pygame.Surface(self.screen.get_size())
+        self.background.fill((0, 0, 0))
+        
+        self.sampleSprite = SuperSprite(self)
+        self.sampleSprite.setSpeed(3)
+        self.sampleSprite.setAngle(0)
+        self.sampleSprite.boundAction = self.sampleSprite.WRAP
+        self.sprites = [self.sampleSprite]
+        self.groups = []
+    
+        self.exitProgram = False
+        
+        self.particles = None  # set to a ParticleSystem to have it run every frame
+        self.auditor = None  # set to an EntityAuditor to have it sample every frame
+        
+        self.fps = 30
+        self.profiler = FrameProfiler()
+        self.profiler.tracer = self.tracer
+        self.governor = QualityGovernor()
+        self.collector = GCScheduler(self.profiler)  # collects between frames
+        self.renderer = BatchRenderer()  # draws each group in one batch
+        
+        self.mouse = MouseState()  # polled once per frame while there are widgets
+        self.widgets = WidgetIndex()  # every Button in the groups; filled by prepare
+        
+        self.idleTimeout = None  # ms to wait for input when nothing changes; see __idleLoop
+    
+    def start(self):
+        """ sets up the sprite groups
+            begins the main loop
+        """
+        if self.threaded and self.idleTimeout is None:
+            self.startThreaded()
+            return
+        
+        self.prepare()
+        try:
+            while self.keepGoing:
+                if self.idleTimeout is None:
+                    self.clock.tick(self.fps)
+                    self.__mainLoop()
+                else:
+                    self.__idleLoop()
+                self.collector.idle(self.profiler.frameStart + 1.0 / self.fps)
+        finally:
+            # whatever happened, the collector goes back to normal
+            self.collector.stop()
+        self.finish()
+            
+    async def startAsync(self):
+        """ same as start(), but waits between frames by yielding
+            to the asyncio event loop instead of sleeping, so 
+            network and other tasks run alongside the scene
+        """
+        self.prepare()
+        frameTime = 1.0 / self.fps
+        nextFrame = time.perf_counter()
+        try:
+            while self.keepGoing:
+                self.__mainLoop()
+                
+                nextFrame += frameTime
+                self.collector.idle(nextFrame)
+                delay = nextFrame - time.perf_counter()
+                if delay < 0:
+                    # running late; start over rather than rush to catch up
+                    nextFrame = time.perf_counter()
+                    delay = 0
+                await asyncio.sleep(delay)
+        finally:
+            # also when cancelled
+            self.collector.stop()
+        self.finish()
+    
+    def startThreaded(self):
+        """ same as start(), but the simulation (events, update()
+            and the groups' update) runs on a worker thread at fps,
+            while this thread reads events and draws the latest 
+            RenderState the worker published. Drawing and presenting
+            one frame overlap with simulating the next.
+            
+            The threads share nothing mutable: events go over a 
+            queue, states are immutable and swapped under a lock,
+            so this is safe with or without the GIL. With the GIL
+            only the parts pygame runs without it (presenting, 
+            scaling, waiting on vsync) overlap; free-threaded 
+            builds overlap everything.
+            
+            Sprites must replace their image rather than draw into
+            it, as Label does; the draw thread may still hold the
+            old one.
+        """
+        self.prepare()
+        
+        self.renderBuffer = RenderBuffer()
+        self.inbox = queue.Queue()
+        self.simError = None
+        
+        if getattr(sys, "_is_gil_enabled", lambda: True)():
+            log.info("simulation thread: the GIL limits overlap to pygame's own calls")
+        
+        worker = threading.Thread(target=self.__simulate, name="simulation", daemon=True)
+        worker.start()
+        
+        drawn = None
+        drawnRects = []
+        try:
+            while self.keepGoing:
+                self.clock.tick(self.fps)
+                
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.keepGoing = False
+                        self.exitProgram = True
+                    self.inbox.put(event)
+                
+                state = self.renderBuffer.latest()
+                if state is not None and state is not drawn:
+                    drawnRects = self.__drawState(state, drawnRects)
+                    drawn = state
+                    if self.recorder is not None:
+                        self.recorder.capture(self.screen)
+                
+                self.present()
+        finally:
+            # whatever happened, stop the worker and give the collector back
+            self.keepGoing = False
+            worker.join()
+            self.collector.stop()
+        if self.simError is not None:
+            raise self.simError
+        self.finish()
+        
+    def __simulate(self):
+        """ the worker side of startThreaded(); one tick per 1/fps seconds """
+        frameTime = 1.0 / self.fps
+        nextFrame = time.perf_counter()
+        try:
+            while self.keepGoing:
+                self.profiler.beginFrame()
+                
+                while True:
+                    try:
+                        event = self.inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.doEvents(event)
+                self.pollWidgets()
+                self.profiler.mark("events")
+                
+                self.update()
+                self.profiler.mark("update")
+                
+                if self.particles is not None:
+                    self.particles.update()
+                    self.profiler.mark("particles")
+                for group in self.groups:
+                    group.update()
+                self.profiler.mark("groups")
+                
+                self.renderBuffer.publish(self.renderState())
+                self.profiler.mark("publish")
+                
+                self.profiler.endFrame()
+                self.governor.sample(self.profiler)
+                if self.auditor is not None:
+                    self.auditor.sample()
+                
+                nextFrame += frameTime
+                self.collector.idle(nextFrame)
+                delay = nextFrame - time.perf_counter()
+                if delay < 0:
+                    # running late; start over rather than rush to catch up
+                    nextFrame = time.perf_counter()
+                    delay = 0
+                time.sleep(delay)
+        except Exception as error:
+            self.simError = error
+            self.keepGoing = False
+            
+    def renderState(self):
+        """ an immutable RenderState of what the groups and 
+            particles would draw now
+        """
+        view = self.screen.get_rect()
+        sprites = tuple((sprite.image, sprite.rect.copy()) 
+                        for group in self.groups for sprite in group
+                        if view.colliderect(sprite.rect))
+        particles = None
+        if self.particles is not None:
+            particles = self.particles.state()
+        return RenderState(self.profiler.frameCount, sprites, particles)
+    
+    def __drawState(self, state, drawnRects):
+        """ draws a RenderState over the last one; returns the rects drawn """
+        screen = self.screen
+        self.renderer.erase(screen, self.background, drawnRects)
+        if self.particles is not None:
+            self.particles.clear(screen, self.background)
+        
+        self.renderer.begin()
+        drawnRects = self.renderer.submit(screen, state.sprites)
+        
+        if state.particles is not None:
+            self.particles.draw(screen, state.particles)
+        return drawnRects
+    
+    def prepare(self):
+        """ sets up the sprite groups and hands the garbage 
+            collector to self.collector; called by start() and 
+            startAsync(), call it directly before using step()
+            (and self.collector.stop() when done stepping)
+        """
+        self.mainSprites = pygame.sprite.OrderedUpdates(self.sprites)
+        self.groups.append(self.mainSprites)
+        if self.tracer is not None:
+            self.tracer.instant("group_rebuild", group="mainSprites", sprites=len(self.mainSprites))
+        
+        for group in self.groups:
+            for sprite in group:
+                if isinstance(sprite, Button):
+                    self.widgets.add(sprite)
+        
+        self.screen.blit(self.background, (0, 0))
+        self.clock = pygame.time.Clock()
+        self.governor.budget = 1.0 / self.fps
+        self.keepGoing = True
+        self.drawnSprites = None  # what the idle loop drew last
+        self.framesDrawn = 0  # by the idle loop; the others draw every frame
+        
+        # last, so the loaded scene is what gets frozen
+        self.collector.start()
+        
+    def step(self, events=()):
+        """ runs one frame of simulation: the given events, update()
+            and the groups' update, without drawing, waiting or
+            reading the event queue. For servers, tools and 
+            headless runs
+        """
+        self.profiler.beginFrame()
+        
+        for event in events:
+            self.doEvents(event)
+        self.pollWidgets()
+        self.update()
+        self.profiler.mark("update")
+        
+        if self.particles is not None:
+            self.particles.update()
+        for group in self.groups:
+            group.update()
+        self.profiler.mark("groups")
+        
+        self.profiler.endFrame()
+        if self.auditor is not None:
+            self.auditor.sample()
+        # no frame budget here; only collections that are overdue
+        self.collector.idle()
+
+    def pollWidgets(self):
+        """ reads the mouse once and hands it to the widgets;
+            each loop calls it before update(), so a click is 
+            seen by update() in the frame it happens
+        """
+        if self.widgets:
+            self.widgets.dispatch(self.mouse.poll())
+
+    def stop(self):
+        """stops the loop"""
+        self.keepGoing = False
+        
+    def finish(self):
+        """ happens once after the main loop ends.
+            Overwrite to wrap up, e.g. report on the session
+        """
+    
+    def __mainLoop(self):
+        """ manage all the main events 
+            automatically called by start, once per frame
+        """
+        self.profiler.beginFrame()
+        
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.keepGoing = False
+                self.exitProgram = True
+            self.doEvents(event)
+        self.pollWidgets()
+        self.profiler.mark("events")
+        
+        self.update()
+        self.profiler.mark("update")
+        
+        if self.particles is not None:
+            self.particles.clear(self.screen, self.background)
+            self.particles.update()
+            self.profiler.mark("particles")
+        
+        self.renderer.begin()
+        for group in self.groups:
+            self.renderer.clear(group, self.screen, self.background)
+            group.update()
+            self.renderer.draw(group, self.screen)
+        self.profiler.mark("groups")
+        
+        # particles go on top of the sprites
+        if self.particles is not None:
+            self.particles.draw(self.screen)
+            self.profiler.mark("particles")
+        
+        if self.recorder is not None:
+            self.recorder.capture(self.screen)
+            self.profiler.mark("capture")
+        
+        # frame time covers the work only; presenting may wait on vsync
+        self.profiler.endFrame()
+        self.governor.sample(self.profiler)
+        if self.auditor is not None:
+            self.auditor.sample()
+        
+        self.present()
+        
+    def __waitForEvent(self, timeout):
+        """ sleeps until an event is queued or timeout ms pass.
+            pygame.event.wait would do, but it checks the queue
+            every millisecond, which costs an idle menu more CPU
+            than running every frame; this checks once a frame, 
+            so input is still answered within one frame
+        """
+        deadline = pygame.time.get_ticks() + timeout
+        step = max(1, int(1000 / self.fps))
+        while not pygame.event.peek():
+            left = deadline - pygame.time.get_ticks()
+            if left <= 0:
+                break
+            pygame.time.wait(min(step, left))
+    
+    def __idleLoop(self):
+        """ start()'s frame when idleTimeout is set. Sleeps in
+            __waitForEvent until input arrives or idleTimeout
+            passes, then runs the frame like __mainLoop, but 
+            clears, draws and presents only when a sprite has a 
+            new image or moved, or the window needs repainting.
+            While a widget is held down (a Scroller repeats) it 
+            runs at fps instead
+        """
+        if self.drawnSprites is None or self.widgets.active is not None:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            self.__waitForEvent(self.idleTimeout)
+            events = pygame.event.get()
+        
+        self.profiler.beginFrame()
+        
+        repaint = self.drawnSprites is None
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.keepGoing = False
+                self.exitProgram = True
+            elif event.type in REPAINT_EVENTS:
+                repaint = True
+            self.doEvents(event)
+        self.pollWidgets()
+        self.profiler.mark("events")
+        
+        self.update()
+        self.profiler.mark("update")
+        
+        for group in self.groups:
+            group.update()
+        # Labels replace their image when they render again
+        sprites = [(sprite.image, tuple(sprite.rect)) for group in self.groups for sprite in group]
+        self.profiler.mark("groups")
+        
+        if repaint or sprites != self.drawnSprites:
+            if self.drawnSprites is None:
+                self.screen.blit(self.background, (0, 0))
+            self.renderer.begin()
+            for group in self.groups:
+                self.renderer.clear(group, self.screen, self.background)
+                self.renderer.draw(group, self.screen)
+            self.drawnSprites = sprites
+            self.profiler.mark("draw")
+            
+            if self.recorder is not None:
+                self.recorder.capture(self.screen)
+                self.profiler.mark("capture")
+            
+            self.profiler.endFrame()
+            self.present()
+            self.framesDrawn += 1
+        else:
+            self.profiler.endFrame()
+        
+    def openDisplay(self):
+        """ opens the window the framebuffer is shown on,
+            reusing the current one when the settings match.
+            Prefers pygame's SCALED mode, which scales on the
+            GPU and can wait for vsync; falls back to a plain
+            window scaled in software
+        """
+        flags = 0
+        if self.fullscreen:
+            flags |= pygame.FULLSCREEN
+            
+        current = pygame.display.get_surface()
+        
+        if self.windowSize is None and hasattr(pygame, "SCALED"):
+            if current is not None and current.get_size() == self.size and \
+               current.get_flags() & pygame.SCALED:
+                return current
+            try:
+                return pygame.display.set_mode(self.size, flags | pygame.SCALED,
+                                               vsync=int(self.vsync))
+            except (pygame.error, TypeError):
+                pass  # no renderer for SCALED; scale in software below
+        
+        windowSize = self.windowSize
+        if windowSize is None:
+            # plain window: framebuffer size, or the desktop when fullscreen
+            windowSize = (0, 0) if self.fullscreen else self.size
+            
+        if current is not None and current.get_size() == tuple(windowSize) and \
+           not current.get_flags() & getattr(pygame, "SCALED", 0):
+            return current
+        return pygame.display.set_mode(windowSize, flags)
+    
+    def fitView(self, windowSize):
+        """ largest rect with the framebuffer's aspect ratio
+            centered in the window (letterboxed)
+        """
+        scale = min(windowSize[0] / self.size[0], windowSize[1] / self.size[1])
+        rect = pygame.Rect(0, 0, int(self.size[0] * scale), int(self.size[1] * scale))
+        rect.center = (windowSize[0] // 2, windowSize[1] // 2)
+        return rect
+        
+    def present(self):
+        """ shows the finished framebuffer in the window """
+        if self.screen is not self.display:
+            if self.viewRect.size == self.size:
+                self.viewSurface.blit(self.screen, (0, 0))
+            else:
+                pygame.transform.scale(self.screen, self.viewRect.size, self.viewSurface)
+        
+        pygame.display.flip()
+
+    def makeSpriteGroup(self, sprites):
+        """ create a group called groupName
+            containing all the sprites in the sprites 
+            list.  This group will be added after the 
+            sprites group, and will automatically
+            clear, update, and draw
+        """
+        tempGroup = pygame.sprite.OrderedUpdates(sprites)
+        return tempGroup
+    
+    def addGroup(self, group):
+        """ adds a sprite group to the groups list for
+            automatic processing 
+        """
+        self.groups.append(group)
+        if self.tracer is not None:
+            self.tracer.instant("group_rebuild", group="added", sprites=len(group))
+        
+    def setGroup(self, group):
+        """ replaces all sprite groups with the given one """
+        
+        # empty the old groups; every sprite keeps a reference to each
+        # group it is in, so they would otherwise never be freed
+        for oldGroup in self.groups:
+            if oldGroup is not group:
+                oldGroup.empty()
+        
+        self.groups = [group]
+        if self.tracer is not None:
+            self.tracer.instant("group_rebuild", group="set", sprites=len(group))
+
+    def doEvents(self, event):
+        """ overwrite this method to add your own events.
+            Works like normal event handling, passes event
+            object
+        """
+        pass
+        
+    def update(self):
+        """ happens once per frame, after event parsing.
+            Overwrite to add your own code, esp event handling
+            that doesn't require event obj. (pygame.key.get_pressed, 
+            pygame.mouse.get_pos, etc)
+            Also a great place for collision detection
+        """
+        
+            
+    def setCaption(self, title):
+        """ set's the scene's title text """
+        pygame.display.set_caption(title)
+
+class Label(pygame.sprite.Sprite):
+    """ a basic label 
+        properties: 
+            font: font to use
+            text: text to display
+            fgColor: foreground color
+            bgColor: background color
+            center: position of label's center
+            size: (width, height) of label
+            fontSize: size of font
+            
+        Modifications: 
+            - fontSize, changeFont, fgColor, bgColor
+            - centered font in y position
+            
+    """
+    
+    def __init__(self, fgColor=((0x00, 0x00, 0x00)), 
+                 bgColor=((0xFF, 0xFF, 0xFF)), fontName="freesansbold.ttf"):
+        
+        pygame.sprite.Sprite.__init__(self)
+        self.text = ""
+        self.fgColor = fgColor
+        self.bgColor = bgColor
+        self.center = (100, 100)
+        
+        self.fontSize = 20
+        self.size = (150, 30)
+        
+        self.font = pygame.font.Font(fontName, self.fontSize)      
+        self.rendered = None  # state of the last render; see update
+        self.index = None  # WidgetIndex that hit-tests this label, if any
+        
+    def changeFont(self, fontSize=20, fontName="freesansbold.ttf"):
+        ''' changes the font to suit a different purpose '''
+        self.fontSize = fontSize
+        self.font = pygame.font.Font(fontName, fontSize)
+
+    def update(self):
+        # only render again when something visible changed
+        state = (self.text, self.fgColor, self.bgColor, self.size, self.center, self.font)
+        if state == self.rendered:
+            return
+        self.rendered = state
+        
+        self.image = pygame.Surface(self.size)
+        self.image.fill(self.bgColor)
+        fontSurface = self.font.render(self.text, True, self.fgColor, self.bgColor)
+        
+        # center the text inside the image
+        xPos = (self.image.get_width() - fontSurface.get_width()) / 2
+        yPos = (self.image.get_height() - fontSurface.get_height()) / 2
+        
+        self.image.blit(fontSurface, (xPos, yPos))
+        self.rect = self.image.get_rect()
+        self.rect.center = self.center
+        
+        if self.index is not None:
+            self.index.move(self)
+
+class Button(Label):
+    """ a button based on the label 
+        same properties as label +
+        active: True if user is clicking on sprite
+                False if user is not currently clicking
+        clicked: True when user releases mouse over a 
+                 currently active button
+        hover: True while the mouse is over the button
+                 
+        Modifications:
+            - update method changed to emulate traditional button and scroller behavior
+            - retained mode: the scene's WidgetIndex reads the mouse
+              once per frame and calls setHover, press, drag and
+              release only when something changed, so an idle
+              button costs next to nothing
+    """
+    
+    HOVER_BG = (105, 105, 105)
+    PRESSED_BG = (50, 50, 50)
+
+    def __init__(self, scroller=False, fgColor=(0, 0, 0), bgColor=(0xCC, 0xCC, 0xCC)):
+        Label.__init__(self, fgColor, bgColor)
+        self.active = False
+        self.clicked = False
+        self.hover = False
+        
+        self.scroller = scroller
+        self.fgColor = fgColor
+        self.bgColor = bgColor
+        self.BUTTON_BG = bgColor  # reverts to this when pressed on
+        
+    def restyle(self):
+        """ background for the current state; Label.update renders
+            again only if it changed
+        """
+        # scrollers keep their look
+        if self.scroller:
+            return
+        
+        if self.active:
+            self.bgColor = self.PRESSED_BG  # gives 'pressed' appearance
+        elif self.hover:
+            self.bgColor = self.HOVER_BG
+        else:
+            self.bgColor = self.BUTTON_BG  # revert back
+    
+    def setHover(self, hover):
+        """ the mouse moved onto (True) or off (False) the button """
+        self.hover = hover
+        self.restyle()
+        
+    def press(self, pos):
+        """ the mouse button went down over the button """
+        self.active = True
+        self.restyle()
+        
+    def drag(self, pos, over):
+        """ every frame the mouse stays down after press(); over
+            tells whether it is still over the button
+        """
+        # only for the scroller to make it more usual:
+        # stops active the moment the mouse is no longer on the scroller (unlike regular butons)
+        if self.scroller and not over:
+            self.active = False
+            
+    def release(self, over):
+        """ the mouse button came up after press() """
+        # special execution when mouse release and the button is active
+        if self.active and over:
+            self.clicked = True  # execute
+        self.active = False
+        self.restyle()
+
+class Scroller(Button):
+    """ like a button, but has a numeric value that 
+        can be decremented by clicking on left half
+        and incremented by clicking on right half.
+        new atributes:
+            value: the scroller's numeric value
+            minValue: minimum value
+            maxValue: maximum value
+            increment: How much is added or subtracted
+            format: format of string interpolation
+            
+            Modifications:
+                - allowed constructor to set min, max, and inc values
+                - gives more of a delay for the values such that the user has
+                  finer control
+    """
+    
+    def __init__(self, iMin=0, iMax=10, iInc=1, fgColor=(0, 0, 0), bgColor=(0xCC, 0xCC, 0xCC)):
+        Button.__init__(self, True, fgColor, bgColor)
+        self.minValue = iMin
+        self.maxValue = iMax
+        self.increment = iInc
+        self.value = 5
+        self.format = "<<  %.2f  >>"
+        
+        self.pause = 0
+        self.delay = 3
+        self.mousePos = (0, 0)  # where the mouse held it last
+        
+    def drag(self, pos, over):
+        Button.drag(self, pos, over)
+        self.mousePos = pos
+        
+    def update(self):
+        
+        if self.active:
+            self.pause += 1
+            
+            if self.pause >= self.delay:
+                self.pause = 0
+                
+                if self.mousePos[0] < self.rect.centerx:
+                    self.value -= self.increment
+                    if self.value < self.minValue:
+                        self.value = self.minValue
+                else:
+                    self.value += self.increment
+                    if self.value > self.maxValue:
+                        self.value = self.maxValue
+
+        self.text = self.format % self.value
+        Label.update(self)
+
+class MultiLabel(pygame.sprite.Sprite):
+    """ accepts a list of strings, creates a multi-line
+        label to display text 
+        same properties as label except textLines
+        is a list of strings. There is no text
+        property.
+        Set the size manually. Vertical size should be at 
+        least 30 pixels per line (with the default font)
+        
+        Modifications: 
+            - the vertical length of each line
+            - changeFont
+            - BUTTON_FG, BUTTON_BG
+    """
+    
+    def __init__(self, BUTTON_FG=((0x00, 0x00, 0x00)), BUTTON_BG=((0xFF, 0xFF, 0xFF))):
+        pygame.sprite.Sprite.__init__(self)
+        self.textLines = ["This", "is", "sample", "text"]
+        self.font = pygame.font.Font("freesansbold.ttf", 20)
+        self.fgColor = BUTTON_FG
+        self.bgColor = BUTTON_BG
+        self.center = (100, 100)
+        self.size = (400, 300)
+        self.rendered = None  # state of the last render; see update
+        
+    def changeFont(self, fontSize=20, fontName="freesansbold.ttf"):
+        ''' changes the font to suit a different purpose '''
+        self.fontSize = fontSize
+        self.font = pygame.font.Font(fontName, fontSize)        
+        
+    def update(self):
+        # only render again when something visible changed
+        state = (tuple(self.textLines), self.fgColor, self.bgColor, self.size, self.center, self.font)
+        if state == self.rendered:
+            return
+        self.rendered = state
+        
+        self.image = pygame.Surface(self.size)
+        self.image.fill(self.bgColor)
+        numLines = len(self.textLines)
+        vSize = 35
+        
+        for lineNum in range(numLines):
+            currentLine = self.textLines[lineNum]
+            fontSurface = self.font.render(currentLine, True, self.fgColor, self.bgColor)
+            # center the text
+            xPos = (self.image.get_width() - fontSurface.get_width())/2
+            yPos = (lineNum * vSize) + 5
+            self.image.blit(fontSurface, (xPos, yPos))
+        
+        self.rect = self.image.get_rect()
+        self.rect.center = self.center
+
+class MouseState(object):
+    """ the mouse as of the start of this frame; the scene
+        polls pygame once per frame and everything else reads
+        it here
+        properties:
+            pos: position in framebuffer coordinates
+            buttons: (left, middle, right) held down
+            pressed / released: left button went down / up 
+                since the last poll
+    """
+    
+    def __init__(self):
+        self.pos = (0, 0)
+        self.buttons = (False, False, False)
+        self.pressed = False
+        self.released = False
+        
+    def poll(self):
+        """ reads pygame's mouse state; returns self """
+        held = self.buttons[0]
+        self.pos = getMousePos()
+        self.buttons = tuple(pygame.mouse.get_pressed()[:3])
+        self.pressed = self.buttons[0] and not held
+        self.released = held and not self.buttons[0]
+        return self
+
+class WidgetIndex(object):
+    """ uniform grid of widget rects for hit-testing, and the
+        one place mouse input reaches widgets
+        widgets (Buttons, or anything with rect, setHover, 
+        press, drag, release and clicked) are filed under every
+        cell their rect touches; a Label moves itself when it 
+        renders again. dispatch() finds the widget under the 
+        mouse with one cell lookup and only calls widgets whose
+        hover or press state changes
+        properties:
+            hovered: widget under the mouse, or None
+            active: widget the mouse went down on, or None
+    """
+    
+    def __init__(self, cellSize=64):
+        self.cellSize = cellSize
+        self.cells = {}  # (column, row) -> widgets
+        self.placed = {}  # widget -> (rect, cells) it is filed under
+        self.order = {}  # widget -> stacking order; later is on top
+        self.hovered = None
+        self.active = None
+        self.clicked = None
+        
+    def __len__(self):
+        return len(self.order)
+    
+    def add(self, widget):
+        """ starts hit-testing widget; above those added before """
+        if widget in self.order:
+            return
+        self.order[widget] = len(self.order)
+        widget.index = self
+        if hasattr(widget, "rect"):
+            self.move(widget)
+            
+    def remove(self, widget):
+        """ stops hit-testing widget """
+        self.__unplace(widget)
+        self.order.pop(widget, None)
+        widget.index = None
+        for name in ("hovered", "active", "clicked"):
+            if getattr(self, name) is widget:
+                setattr(self, name, None)
+        
+    def move(self, widget):
+        """ files widget under its current rect """
+        placed = self.placed.get(widget)
+        if placed is not None and placed[0] == widget.rect:
+            return
+        self.__unplace(widget)
+        
+        rect = widget.rect.copy()
+        size = self.cellSize
+        cells = [(column, row) 
+                 for column in range(rect.left // size, (rect.right - 1) // size + 1)
+                 for row in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(widget)
+        self.placed[widget] = (rect, cells)
+        
+    def __unplace(self, widget):
+        placed = self.placed.pop(widget, None)
+        if placed is None:
+            return
+        for cell in placed[1]:
+            widgets = self.cells[cell]
+            widgets.remove(widget)
+            if not widgets:
+                del self.cells[cell]
+        
+    def hit(self, pos):
+        """ topmost widget at pos, or None """
+        cell = (pos[0] // self.cellSize, pos[1] // self.cellSize)
+        top = None
+        for widget in self.cells.get(cell, ()):
+            if self.placed[widget][0].collidepoint(pos):
+                if top is None or self.order[widget] > self.order[top]:
+                    top = widget
+        return top
+    
+    def dispatch(self, mouse):
+        """ hands one frame of MouseState to the widgets """
+        # clicked lasts one frame
+        if self.clicked is not None:
+            self.clicked.clicked = False
+            self.clicked = None
+        
+        hit = self.hit(mouse.pos)
+        
+        # hover look only changes while the mouse is up
+        if not mouse.buttons[0] and hit is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.setHover(False)
+            if hit is not None:
+                hit.setHover(True)
+            self.hovered = hit
+        
+        if mouse.pressed and hit is not None:
+            self.active = hit
+            hit.press(mouse.pos)
+        elif self.active is not None:
+            if mouse.buttons[0]:
+                self.active.drag(mouse.pos, hit is self.active)
+            else:
+                self.active.release(hit is self.active)
+                if self.active.clicked:
+                    self.clicked = self.active
+                self.active = None
+
+class FrameProfiler(object):
+    """ times each frame and the phases inside it
+        call beginFrame(), mark(phase) after each phase
+        and endFrame() once the frame's work is done
+        properties:
+            frameTimes: the most recent frame times (seconds)
+            phaseTimes: phase name -> seconds, last frame
+            phaseMemory: phase name -> bytes allocated (net), last
+                frame; only filled while tracemalloc is tracing
+            frameCount, totalTime, worstTime: whole session
+            gcPauses: the most recent collector pauses, as
+                (frame, generation, seconds); see GCScheduler
+            gcCount, gcTime, gcWorst: collector pauses, whole session
+            tracer: a Tracer the frame, its phases and collector
+                pauses are recorded in as spans; None for none
+            allocations: an AllocationTracker told of every frame
+                and phase; None for none
+    """
+    
+    def __init__(self, window=60):
+        self.frameTimes = collections.deque(maxlen=window)
+        self.phaseTimes = {}
+        self.frameCount = 0
+        self.totalTime = 0.0
+        self.worstTime = 0.0
+        self.frameStart = self.phaseStart = time.perf_counter()
+        
+        # traced memory change per phase, last frame; only while tracemalloc runs
+        self.phaseMemory = {}
+        self.memoryStart = 0
+        
+        # garbage collector pauses, whether inside a frame or between them
+        self.gcPauses = collections.deque(maxlen=window)
+        self.gcCount = 0
+        self.gcTime = 0.0
+        self.gcWorst = 0.0
+        
+        self.tracer = None
+        self.allocations = None
+        
+    def beginFrame(self):
+        if self.allocations is not None:
+            self.allocations.beginFrame()
+        self.frameStart = self.phaseStart = time.perf_counter()
+        self.phaseTimes = {}
+        if tracemalloc.is_tracing():
+            self.phaseMemory = {}
+            self.memoryStart = tracemalloc.get_traced_memory()[0]
+        
+    def mark(self, phase):
+        """ ends the current phase under the given name """
+        now = time.perf_counter()
+        self.phaseTimes[phase] = self.phaseTimes.get(phase, 0.0) + now - self.phaseStart
+        if self.tracer is not None:
+            self.tracer.complete(phase, self.phaseStart, now)
+        self.phaseStart = now
+        
+        if tracemalloc.is_tracing():
+            memory = tracemalloc.get_traced_memory()[0]
+            self.phaseMemory[phase] = self.phaseMemory.get(phase, 0) + memory - self.memoryStart
+            self.memoryStart = memory
+        
+        # after the phase's own numbers; its snapshots are slow
+        if self.allocations is not None:
+            self.allocations.mark(phase)
+            self.phaseStart = time.perf_counter()
+            self.memoryStart = tracemalloc.get_traced_memory()[0]
+        
+    def endFrame(self):
+        """ records the frame; returns its duration """
+        now = time.perf_counter()
+        frameTime = now - self.frameStart
+        if self.tracer is not None:
+            self.tracer.complete("frame", self.frameStart, now, frame=self.frameCount)
+        self.frameTimes.append(frameTime)
+        self.frameCount += 1
+        if self.allocations is not None:
+            self.allocations.endFrame()
+        self.totalTime += frameTime
+        if frameTime > self.worstTime:
+            self.worstTime = frameTime
+        return frameTime
+    
+    def recordPause(self, generation, seconds):
+        """ records one garbage collection of the given generation """
+        self.gcPauses.append((self.frameCount, generation, seconds))
+        if self.tracer is not None:
+            end = time.perf_counter()
+            self.tracer.complete("gc", end - seconds, end, generation=generation)
+        self.gcCount += 1
+        self.gcTime += seconds
+        if seconds > self.gcWorst:
+            self.gcWorst = seconds
+    
+    def average(self):
+        """ mean of the recent frame times """
+        if not self.frameTimes:
+            return 0.0
+        return sum(self.frameTimes) / len(self.frameTimes)
+    
+    def stats(self):
+        """ whole session summary, times in milliseconds """
+        mean = 0.0
+        if self.frameCount:
+            mean = self.totalTime / self.frameCount
+        return {"frames": self.frameCount,
+                "meanMs": mean * 1000,
+                "worstMs": self.worstTime * 1000,
+                "recentMs": self.average() * 1000,
+                "gcPauses": self.gcCount,
+                "gcMs": self.gcTime * 1000,
+                "gcWorstMs": self.gcWorst * 1000}
+
+class QualityGovernor(object):
+    """ trades optional work for frame time
+        watches the rolling frame time of a FrameProfiler; when
+        it runs over budget the level goes up (less work), when
+        there is plenty of headroom it comes back down
+        
+        the settings of the current level are plain attributes
+        for sprites and scenes to read:
+            explosionStep: explosion frames advanced at a time
+            maxExplosions: explosions allowed at once (None = any)
+            hudInterval: frames between HUD text refreshes
+            particleScale: fraction of particles to emit
+    """
+    
+    LEVELS = [
+        {"explosionStep": 1, "maxExplosions": None, "hudInterval": 1, "particleScale": 1.0},
+        {"explosionStep": 2, "maxExplosions": None, "hudInterval": 5, "particleScale": 0.5},
+        {"explosionStep": 2, "maxExplosions": 6, "hudInterval": 10, "particleScale": 0.25},
+        {"explosionStep": 2, "maxExplosions": 3, "hudInterval": 15, "particleScale": 0.1}]
+    
+    def __init__(self, budget=1.0 / 30, high=0.9, low=0.5, patience=30):
+        """ budget: seconds of work allowed per frame
+            high: step down when the average passes budget * high
+            low: step back up when it falls under budget * low
+            patience: frames to wait after a change before another
+        """
+        self.budget = budget
+        self.high = high
+        self.low = low
+        self.patience = patience
+        self.enabled = True
+        self.wait = patience
+        self.setLevel(0)
+        
+    def setLevel(self, level):
+        """ applies the settings of the given level """
+        self.level = level
+        for (key, value) in self.LEVELS[level].items():
+            setattr(self, key, value)
+    
+    def sample(self, profiler):
+        """ call once per frame, after profiler.endFrame() """
+        if not self.enabled:
+            return
+        
+        self.wait -= 1
+        if self.wait > 0:
+            return
+        
+        average = profiler.average()
+        level = self.level
+        if average > self.budget * self.high and level < len(self.LEVELS) - 1:
+            level += 1
+        elif average < self.budget * self.low and level > 0:
+            level -= 1
+            
+        if level != self.level:
+            log.info("quality level %d -> %d (frame %.1f ms, budget %.1f ms)",
+                     self.level, level, average * 1000, self.budget * 1000)
+            self.setLevel(level)
+            self.wait = self.patience
+        else:
+            self.wait = 1
+
+class GCScheduler(object):
+    """ keeps cyclic garbage collection out of the middle of frames
+        The collector is one per process, so every scheduler 
+        shares one hold on it: the first start() saves its 
+        thresholds, collects once and freezes everything alive 
+        by then (assets, the scene and its sprites), so later 
+        collections skip it; it also raises the young thresholds
+        slack times and stops automatic generation 2 collections.
+        Later start()s only collect and freeze their own scene. 
+        The last stop() unfreezes and puts the thresholds back.
+        
+        idle() then collects in the time left at the end of a
+        frame, where the collector itself would have: the young
+        generations once their counts pass the saved thresholds,
+        generation 2 every fullEvery young collections when the
+        time left covers what the last one took. Frames that 
+        leave no time still collect automatically, at slack times
+        the thresholds.
+        
+        Every collection, automatic or not, is timed and recorded
+        in the FrameProfiler.
+        properties:
+            enabled: manage the collector at all; pauses are timed either way
+            fullEvery: young collections between idle generation 2 runs
+            overdue: young collections after which generation 2 runs
+                even without time to spare, so garbage stays bounded
+            margin: seconds to leave unused before the next frame
+            fullCost: seconds the last generation 2 collection took
+            slack: automatic young collections wait for this many
+                times the thresholds while managed
+            started: this scheduler holds the collector
+    """
+    
+    # shared by every scheduler; the collector is process-wide
+    holders = 0  # schedulers started and not yet stopped
+    thresholds = None  # the collector's own, saved by the first start()
+    lock = threading.Lock()
+    
+    def __init__(self, profiler, fullEvery=30, overdue=300, margin=0.002, slack=4):
+        self.profiler = profiler
+        self.enabled = True
+        self.fullEvery = fullEvery
+        self.overdue = overdue
+        self.margin = margin
+        self.slack = slack
+        self.fullCost = 0.0
+        self.started = False
+        self.pauseStart = None
+        self.callback = self.__timePause
+        
+    def start(self):
+        """ call once the scene is loaded, before the first frame """
+        if self.callback not in gc.callbacks:
+            gc.callbacks.append(self.callback)
+        if not self.enabled or self.started:
+            return
+        
+        with GCScheduler.lock:
+            gc.collect()
+            gc.freeze()
+            if GCScheduler.holders == 0:
+                GCScheduler.thresholds = gc.get_threshold()
+                (young, middle, old) = GCScheduler.thresholds
+                # generation 2 only runs from idle(); young ones run from idle() when due
+                gc.set_threshold(young * self.slack, middle * self.slack, 1 << 30)
+            GCScheduler.holders += 1
+        self.started = True
+        
+    def stop(self):
+        """ lets go of the collector; call once the scene is done """
+        if self.callback in gc.callbacks:
+            gc.callbacks.remove(self.callback)
+        if not self.started:
+            return
+        
+        self.started = False
+        with GCScheduler.lock:
+            GCScheduler.holders -= 1
+            if GCScheduler.holders == 0:
+                # unfrozen, the scenes can be collected once they are let go
+                gc.unfreeze()
+                gc.set_threshold(*GCScheduler.thresholds)
+                GCScheduler.thresholds = None
+        
+    def idle(self, deadline=None):
+        """ collects what is due and fits before deadline (a 
+            time.perf_counter() time); None when there is no 
+            time to spare
+        """
+        if not self.started:
+            return
+        
+        spare = -1.0
+        if deadline is not None:
+            spare = deadline - time.perf_counter() - self.margin
+        
+        (young, middle, old) = gc.get_count()
+        thresholds = GCScheduler.thresholds
+        if old >= self.overdue or (old >= self.fullEvery and spare > self.fullCost):
+            gc.collect(2)
+        elif spare > 0 and middle >= thresholds[1]:
+            gc.collect(1)
+        elif spare > 0 and young >= thresholds[0]:
+            gc.collect(0)
+            
+    def __timePause(self, phase, info):
+        """ gc.callbacks hook; times each collection """
+        if phase == "start":
+            self.pauseStart = time.perf_counter()
+        elif self.pauseStart is not None:
+            seconds = time.perf_counter() - self.pauseStart
+            self.pauseStart = None
+            if info["generation"] == 2:
+                self.fullCost = seconds
+            self.profiler.recordPause(info["generation"], seconds)
+
+class ParticleSystem(object):
+    """ lightweight particles for explosions and debris
+        every live particle is a row in a few NumPy arrays 
+        (position, velocity, life, color), so one vectorized
+        step moves them all and one scatter write per dot 
+        pixel draws them all; tens of thousands stay cheap.
+        Needs NumPy; without it emit() does nothing.
+        properties:
+            capacity: most particles alive at once
+            count: particles alive now
+            palette: list of colors; each particle stores an index
+            dotSize: width and height of a particle in pixels
+            gravity: added to dy every frame
+            drag: velocity multiplier applied every frame
+    """
+    
+    FIRE = [(255, 255, 210), (255, 225, 100), (255, 170, 40), 
+            (235, 100, 20), (170, 45, 10), (110, 110, 110)]
+    
+    def __init__(self, scene, capacity=50000, palette=None, dotSize=2):
+        self.scene = scene
+        self.capacity = capacity
+        self.count = 0
+        self.dotSize = dotSize
+        self.gravity = 0.05
+        self.drag = 0.96
+        self.palette = palette or self.FIRE
+        self.enabled = numpy is not None
+        
+        self.drawnRect = None  # area drawn last frame; cleared next frame
+        self.mapped = None  # (surface, palette as surface pixel values)
+        
+        if self.enabled:
+            self.rng = numpy.random.default_rng()
+            self.pos = numpy.zeros((capacity, 2), numpy.float32)
+            self.vel = numpy.zeros((capacity, 2), numpy.float32)
+            self.life = numpy.zeros(capacity, numpy.int16)
+            self.color = numpy.zeros(capacity, numpy.uint8)
+    
+    def emit(self, position, count, speed=(1.0, 6.0), life=(10, 30), colors=None):
+        """ bursts count particles out of position in all directions
+            speed and life are (min, max) ranges; colors is a list
+            of palette indices to pick from (default: all)
+            the quality governor can scale the count down
+        """
+        if not self.enabled:
+            return 0
+        
+        count = int(count * self.scene.governor.particleScale)
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        
+        start = self.count
+        end = start + count
+        rng = self.rng
+        
+        angle = rng.uniform(0, 2 * math.pi, count)
+        velocity = rng.uniform(speed[0], speed[1], count)
+        
+        self.pos[start:end] = position
+        self.vel[start:end, 0] = numpy.cos(angle) * velocity
+        self.vel[start:end, 1] = numpy.sin(angle) * velocity
+        self.life[start:end] = rng.integers(life[0], life[1] + 1, count)
+        
+        if colors is None:
+            colors = range(len(self.palette))
+        self.color[start:end] = rng.choice(numpy.asarray(colors, numpy.uint8), count)
+        
+        self.count = end
+        return count
+    
+    def update(self):
+        """ moves every particle one frame and drops the dead ones """
+        count = self.count
+        if not count:
+            return
+        
+        pos = self.pos[:count]
+        vel = self.vel[:count]
+        life = self.life[:count]
+        
+        pos += vel
+        vel *= self.drag
+        vel[:, 1] += self.gravity
+        life -= 1
+        
+        (width, height) = self.scene.size
+        alive = (life > 0) & (pos[:, 0] >= 0) & (pos[:, 0] < width - self.dotSize) & \
+                (pos[:, 1] >= 0) & (pos[:, 1] < height - self.dotSize)
+        
+        # pack the survivors at the front of the arrays
+        if not alive.all():
+            keep = numpy.flatnonzero(alive)
+            living = len(keep)
+            self.pos[:living] = pos[keep]
+            self.vel[:living] = vel[keep]
+            self.life[:living] = life[keep]
+            self.color[:living] = self.color[:count][keep]
+            self.count = living
+    
+    def clear(self, surface, background):
+        """ erases last frame's particles """
+        if self.drawnRect is not None:
+            surface.blit(background, self.drawnRect, self.drawnRect)
+            self.drawnRect = None
+    
+    def state(self):
+        """ copies of the live particles' positions and colors,
+            for drawing on another thread; see draw
+        """
+        count = self.count
+        return (self.pos[:count].copy(), self.color[:count].copy())
+    
+    def draw(self, surface, state=None):
+        """ draws every live particle onto surface, or the
+            particles in a state() taken earlier
+        """
+        if state is None:
+            state = (self.pos[:self.count], self.color[:self.count])
+        (positions, colors) = state
+        count = len(positions)
+        if not count:
+            return
+        
+        # palette in the surface's own pixel format
+        if self.mapped is None or self.mapped[0] is not surface:
+            values = [surface.map_rgb(color) for color in self.palette]
+            self.mapped = (surface, numpy.array(values, numpy.uint32))
+        
+        points = positions.astype(numpy.intp)
+        (x, y) = (points[:, 0], points[:, 1])
+        values = self.mapped[1][colors]
+        
+        pixels = pygame.surfarray.pixels2d(surface)
+        for dx in range(self.dotSize):
+            for dy in range(self.dotSize):
+                pixels[x + dx, y + dy] = values
+        del pixels  # unlocks the surface
+        
+        left = int(x.min())
+        top = int(y.min())
+        self.drawnRect = pygame.Rect(left, top, int(x.max()) - left + self.dotSize,
+                                     int(y.max()) - top + self.dotSize)
+
+class BulletPattern(object):
+    """ one declarative bullet pattern, compiled for firing
+        spec is a dict; every key is optional:
+            count: bullets per volley (1)
+            spread: degrees the volley fans across; 360 or 
+                more makes an evenly spaced ring (0)
+            angle: direction of the middle bullet in degrees,
+                counter-clockwise from east like SuperSprite,
+                or "aim" to aim at the target (180)
+            speed: pixels per frame (8)
+            volleys: volleys per firing (1)
+            interval: frames between volleys (1)
+            turn: degrees each volley turns from the last (0)
+        the fan is turned into unit vectors once, here; firing
+        a volley is a rotation and a scale per bullet
+    """
+    
+    def __init__(self, name, spec):
+        self.name = name
+        self.count = spec.get("count", 1)
+        self.spread = spec.get("spread", 0)
+        self.angle = spec.get("angle", 180)
+        self.speed = spec.get("speed", 8)
+        self.volleys = spec.get("volleys", 1)
+        self.interval = max(1, spec.get("interval", 1))
+        self.turn = spec.get("turn", 0)
+        self.aimed = self.angle == "aim"
+        
+        if self.count == 1:
+            offsets = [0.0]
+        elif self.spread >= 360:
+            offsets = [i * 360.0 / self.count for i in range(self.count)]
+        else:
+            step = self.spread / (self.count - 1.0)
+            offsets = [-self.spread / 2.0 + i * step for i in range(self.count)]
+        
+        # fixed patterns bake the base angle in; rounding keeps east/west/north/south exact
+        base = 0 if self.aimed else self.angle
+        self.vectors = []
+        for offset in offsets:
+            radians = (base + offset) * math.pi / 180
+            self.vectors.append((round(math.cos(radians), 12) * self.speed, 
+                                 round(-math.sin(radians), 12) * self.speed))
+            
+class PatternEmitter(object):
+    """ runs every firing of every BulletPattern in a scene
+        fire() starts a firing from a source sprite; update(),
+        once per tick, steps them all in one pass and hands
+        every bullet due that tick to spawn(xs, ys, dxs, dys)
+        in a single call, so the caller can make them in bulk
+        properties:
+            patterns: name -> BulletPattern
+            firings: [pattern, source, target, tick, volley] 
+                lists, one per firing still going
+            fired: bullets handed to spawn so far
+    """
+    
+    def __init__(self, patterns, spawn):
+        self.patterns = dict((name, BulletPattern(name, spec)) for (name, spec) in patterns.items())
+        self.spawn = spawn
+        self.firings = []
+        self.fired = 0
+        
+    def fire(self, name, source, target=None):
+        """ starts a firing from source (a sprite); target is 
+            the sprite aimed patterns aim at
+        """
+        self.firings.append([self.patterns[name], source, target, 0, 0])
+        
+    def clear(self):
+        """ stops every firing """
+        self.firings = []
+        
+    def stop(self, source):
+        """ stops every firing from source, e.g. when it is shot down """
+        self.firings = [firing for firing in self.firings if firing[1] is not source]
+        
+    def origin(self, source):
+        """ where bullets leave source; override to change it """
+        return (source.rect.left, source.rect.centery)
+        
+    def update(self):
+        """ fires every volley due this tick; returns bullets made """
+        xs = []
+        ys = []
+        dxs = []
+        dys = []
+        going = []
+        
+        for firing in self.firings:
+            (pattern, source, target, tick, volley) = firing
+            
+            # a firing ends with its source
+            if getattr(source, "dying", False):
+                continue
+            
+            if tick % pattern.interval == 0:
+                (x, y) = self.origin(source)
+                
+                # turn the compiled fan by the aim and the spiral
+                turn = pattern.turn * volley
+                if pattern.aimed and target is not None:
+                    (tx, ty) = target.rect.center
+                    turn += math.atan2(y - ty, tx - x) * 180 / math.pi
+                    
+                if turn:
+                    radians = turn * math.pi / 180
+                    (cos, sin) = (math.cos(radians), math.sin(radians))
+                    for (dx, dy) in pattern.vectors:
+                        dxs.append(dx * cos + dy * sin)
+                        dys.append(dy * cos - dx * sin)
+                else:
+                    for (dx, dy) in pattern.vectors:
+                        dxs.append(dx)
+                        dys.append(dy)
+                xs.extend([x] * pattern.count)
+                ys.extend([y] * pattern.count)
+                volley += 1
+                
+            firing[3] = tick + 1
+            firing[4] = volley
+            if volley < pattern.volleys:
+                going.append(firing)
+                
+        self.firings = going
+        
+        if xs:
+            self.fired += len(xs)
+            self.spawn(xs, ys, dxs, dys)
+        return len(xs)
+
+# what one frame draws: (image, rect) pairs in draw order and a ParticleSystem.state()
+# made by Scene.renderState; never changed once made, so any thread may read it
+RenderState = collections.namedtuple("RenderState", "tick sprites particles")
+
+class RenderBuffer(object):
+    """ double buffer of RenderStates between a simulation
+        thread and a draw thread: the writer fills the back 
+        slot, then swaps it to the front under a lock; the 
+        reader always gets the newest complete state
+    """
+    
+    def __init__(self):
+        self.slots = [None, None]
+        self.front = 0
+        self.lock = threading.Lock()
+        self.published = 0
+        
+    def publish(self, state):
+        """ makes state the latest one; writer side """
+        back = 1 - self.front
+        self.slots[back] = state
+        with self.lock:
+            self.front = back
+            self.published += 1
+            
+    def latest(self):
+        """ the newest published state, or None; reader side """
+        with self.lock:
+            return self.slots[self.front]
+
+class RewindBuffer(object):
+    """ fixed memory ring of byte snapshots, newest last
+        all slots are allocated up front; once full, each
+        push overwrites the oldest snapshot. A snapshot
+        bigger than a slot is dropped (and counted) rather
+        than growing the buffer
+        properties:
+            capacity: number of slots
+            slotSize: bytes per slot
+            dropped: snapshots too big to keep
+    """
+    
+    def __init__(self, capacity, slotSize=65536):
+        self.capacity = capacity
+        self.slotSize = slotSize
+        self.data = bytearray(capacity * slotSize)
+        self.sizes = [0] * capacity
+        self.head = 0  # slot the next push goes to
+        self.count = 0
+        self.dropped = 0
+        
+    def __len__(self):
+        return self.count
+    
+    def push(self, snapshot):
+        """ stores a snapshot; returns False if it did not fit """
+        size = len(snapshot)
+        if size > self.slotSize:
+            self.dropped += 1
+            return False
+        
+        start = self.head * self.slotSize
+        self.data[start:start + size] = snapshot
+        self.sizes[self.head] = size
+        
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+    
+    def get(self, age=0):
+        """ snapshot from age pushes ago (0 is the newest) as bytes,
+            or None if it is no longer kept
+        """
+        if age < 0 or age >= self.count:
+            return None
+        slot = (self.head - 1 - age) % self.capacity
+        start = slot * self.slotSize
+        return bytes(self.data[start:start + self.sizes[slot]])
+    
+    def rewind(self, steps):
+        """ drops the newest steps snapshots and returns the one
+            before them (the oldest kept if there are fewer);
+            None when empty
+        """
+        steps = min(steps, self.count - 1)
+        if steps < 0:
+            return None
+        
+        self.head = (self.head - steps) % self.capacity
+        self.count -= steps
+        return self.get(0)
+    
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+class FrameRecorder(object):
+    """ records frames for bug reports and benchmarks
+        capture() only copies the frame's pixels into a free
+        buffer from a pool allocated up front; a background
+        thread does the slow part:
+            "png": one PNG per frame in the directory path
+            "raw": every frame appended to the file path, after
+                   a header giving size, pitch and pixel masks
+        When the writer falls behind and no buffer is free the
+        frame is dropped, never waited for.
+        properties:
+            captured, dropped, written: frame counts
+            every: capture only every nth frame offered
+    """
+    
+    RAW_HEADER = struct.Struct("<8sHHHBIIII")
+    RAW_FRAME = struct.Struct("<I")
+    
+    def __init__(self, path, mode="png", poolSize=8, every=1):
+        if mode not in ("png", "raw"):
+            raise ValueError("mode must be 'png' or 'raw', not %r" % mode)
+        
+        self.path = path
+        self.mode = mode
+        self.poolSize = poolSize
+        self.every = every
+        
+        self.offered = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        
+        self.format = None  # (size, pitch, bytesize, masks) of the frames; set by the first
+        self.free = queue.Queue()
+        self.full = queue.Queue()
+        
+        if mode == "png":
+            os.makedirs(path, exist_ok=True)
+            self.stream = None
+        else:
+            self.stream = open(path, "wb")
+        
+        self.thread = threading.Thread(target=self.__write, name="FrameRecorder", daemon=True)
+        self.thread.start()
+        
+    def capture(self, surface):
+        """ queues a copy of surface; returns False if the frame
+            was skipped or dropped
+        """
+        self.offered += 1
+        if (self.offered - 1) % self.every:
+            return False
+        
+        frameFormat = (surface.get_size(), surface.get_pitch(), 
+                       surface.get_bytesize(), surface.get_masks())
+        if self.format is None:
+            self.format = frameFormat
+            for i in range(self.poolSize):
+                self.free.put(bytearray(surface.get_pitch() * surface.get_height()))
+        elif frameFormat != self.format:
+            self.dropped += 1  # size or format changed mid-recording
+            return False
+        
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        
+        memoryview(buffer)[:] = surface.get_buffer()
+        self.full.put((self.captured, buffer))
+        self.captured += 1
+        return True
+    
+    def close(self):
+        """ writes out the queued frames and stops the writer """
+        self.full.put(None)
+        self.thread.join()
+        if self.stream is not None:
+            self.stream.close()
+        log.info("recorder: %d frames written, %d dropped", self.written, self.dropped)
+    
+    def __write(self):
+        """ writer thread: saves queued frames and hands buffers back """
+        while True:
+            item = self.full.get()
+            if item is None:
+                return
+            
+            (number, buffer) = item
+            try:
+                if self.mode == "png":
+                    self.__writePNG(number, buffer)
+                else:
+                    self.__writeRaw(number, buffer)
+                self.written += 1
+            except (OSError, pygame.error) as error:
+                log.warning("recorder: frame %d not written: %s", number, error)
+            finally:
+                self.free.put(buffer)
+    
+    def __writePNG(self, number, buffer):
+        (size, pitch, bytesize, masks) = self.format
+        frame = pygame.Surface(size, 0, bytesize * 8, masks)
+        if frame.get_pitch() != pitch:
+            raise pygame.error("unexpected pitch")
+        frame.get_buffer().write(bytes(buffer))
+        pygame.image.save(frame, os.path.join(self.path, "frame%06d.png" % number))
+    
+    def __writeRaw(self, number, buffer):
+        if number == 0 or self.stream.tell() == 0:
+            ((width, height), pitch, bytesize, masks) = self.format
+            self.stream.write(self.RAW_HEADER.pack(b"MAVRAW1\0", width, height, pitch, 
+                                                   bytesize, *masks))
+        self.stream.write(self.RAW_FRAME.pack(number))
+        self.stream.write(buffer)
+
+class FrameExport(object):
+    """ the framebuffer as NumPy arrays, for analysis and agents
+        view() is the surface's own pixels through surfarray:
+        (width, height, 3), no copy. sample() reads every step'th
+        pixel of that view, as RGB or grayscale, into a buffer
+        allocated once here and overwritten on every call.
+        Needs NumPy.
+        
+        A view locks the surface and nothing can be drawn on it
+        until the view (and any slice of it) is deleted; take it
+        between frames and let it go before the next one.
+        properties:
+            step: keep every step'th pixel across and down
+            gray: sample() gives luma (width, height) not RGB
+            buffer: the array sample() fills
+    """
+    
+    def __init__(self, surface, step=1, gray=False):
+        if numpy is None:
+            raise RuntimeError("FrameExport needs NumPy")
+        
+        self.surface = surface
+        self.step = step
+        self.gray = gray
+        
+        (width, height) = surface.get_size()
+        shape = (-(-width // step), -(-height // step))
+        if gray:
+            self.buffer = numpy.empty(shape, numpy.uint8)
+            # luma is summed in 16 bits; the weights add up to 256
+            self.luma = numpy.empty(shape, numpy.uint16)
+            self.term = numpy.empty(shape, numpy.uint16)
+        else:
+            self.buffer = numpy.empty(shape + (3,), numpy.uint8)
+    
+    def view(self):
+        """ (width, height, 3) uint8 view of the surface's pixels; 
+            writes to it draw on the surface
+        """
+        return pygame.surfarray.pixels3d(self.surface)
+    
+    def sample(self):
+        """ fills buffer from the surface and returns it """
+        step = self.step
+        pixels = self.view()[::step, ::step]  # strided, still no copy
+        
+        if not self.gray:
+            self.buffer[...] = pixels
+        else:
+            (luma, term) = (self.luma, self.term)
+            numpy.multiply(pixels[..., 0], 77, out=luma, dtype=numpy.uint16)
+            numpy.multiply(pixels[..., 1], 150, out=term, dtype=numpy.uint16)
+            luma += term
+            numpy.multiply(pixels[..., 2], 29, out=term, dtype=numpy.uint16)
+            luma += term
+            numpy.right_shift(luma, 8, out=self.buffer, casting="unsafe")
+        
+        del pixels  # unlocks the surface
+        return self.buffer
+
+class Telemetry(object):
+    """ structured session events, written as JSON lines
+        emit() only appends a tuple to a deque, which needs
+        no lock; a background thread drains it, serializes
+        and writes, rotating the file as it grows.
+        Busy events are sampled: once one event name passes
+        sampleAbove emits within a second, only 1 in sampleEvery
+        is kept for the rest of that second, and each kept
+        event carries the "sample" rate it was kept at.
+        properties:
+            path: file written; rotated to path.1, path.2, ...
+            maxBytes: size that triggers a rotation
+            backupCount: rotated files kept
+            emitted, sampledOut, written: event counts
+    """
+    
+    def __init__(self, path, maxBytes=4 * 1024 * 1024, backupCount=3, 
+                 sampleAbove=200, sampleEvery=10, flushInterval=0.25):
+        self.path = path
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.sampleAbove = sampleAbove
+        self.sampleEvery = sampleEvery
+        self.flushInterval = flushInterval
+        
+        self.events = collections.deque()
+        self.counts = {}  # event name -> emits this second
+        self.second = int(time.time())
+        
+        self.emitted = 0
+        self.sampledOut = 0
+        self.written = 0
+        
+        self.stream = open(path, "a")
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self.__write, name="Telemetry", daemon=True)
+        self.thread.start()
+    
+    def emit(self, name, **fields):
+        """ records one event; cheap enough for the game loop """
+        now = time.time()
+        self.emitted += 1
+        
+        if int(now) != self.second:
+            self.second = int(now)
+            self.counts = {}
+        count = self.counts.get(name, 0) + 1
+        self.counts[name] = count
+        
+        sample = 1
+        if count > self.sampleAbove:
+            if count % self.sampleEvery:
+                self.sampledOut += 1
+                return
+            sample = self.sampleEvery
+        
+        self.events.append((now, name, sample, fields))
+    
+    def close(self):
+        """ writes everything still queued and closes the file """
+        self.closed.set()
+        self.thread.join()
+        self.stream.close()
+    
+    def __write(self):
+        """ writer thread: drains the queue every flushInterval """
+        while True:
+            closing = self.closed.wait(self.flushInterval)
+            
+            lines = []
+            while self.events:
+                (stamp, name, sample, fields) = self.events.popleft()
+                record = {"t": round(stamp, 4), "event": name}
+                if sample != 1:
+                    record["sample"] = sample
+                record.update(fields)
+                lines.append(json.dumps(record, default=str))
+            
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+                self.written += len(lines)
+                if self.stream.tell() > self.maxBytes:
+                    self.__rotate()
+            
+            if closing:
+                return
+    
+    def __rotate(self):
+        """ path -> path.1 -> path.2 ...; the oldest falls off """
+        self.stream.close()
+        for i in range(self.backupCount - 1, 0, -1):
+            older = "%s.%d" % (self.path, i)
+            if os.path.exists(older):
+                os.replace(older, "%s.%d" % (self.path, i + 1))
+        if self.backupCount > 0:
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self.stream = open(self.path, "a")
+
+class Tracer(object):
+    """ a frame timeline for chasing hitches, in memory until dump()
+        dump() writes the Chrome trace-event JSON format, which
+        chrome://tracing and ui.perfetto.dev open. Spans are 
+        either timed by the caller and recorded whole with 
+        complete(), or opened and closed with begin() and end();
+        instant() marks a moment. Every event is one tuple on a
+        bounded deque; only the newest maxEvents are kept.
+        Times are time.perf_counter() seconds.
+        properties:
+            maxEvents: events kept; the oldest fall off
+            recorded: events recorded, kept or not
+    """
+    
+    def __init__(self, maxEvents=500000):
+        self.maxEvents = maxEvents
+        self.events = collections.deque(maxlen=maxEvents)
+        self.threads = {}  # thread id -> name, for the viewer's labels
+        self.origin = time.perf_counter()
+        self.recorded = 0
+        
+    def __thread(self):
+        thread = threading.get_ident()
+        if thread not in self.threads:
+            self.threads[thread] = threading.current_thread().name
+        return thread
+        
+    def complete(self, name, start, end=None, **args):
+        """ a span that ran from start to end (default: now) """
+        if end is None:
+            end = time.perf_counter()
+        self.events.append(("X", name, start, end - start, self.__thread(), args))
+        self.recorded += 1
+        
+    def begin(self, name, **args):
+        """ opens a span; close it with end(name) on the same thread """
+        self.events.append(("B", name, time.perf_counter(), 0.0, self.__thread(), args))
+        self.recorded += 1
+        
+    def end(self, name):
+        self.events.append(("E", name, time.perf_counter(), 0.0, self.__thread(), None))
+        self.recorded += 1
+        
+    def instant(self, name, **args):
+        """ marks one moment, e.g. a spawn """
+        self.events.append(("i", name, time.perf_counter(), 0.0, self.__thread(), args))
+        self.recorded += 1
+        
+    def dump(self, path):
+        """ writes the kept events to path as a trace-event JSON file """
+        pid = os.getpid()
+        origin = self.origin
+        
+        records = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": thread, "args": {"name": name}}
+                   for (thread, name) in list(self.threads.items())]
+        for (phase, name, start, duration, thread, args) in list(self.events):
+            record = {"ph": phase, "name": name, "pid": pid, "tid": thread,
+                      "ts": round((start - origin) * 1e6, 3)}
+            if phase == "X":
+                record["dur"] = round(duration * 1e6, 3)
+            elif phase == "i":
+                record["s"] = "t"  # scoped to its thread
+            if args:
+                record["args"] = args
+            records.append(record)
+        
+        with open(path, "w") as stream:
+            json.dump({"traceEvents": records, "displayTimeUnit": "ms"}, stream, default=str)
+        log.info("tracer: %d events written to %s", len(records), path)
+
+class EntityAuditor(object):
+    """ watches a long running scene for leaks
+        every interval frames it counts live objects per class
+        in each watched list attribute of the scene and in its
+        sprite groups, and, while tracemalloc runs, totals the
+        memory each frame phase allocated (from the scene's
+        FrameProfiler). A count, or traced memory, whose least 
+        squares slope over the last window samples is above 
+        tolerance, and whose rise along that slope beats noise
+        times the scatter around it, is flagged as unbounded
+        growth and logged once; step-wise leaks that stay flat
+        between steps are caught too.
+        properties:
+            tolerance: growth per sample a key may show unflagged
+            noise: how many times the scatter the rise must beat
+            counts: "list.Class" -> live objects, last sample
+            phaseMemory: phase -> bytes allocated since the start
+            flagged: keys currently showing unbounded growth
+    """
+    
+    def __init__(self, scene, lists=("sprites",), interval=30, window=20, tolerance=0.0, noise=8.0):
+        self.scene = scene
+        self.lists = lists
+        self.interval = interval
+        self.window = window
+        self.tolerance = tolerance
+        self.noise = noise
+        
+        self.frame = 0
+        self.samples = 0
+        self.counts = {}
+        self.history = {}  # key -> recent values
+        self.phaseMemory = {}
+        self.flagged = set()
+        
+    def sample(self):
+        """ call once per frame, after the profiler's endFrame() """
+        for (phase, memory) in self.scene.profiler.phaseMemory.items():
+            self.phaseMemory[phase] = self.phaseMemory.get(phase, 0) + memory
+        
+        self.frame += 1
+        if self.frame % self.interval:
+            return
+        self.samples += 1
+        
+        counts = {}
+        for name in self.lists:
+            for entity in getattr(self.scene, name):
+                key = "%s.%s" % (name, entity.__class__.__name__)
+                counts[key] = counts.get(key, 0) + 1
+        for group in self.scene.groups:
+            for sprite in group.sprites():
+                key = "groups.%s" % sprite.__class__.__name__
+                counts[key] = counts.get(key, 0) + 1
+        if tracemalloc.is_tracing():
+            counts["tracedMemory"] = tracemalloc.get_traced_memory()[0]
+        
+        # classes that emptied out still count, as zero
+        for key in self.history:
+            counts.setdefault(key, 0)
+        self.counts = counts
+        
+        for (key, value) in counts.items():
+            history = self.history.get(key)
+            if history is None:
+                history = self.history[key] = collections.deque(maxlen=self.window + 1)
+            history.append(value)
+            
+            growing = len(history) > self.window and self.growing(history)
+            if growing and key not in self.flagged:
+                self.flagged.add(key)
+                log.warning("auditor: %s keeps growing (%d -> %d over %d samples)",
+                            key, history[0], history[-1], self.window)
+            elif not growing:
+                self.flagged.discard(key)
+                
+    def growing(self, history):
+        """ whether history, one value per sample, grows: the least
+            squares slope is above tolerance and the rise along it
+            stands out of the scatter around the line
+        """
+        n = len(history)
+        middle = (n - 1) / 2.0
+        mean = sum(history) / float(n)
+        spread = sum((i - middle) ** 2 for i in range(n))
+        slope = sum((i - middle) * (value - mean) for (i, value) in enumerate(history)) / spread
+        if slope <= self.tolerance:
+            return False
+        
+        residuals = sum((value - mean - slope * (i - middle)) ** 2 for (i, value) in enumerate(history))
+        scatter = math.sqrt(residuals / max(n - 2, 1))
+        return slope * (n - 1) > self.noise * scatter
+        
+    def report(self):
+        """ current counts, flagged keys and memory per phase """
+        return {"frames": self.frame, "counts": dict(self.counts),
+                "flagged": sorted(self.flagged), "phaseMemory": dict(self.phaseMemory)}
+
+class AllocationTracker(object):
+    """ finds what each frame allocates, and where
+        attached to a FrameProfiler it takes a tracemalloc 
+        snapshot at the start of every frame and at every 
+        phase mark, and diffs each with the one before, so the
+        blocks and bytes a phase left allocated are put down to
+        the lines that allocated them. It also keeps the peak 
+        bytes each phase reached above where it started, which
+        shows objects made and dropped inside the phase.
+        
+        Snapshot diffs only see what is still alive at a mark:
+        an object made and freed inside a phase is missed, and
+        one made in place of another at the same line cancels
+        out; the peak catches those. Slow: for diagnosis and 
+        checks, not for play.
+        properties:
+            frames: frames tracked
+            phases: phase -> [new blocks, new bytes, peak bytes]
+                new ones summed over frames, peak the highest
+            sites: (phase, "file:line") -> [new blocks, new bytes]
+    """
+    
+    def __init__(self, depth=1):
+        self.depth = depth
+        self.profiler = None
+        self.startedTracing = False
+        self.frames = 0
+        self.phases = {}
+        self.sites = {}
+        self.last = None
+        self.start = 0
+        
+        # the profiler's numbers and the tracker's own are not the frame's;
+        # checked per line as filter_traces would compile patterns every call
+        self.ignored = set()
+        self.ignoredFiles = set([tracemalloc.__file__])
+        for owner in (FrameProfiler, AllocationTracker):
+            (lines, first) = inspect.getsourcelines(owner)
+            self.ignored.update((__file__, line) for line in range(first, first + len(lines)))
+        
+    def attach(self, profiler):
+        """ starts tracking the frames profiler sees """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.depth)
+            self.startedTracing = True
+        self.profiler = profiler
+        profiler.allocations = self
+        
+    def detach(self):
+        """ stops tracking; stops tracemalloc if attach() started it """
+        if self.profiler is not None:
+            self.profiler.allocations = None
+            self.profiler = None
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+        self.last = None
+        
+    def __baseline(self):
+        """ snapshots now, then starts the peak from here; the old
+            snapshot goes first so it does not count against the phase
+        """
+        self.last = None
+        self.last = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+        
+    def beginFrame(self):
+        self.__baseline()
+        
+    def mark(self, phase):
+        if self.last is None:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+        
+        totals = self.phases.get(phase)
+        if totals is None:
+            totals = self.phases[phase] = [0, 0, 0]
+        totals[2] = max(totals[2], peak - self.start)
+        
+        for stat in snapshot.compare_to(self.last, "lineno"):
+            if stat.count_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            if frame.filename in self.ignoredFiles or (frame.filename, frame.lineno) in self.ignored:
+                continue
+            key = (phase, "%s:%d" % (os.path.basename(frame.filename), frame.lineno))
+            site = self.sites.get(key)
+            if site is None:
+                site = self.sites[key] = [0, 0]
+            site[0] += stat.count_diff
+            site[1] += max(stat.size_diff, 0)
+            totals[0] += stat.count_diff
+            totals[1] += max(stat.size_diff, 0)
+        
+        del snapshot
+        self.__baseline()
+        
+    def endFrame(self):
+        if self.last is not None:
+            self.frames += 1
+        
+    def perFrame(self):
+        """ mean new blocks per tracked frame, all phases """
+        if not self.frames:
+            return 0.0
+        return sum(totals[0] for totals in self.phases.values()) / float(self.frames)
+        
+    def top(self, count=10):
+        """ the count sites that left the most new blocks: (phase, site, blocks, bytes) """
+        rows = [(phase, site, blocks, size) for ((phase, site), (blocks, size)) in self.sites.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:count]
+        
+    def check(self, maxObjects):
+        """ raises AssertionError, naming the worst sites, when the 
+            tracked frames left more than maxObjects new blocks each
+            on average; use it to hold a steady-state scene to a budget
+        """
+        perFrame = self.perFrame()
+        if perFrame > maxObjects:
+            sites = "; ".join("%s %s: %.1f" % (phase, site, blocks / float(self.frames))
+                              for (phase, site, blocks, size) in self.top(5))
+            raise AssertionError("%.1f new blocks per frame, more than %d (%s)" % (perFrame, maxObjects, sites))
+        
+    def report(self):
+        """ per phase and per site totals, and blocks per frame """
+        return {"frames": self.frames, "perFrame": self.perFrame(),
+                "phases": dict((phase, list(totals)) for (phase, totals) in self.phases.items()),
+                "top": self.top()}
+
+class EntityRegistry(object):
+    """ keeps a scene's entities by stable id and by kind
+        every entity gets an entityId (never reused) and a kind;
+        adding, moving and removing are all constant time.
+        Removal is deferred: remove() marks the entity dying and
+        takes it out of the collision index at once, flush() 
+        (call it at the end of the tick) takes it out of 
+        everything else, so lists taken during the tick stay valid.
+        properties:
+            group: a CullingGroup with every entity, for drawing
+            index: kind -> pygame Group, for collision tests
+            nextId: id the next added entity gets
+    """
+    
+    def __init__(self, kinds):
+        self.kinds = dict((kind, {}) for kind in kinds)  # kind -> id -> entity, in add order
+        self.index = dict((kind, pygame.sprite.Group()) for kind in kinds)
+        self.group = CullingGroup()
+        self.entities = {}
+        self.pending = []
+        self.nextId = 1
+        
+    def __len__(self):
+        return len(self.entities)
+        
+    def add(self, entity, kind, entityId=None):
+        """ registers the entity; pass entityId to bring one back, e.g. on restore """
+        if entityId is None:
+            entityId = self.nextId
+        self.nextId = max(self.nextId, entityId + 1)
+        
+        entity.entityId = entityId
+        entity.kind = kind
+        entity.dying = False
+        
+        self.entities[entityId] = entity
+        self.kinds[kind][entityId] = entity
+        self.index[kind].add(entity)
+        self.group.add(entity)
+        return entity
+        
+    def remove(self, entity):
+        """ marks the entity for removal at the next flush() """
+        if entity.dying:
+            return
+        entity.dying = True
+        self.index[entity.kind].remove(entity)
+        self.pending.append(entity)
+        
+    def move(self, entity, kind):
+        """ changes the entity's kind right away; its id stays """
+        del self.kinds[entity.kind][entity.entityId]
+        self.index[entity.kind].remove(entity)
+        
+        entity.kind = kind
+        self.kinds[kind][entity.entityId] = entity
+        if not entity.dying:
+            self.index[kind].add(entity)
+        
+    def flush(self):
+        """ applies the removals made since the last flush """
+        for entity in self.pending:
+            del self.entities[entity.entityId]
+            del self.kinds[entity.kind][entity.entityId]
+            self.group.remove(entity)
+        self.pending = []
+        
+    def clear(self):
+        """ removes every entity at once; sprites in the group that
+            were never registered (a HUD, say) stay
+        """
+        for entity in self.entities.values():
+            self.group.remove(entity)
+        for kind in self.kinds:
+            self.kinds[kind].clear()
+            self.index[kind].empty()
+        self.entities.clear()
+        self.pending = []
+        
+    def get(self, entityId):
+        """ the entity with the given id, or None """
+        return self.entities.get(entityId)
+        
+    def list(self, kind):
+        """ the live entities of a kind, oldest first; a copy, safe to
+            keep while adding or removing
+        """
+        return [entity for entity in self.kinds[kind].values() if not entity.dying]
+        
+    def count(self, kind=None):
+        """ entities of a kind, or of all kinds, including dying ones """
+        if kind is None:
+            return len(self.entities)
+        return len(self.kinds[kind])
+
+class Atlas(object):
+    """ packs many small frames into a few large surfaces
+        add frames by name, then call build() once; get()
+        returns a subsurface that shares pixels with its page,
+        so every sprite draws from the same few surfaces
+        properties:
+            pageSize: (width, height) of each page
+            padding: empty pixels kept around each frame
+            pages: list of packed page surfaces
+            index: name -> (page number, rect)
+            
+        Frames with per pixel alpha and opaque frames
+        go on separate pages; colorkeys are kept per frame,
+        run-length encoded (RLEACCEL): mostly transparent 
+        frames blit several times faster that way.
+    """
+    
+    def __init__(self, pageSize=(1024, 1024), padding=1):
+        self.pageSize = pageSize
+        self.padding = padding
+        self.pages = []
+        self.index = {}
+        self.frames = {}
+        self.pending = []
+        
+    def add(self, name, surface):
+        """ queues a surface to be packed under the given name """
+        self.pending.append((name, surface))
+        
+    def addSheet(self, prefix, sheet, frameSize, offsets):
+        """ queues one frame per (x, y) offset of a sprite sheet
+            named prefix0, prefix1, ...
+        """
+        for i in range(len(offsets)):
+            frame = sheet.subsurface((offsets[i], frameSize))
+            self.add("%s%d" % (prefix, i), frame)
+    
+    def build(self):
+        """ packs all queued frames with a shelf packer
+            can be called again after adding more frames,
+            which starts new pages for the new frames
+        """
+        alphaFrames = []
+        opaqueFrames = []
+        
+        for (name, surface) in self.pending:
+            if surface.get_flags() & pygame.SRCALPHA:
+                alphaFrames.append((name, surface))
+            else:
+                opaqueFrames.append((name, surface))
+        self.pending = []
+        
+        self.__pack(alphaFrames, True)
+        self.__pack(opaqueFrames, False)
+        
+        log.info(self.report())
+        
+    def __pack(self, frames, alpha):
+        """ shelf packing: tallest frames first, left to right,
+            a new shelf when a row is full and a new page when 
+            the page is full
+        """
+        if not frames:
+            return
+        
+        frames = sorted(frames, key=lambda item: item[1].get_height(), reverse=True)
+        pad = self.padding
+        
+        placed = []  # (page number, name, surface, position)
+        pageSizes = []
+        x = y = shelfHeight = 0
+        pageWidth = pageHeight = 0
+        
+        for (name, surface) in frames:
+            (width, height) = surface.get_size()
+            
+            # first frame, or this frame does not fit on the current shelf
+            if not pageSizes or x + width + pad > pageWidth:
+                x = 0
+                y += shelfHeight
+                shelfHeight = 0
+                
+            # start a new page; oversized frames get a page to themselves
+            if not pageSizes or y + height + pad > pageHeight:
+                pageWidth = max(self.pageSize[0], width + pad)
+                pageHeight = max(self.pageSize[1], height + pad)
+                pageSizes.append([0, 0])
+                x = y = shelfHeight = 0
+            
+            placed.append((len(pageSizes) - 1, name, surface, (x, y)))
+            
+            # track the used area so pages can be trimmed to fit
+            used = pageSizes[-1]
+            used[0] = max(used[0], x + width)
+            used[1] = max(used[1], y + height)
+            
+            x += width + pad
+            shelfHeight = max(shelfHeight, height + pad)
+        
+        firstPage = len(self.pages)
+        for size in pageSizes:
+            if alpha:
+                page = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                page = pygame.Surface(size)
+                
+            # match the display format when one is set for fast blits
+            if pygame.display.get_surface() is not None:
+                if alpha:
+                    page = page.convert_alpha()
+                else:
+                    page = page.convert()
+            page.fill((0, 0, 0, 0))
+            self.pages.append(page)
+        
+        for (pageNum, name, surface, position) in placed:
+            page = self.pages[firstPage + pageNum]
+            rect = pygame.Rect(position, surface.get_size())
+            
+            # copy the raw pixels; colorkey is applied to the frame instead
+            colorkey = surface.get_colorkey()
+            surface.set_colorkey(None)
+            if alpha:
+                page.blit(surface, position, None, pygame.BLEND_RGBA_MAX)
+            else:
+                page.blit(surface, position)
+            surface.set_colorkey(colorkey)
+            
+            frame = page.subsurface(rect)
+            if colorkey is not None:
+                frame.set_colorkey(colorkey, pygame.RLEACCEL)
+                
+            self.index[name] = (firstPage + pageNum, rect)
+            self.frames[name] = frame
+    
+    def get(self, name):
+        """ returns the frame packed under name """
+        return self.frames[name]
+    
+    def getList(self, prefix):
+        """ returns the frames added through addSheet(prefix, ...)
+            in their original order
+        """
+        frameList = []
+        while "%s%d" % (prefix, len(frameList)) in self.frames:
+            frameList.append(self.frames["%s%d" % (prefix, len(frameList))])
+        return frameList
+    
+    def frameCount(self):
+        """ number of packed frames """
+        return len(self.frames)
+    
+    def memory(self):
+        """ bytes of pixel memory held by all pages """
+        total = 0
+        for page in self.pages:
+            total += page.get_pitch() * page.get_height()
+        return total
+    
+    def report(self):
+        """ one line summary of the atlas """
+        return "atlas: %d frames on %d pages, %d KB" % \
+               (self.frameCount(), len(self.pages), self.memory() // 1024)
+
+if __name__ == "__main__":
+    # change this code to test various features of the engine
+    # This code will not run when gameEngine is run as a module
+    # (as it usually will be)
+        
+    game = Scene()
+    thing = SuperSprite(game)
+    thing.setSpeed(5)
+    thing.setBoundAction(thing.BOUNCE)
+    thing.setAngle(230)
+    game.sprites = [thing]
+    
+    game.start()
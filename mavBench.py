@@ -0,0 +1,228 @@
+'''
+Title: mavBench.py
+Description:
+    Micro benchmarks for the gameEngine and mavEngine.
+
+    Each benchmark runs headless and prints the cost per
+    item, so changes to the engine can be compared run
+    against run.
+
+    python mavBench.py [kinematics] [--sprites 500] [--frames 200]
+'''
+
+import os
+
+# headless unless told otherwise; must happen before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, sys, time
+import pygame, gameEngine, mavEngine
+
+
+def timePerItem(run, items, frames):
+    ''' best of three: microseconds per item per frame for run(), which does one frame '''
+
+    best = None
+    for attempt in range(3):
+        start = time.perf_counter()
+        for frame in range(frames):
+            run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / (frames * items) * 1e6
+
+def kinematics(game, sprites, frames):
+    ''' per-sprite update cost of bullets, enemies and steering in POLAR and VECTOR motion '''
+
+    results = []
+
+    for (name, motion) in (("polar", 0), ("vector", 1)):
+
+        # bullets fly straight: update() only
+        bullets = [mavEngine.Bullet(game, 100, 100 + i % 300) for i in range(sprites)]
+        for bullet in bullets:
+            bullet.setMotion(motion)
+            bullet.setDX(8)
+
+        def flyBullets():
+            for bullet in bullets:
+                bullet.update()
+                if bullet.x > 600:
+                    bullet.x = 0
+
+        # enemies steer by setting dy every few frames
+        enemies = [mavEngine.Enemy(game) for i in range(sprites)]
+        for enemy in enemies:
+            enemy.setMotion(motion)
+            enemy.setDX(-7)
+
+        def flyEnemies():
+            for enemy in enemies:
+                enemy.update()
+                if enemy.x < 0:
+                    enemy.x = 700
+
+        # a plain SuperSprite changed through components every frame
+        plain = [gameEngine.SuperSprite(game) for i in range(sprites)]
+        for sprite in plain:
+            sprite.setMotion(motion)
+            sprite.setBoundAction(sprite.CONTINUE)
+            sprite.setDX(1)
+
+        def steer():
+            for sprite in plain:
+                sprite.setDY(sprite.dy * -1 or 1)
+                sprite.addDX(0.01)
+                sprite.calcVector()
+                sprite.calcPosition()
+
+        results.append(("bullet update", name, timePerItem(flyBullets, sprites, frames)))
+        results.append(("enemy update", name, timePerItem(flyEnemies, sprites, frames)))
+        results.append(("setDY/addDX", name, timePerItem(steer, sprites, frames)))
+
+    return results
+
+def patterns(game, sprites, frames):
+    ''' per-bullet cost of firing each enemy pattern: one emitter pass that makes the sprites '''
+
+    results = []
+    source = mavEngine.Enemy(game)
+    game.registry.add(source, "enemy")
+
+    for name in sorted(mavEngine.PATTERNS):
+        pattern = game.emitter.patterns[name]
+        firings = max(1, sprites // pattern.count)
+
+        def fire():
+            for i in range(firings):
+                game.emitter.fire(name, source, game.maverick)
+            while game.emitter.firings:
+                game.emitter.update()
+            game.registry.clear()
+            game.registry.add(source, "enemy")
+
+        bullets = firings * pattern.count * pattern.volleys
+        results.append(("fire", name, timePerItem(fire, bullets, max(1, frames // 20))))
+
+    game.registry.clear()
+    return results
+
+def drawing(game, sprites, frames):
+    ''' per-sprite cost of clearing and drawing a group of bullets and enemies: the group's clear and draw against the batch renderer's '''
+
+    results = []
+    screen = game.screen
+    rng = game.rng
+
+    # on screen and mixed together, as they are in play
+    entities = []
+    for i in range(sprites):
+        if i % 4:
+            entity = mavEngine.Bullet(game, rng.randrange(10, 600), rng.randrange(10, 470))
+        else:
+            entity = mavEngine.Enemy(game)
+            entity.rect.center = (rng.randrange(50, 590), rng.randrange(30, 450))
+        entities.append(entity)
+
+    for groupClass in (pygame.sprite.OrderedUpdates, gameEngine.CullingGroup):
+        group = groupClass(entities)
+        renderer = gameEngine.BatchRenderer()
+
+        def groupDraw():
+            group.clear(screen, game.background)
+            group.draw(screen)
+
+        def batchDraw():
+            renderer.clear(group, screen, game.background)
+            renderer.begin()
+            renderer.draw(group, screen)
+
+        name = groupClass.__name__
+        results.append(("group.draw", name, timePerItem(groupDraw, sprites, frames)))
+        results.append(("renderer.draw", name, timePerItem(batchDraw, sprites, frames)))
+        group.empty()
+
+    return results
+
+def targeting(game, sprites, frames):
+    ''' per-projectile cost of homing: aiming at one target, and finding the nearest of the enemies '''
+
+    results = []
+    rng = game.rng
+
+    # projectiles spread over the screen, chasing the maverick or a few dozen enemies
+    bullets = [mavEngine.Bullet(game, rng.randrange(10, 600), rng.randrange(10, 470)) for i in range(sprites)]
+    enemies = []
+    for i in range(40):
+        enemy = mavEngine.Enemy(game)
+        enemy.rect.center = (rng.randrange(50, 590), rng.randrange(30, 450))
+        enemies.append(enemy)
+    target = game.maverick.rect.center
+
+    def scalarAim():
+        for bullet in bullets:
+            bullet.distanceTo(target)
+            bullet.direcTo(target)
+
+    def batchAim():
+        points = gameEngine.pointsOf(bullets)
+        gameEngine.distancesTo(points, target)
+        gameEngine.directionsTo(points, target)
+
+    # projectiles that keep their positions in an array skip pointsOf
+    points = gameEngine.pointsOf(bullets)
+    def arrayAim():
+        gameEngine.distancesTo(points, target)
+        gameEngine.directionsTo(points, target)
+
+    def scalarNearest():
+        for bullet in bullets:
+            (x, y) = bullet.rect.center
+            best = None
+            for enemy in enemies:
+                (dx, dy) = (enemy.rect.centerx - x, enemy.rect.centery - y)
+                distance = dx * dx + dy * dy
+                if best is None or distance < best:
+                    best = distance
+
+    index = gameEngine.TargetIndex()
+    def indexNearest():
+        index.build(enemies)
+        index.nearest(gameEngine.pointsOf(bullets))
+
+    results.append(("aim", "scalar", timePerItem(scalarAim, sprites, frames)))
+    results.append(("aim", "batched", timePerItem(batchAim, sprites, frames)))
+    results.append(("aim", "array", timePerItem(arrayAim, sprites, frames)))
+    results.append(("nearest of %d" % len(enemies), "scalar", timePerItem(scalarNearest, sprites, frames)))
+    results.append(("nearest of %d" % len(enemies), "TargetIndex", timePerItem(indexNearest, sprites, frames)))
+    return results
+
+BENCHMARKS = {"kinematics": kinematics, "patterns": patterns, "drawing": drawing, "targeting": targeting}
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Headless engine micro benchmarks.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help="benchmarks to run: %s (default: all)" % ", ".join(sorted(BENCHMARKS)))
+    parser.add_argument("--sprites", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark %r" % name)
+
+    game = mavEngine.Game()
+    game.rng.seed(1)
+
+    for name in args.names or sorted(BENCHMARKS):
+        print("%s:" % name)
+        for (label, variant, cost) in BENCHMARKS[name](game, args.sprites, args.frames):
+            print("  %-16s %-14s %8.3f us" % (label, variant, cost))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+'''
+Title: mavCheck.py
+Description:
+    Quick behaviour checks for the gameEngine and mavEngine.
+
+    Each check sets up a headless Game, exercises one rule the
+    engine must keep, and raises AssertionError if it broke.
+    Fails (exit status 1) if any check did.
+
+    python mavCheck.py [name ...]
+'''
+
+import os
+
+# headless unless told otherwise; must happen before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, gc, json, sys, tempfile, threading, time
+import pygame, gameEngine, mavEngine, mavNet
+
+
+def killedEnemyStopsFiring():
+    ''' an enemy shot down mid-pattern fires no more of it while it explodes '''
+
+    game = mavEngine.Game()
+    enemy = mavEngine.Enemy(game)
+    enemy.rect.center = (400, 200)
+    game.registry.add(enemy, "enemy")
+
+    game.emitter.fire("spiral", enemy, game.maverick)
+    game.emitter.update()
+    assert game.emitter.firings, "the spiral should still be going after its first volley"
+
+    # one of the maverick's bullets, right on the enemy
+    game.registry.add(mavEngine.Bullet(game, 400, 200), "bullet")
+    game.checkDestroy()
+    game.registry.flush()
+    assert enemy in game.deadList, "the bullet should have killed the enemy"
+
+    fired = game.emitter.fired
+    for tick in range(30):
+        game.emitter.update()
+    assert game.emitter.fired == fired, "a killed enemy fired %d more bullets" % (game.emitter.fired - fired)
+
+def levelFile(lines):
+    ''' a temporary level file holding lines; the caller removes it '''
+
+    (handle, path) = tempfile.mkstemp(suffix=".jsonl")
+    with os.fdopen(handle, "w") as stream:
+        stream.write("\n".join(lines) + "\n")
+    return path
+
+def levelSpawnsEveryWave():
+    ''' a wave at tick 0 spawns on the first tick, and explicit zero overrides stick '''
+
+    path = levelFile(['{"at": 0, "enemy": "scout", "y": 100, "speed": 0, "fireRate": 0}',
+                      '{"at": 5, "enemy": "dart", "y": 300}'])
+    try:
+        game = mavEngine.Game()
+        game.governor.enabled = False
+        game.loadLevel(path)
+        game.prepare()
+        try:
+            game.step()
+            scouts = game.registry.list("enemy")
+            assert len(scouts) == 1, "%d enemies after the first tick; expected the wave at 0" % len(scouts)
+            assert (scouts[0].dx, scouts[0].fireRate) == (0, 0), \
+                "speed 0 and fireRate 0 became %r and %r" % (-scouts[0].dx, scouts[0].fireRate)
+            for tick in range(5):
+                game.step()
+        finally:
+            game.collector.stop()
+        assert game.enemiesSpawned == 2, "%d of 2 waves spawned" % game.enemiesSpawned
+    finally:
+        os.remove(path)
+
+def levelRejectsBadWaves():
+    ''' malformed waves fail as ValueError naming the file and line, before the game runs '''
+
+    for wave in ('{"at": 0, "enemy": "scout", "count": 3, "y": [100, 200]}',
+                 '{"at": 0, "enemy": "scout", "count": "3"}',
+                 '{"at": 0, "enemy": "scout", "spacing": 1.5}',
+                 '{"at": 0, "enemy": "scout", "y": "top"}'):
+        path = levelFile(["# a comment", wave])
+        try:
+            try:
+                list(mavEngine.readWaves(path))
+            except ValueError as error:
+                assert str(error).startswith("%s:2: " % path), "no file:line in %r" % str(error)
+            else:
+                raise AssertionError("accepted %s" % wave)
+        finally:
+            os.remove(path)
+
+def batchedMatchesScalar():
+    ''' distancesTo, directionsTo and TargetIndex agree with SuperSprite.distanceTo and direcTo '''
+
+    game = mavEngine.Game()
+    sources = [mavEngine.Enemy(game) for i in range(6)] + \
+              [mavEngine.Bullet(game, 40 + 90 * i, 50 + 70 * i) for i in range(6)]
+    targets = pygame.sprite.Group(game.maverick, mavEngine.Enemy(game))  # a group of two is not one point
+
+    distances = gameEngine.distancesTo(sources, targets)
+    directions = gameEngine.directionsTo(sources, targets)
+    assert distances.shape == directions.shape == (len(sources), 2), "shape %r" % (distances.shape,)
+    for (i, source) in enumerate(sources):
+        for (j, target) in enumerate(targets):
+            point = (target.x, target.y)
+            assert abs(distances[i, j] - source.distanceTo(point)) < 1e-9, \
+                "distance %.3f, distanceTo %.3f" % (distances[i, j], source.distanceTo(point))
+            assert abs(directions[i, j] - source.direcTo(point)) < 1e-9, \
+                "direction %.3f, direcTo %.3f" % (directions[i, j], source.direcTo(point))
+
+    # one target gives one row
+    maverick = game.maverick
+    aimed = gameEngine.directionsTo(sources, maverick)
+    assert aimed.shape == (len(sources),), "shape %r for one target" % (aimed.shape,)
+    assert abs(aimed[0] - sources[0].direcTo((maverick.x, maverick.y))) < 1e-9, "one target disagrees"
+
+    # straight east, west, north and south, where a signed zero decides 0 or 360
+    level = mavEngine.Bullet(game, maverick.x - 100, maverick.y)
+    for point in ((maverick.x, maverick.y), (level.x - 100, level.y), (level.x, level.y - 100), (level.x, level.y + 100)):
+        (direction,) = gameEngine.directionsTo([level], point)
+        assert abs(direction - level.direcTo(point)) < 1e-9, \
+            "direction %.3f, direcTo %.3f toward %r" % (direction, level.direcTo(point), point)
+
+    index = gameEngine.TargetIndex(directPairs=0)  # through the grid
+    index.build(targets)
+    (nearest, near) = index.nearest(sources)
+    for (i, source) in enumerate(sources):
+        best = min(source.distanceTo((target.x, target.y)) for target in targets)
+        assert abs(near[i] - best) < 1e-9, "nearest %.3f, closest by distanceTo %.3f" % (near[i], best)
+
+def bulletsDrawFromAtlas():
+    ''' a live bullet draws its atlas frame itself, not a rotated copy made every tick '''
+
+    game = mavEngine.Game()
+    frames = mavEngine.loadAtlas()
+    for (isEnemy, name) in ((False, "bullet"), (True, "enemyBullet")):
+        bullet = mavEngine.Bullet(game, 100, 100, isEnemy, (3, 2))
+        for tick in range(5):
+            bullet.update()
+        assert bullet.image is bullet.imageMaster, "%s image is a copy of its frame" % name
+        page = bullet.image.get_parent()
+        assert page is not None, "%s image is not an atlas subsurface" % name
+        assert page.get_size() == frames.get(name).get_parent().get_size() and \
+               bullet.image.get_offset() == frames.get(name).get_offset(), "%s image is not its atlas frame" % name
+
+def gameWaitsOnPrefetch():
+    ''' the first Game after the menus uses the atlas they started packing, never packing it on the main thread '''
+
+    packedOn = []
+    pack = mavEngine.packAtlas
+    def spy(key=mavEngine.ATLAS):
+        packedOn.append(threading.current_thread() is threading.main_thread())
+        return pack(key)
+
+    # as if no Game had run yet
+    (atlas, mavEngine.atlas, mavEngine.packAtlas) = (mavEngine.atlas, None, spy)
+    try:
+        menu = mavEngine.Menu()
+        game = mavEngine.Game()
+    finally:
+        mavEngine.packAtlas = pack
+    try:
+        assert packedOn == [False], "packed %d times, %d on the main thread" % (len(packedOn), sum(packedOn))
+        assert mavEngine.atlas is menu.prefetched[0].result(), "the Game did not take the menus' atlas"
+    finally:
+        mavEngine.atlas = atlas or mavEngine.atlas
+
+class Crash(gameEngine.Scene):
+    ''' a scene whose update() fails on its third frame '''
+
+    def __init__(self):
+        gameEngine.Scene.__init__(self)
+        self.fps = 200
+        self.frames = 0
+
+    def update(self):
+        self.frames += 1
+        if self.frames == 3:
+            raise RuntimeError("crash")
+
+def collectorSurvivesCrash():
+    ''' a scene that fails mid-loop still gives the garbage collector back, threaded or not '''
+
+    thresholds = gc.get_threshold()
+    for threaded in (False, True):
+        scene = Crash()
+        scene.threaded = threaded
+        try:
+            scene.start()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("the crash did not get out of start()")
+        mode = "threaded" if threaded else "plain"
+        assert gc.get_threshold() == thresholds, "%s: thresholds left at %r" % (mode, gc.get_threshold())
+        assert gc.get_freeze_count() == 0, "%s: %d objects left frozen" % (mode, gc.get_freeze_count())
+
+def collectorIsShared():
+    ''' scenes share one hold on the collector: the last to stop puts it back, and idle() collects only when due '''
+
+    thresholds = gc.get_threshold()
+    first = gameEngine.GCScheduler(gameEngine.FrameProfiler())
+    second = gameEngine.GCScheduler(gameEngine.FrameProfiler())
+    first.start()
+    managed = gc.get_threshold()
+    second.start()
+    assert gc.get_threshold() == managed, "the second start changed the thresholds to %r" % (gc.get_threshold(),)
+    first.stop()
+    assert gc.get_threshold() == managed and gc.get_freeze_count() > 0, "the first stop let go of the collector"
+
+    collections = gc.get_stats()[0]["collections"]
+    second.idle(time.perf_counter() + 1)
+    assert gc.get_stats()[0]["collections"] == collections, "idle() collected with counts at %r" % (gc.get_count(),)
+
+    second.stop()
+    assert gc.get_threshold() == thresholds, "thresholds left at %r" % (gc.get_threshold(),)
+    assert gc.get_freeze_count() == 0, "%d objects left frozen" % gc.get_freeze_count()
+
+def partnerPredictsSteer():
+    ''' the network partner's prediction moves its maverick exactly as Game.steer moves the host's '''
+
+    game = mavEngine.Game()
+    maverick = game.maverick
+    client = mavNet.Client(("127.0.0.1", mavNet.PORT), game.size)
+    client.predicted = (maverick.x, maverick.y)
+
+    rng = game.rng
+    rng.seed(4)
+    previous = 0
+    for tick in range(2000):
+        # held for a while, then any mix of directions, opposite ones included
+        buttons = rng.randrange(16) if rng.random() < 0.2 else previous
+        game.steer(maverick, buttons, previous)
+        maverick.update()
+        game.checkOutOfBounds()
+        (client.predicted, client.velocity) = client.move(client.predicted, client.velocity, buttons, previous)
+        previous = buttons
+        assert client.predicted == (maverick.x, maverick.y), \
+            "tick %d: predicted %r, host at %r" % (tick, client.predicted, (maverick.x, maverick.y))
+
+def sessionStartHasDifficulty():
+    ''' session_start reports the difficulty set after the Game was made, as the menus set it '''
+
+    (handle, path) = tempfile.mkstemp(suffix=".jsonl")
+    os.close(handle)
+    try:
+        game = mavEngine.Game()
+        game.telemetry = gameEngine.Telemetry(path)
+        game.difficulty = 0.5
+        game.prepare()
+        game.collector.stop()
+        game.telemetry.close()
+
+        with open(path) as stream:
+            events = [json.loads(line) for line in stream]
+        starts = [event for event in events if event["event"] == "session_start"]
+        assert len(starts) == 1, "%d session_start events" % len(starts)
+        assert starts[0]["difficulty"] == 0.5, "session_start reported difficulty %r" % starts[0]["difficulty"]
+    finally:
+        os.remove(path)
+
+CHECKS = {"batchedMatchesScalar": batchedMatchesScalar, "bulletsDrawFromAtlas": bulletsDrawFromAtlas,
+          "killedEnemyStopsFiring": killedEnemyStopsFiring, "levelSpawnsEveryWave": levelSpawnsEveryWave,
+          "levelRejectsBadWaves": levelRejectsBadWaves, "collectorSurvivesCrash": collectorSurvivesCrash,
+          "collectorIsShared": collectorIsShared, "gameWaitsOnPrefetch": gameWaitsOnPrefetch,
+          "partnerPredictsSteer": partnerPredictsSteer,
+          "sessionStartHasDifficulty": sessionStartHasDifficulty}
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Headless engine behaviour checks.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help="checks to run: %s (default: all)" % ", ".join(sorted(CHECKS)))
+    args = parser.parse_args(argv)
+
+    for name in args.names:
+        if name not in CHECKS:
+            parser.error("unknown check %r" % name)
+
+    failures = []
+    for name in args.names or sorted(CHECKS):
+        try:
+            CHECKS[name]()
+        except AssertionError as error:
+            failures.append("%s: %s" % (name, error))
+            print("%-28s FAIL" % name)
+        else:
+            print("%-28s ok" % name)
+
+    for failure in failures:
+        print("FAIL: %s" % failure)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
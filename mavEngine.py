@@ -1,801 +1,1426 @@
-'''
-Title: maverickEngine.py
-Author: Jake Zatecky
-Description:
-    A side-scrolling shooter game engine.
-'''
-
-
-import pygame, gameEngine, random
-
-pygame.init()
-pygame.mixer.init()
-
-
-class Maverick(gameEngine.SuperSprite):
-    '''
-    Main user controlled object in game
-    
-    Notes:
-        - controlled by user through Game class
-        - has explosion sequence for when properly set
-        - maverick flickers when invicible
-    '''
-    
-    def __init__(self, scene, explodeList):
-        
-        gameEngine.SuperSprite.__init__(self, scene)
-        
-        self.loadImages()
-        self.explodeList = explodeList  # received from parent
-        
-        # keeps track of the current animation; useful for explosion
-        self.pause = 0
-        self.frame = 0
-        self.delay = 3      
-        
-        # track's user invincibility as a result of his/her death
-        self.invicPause = 0
-        self.invicDelay = 3
-        self.invicEnd = 0  
-
-        # initial coordinates
-        self.INTIAL_X = 50
-        self.INTIAL_Y = self.scene.size[1] / 2
-        self.x = self.INTIAL_X
-        self.y = self.INTIAL_Y
-        
-        # tracks the swapping of original animation and animation all together
-        self.keepSwapping = True
-        self.stopAnimation = False
-        self.lostGame = False
-        self.invic = False  # invincibility; set true for a short while after revive
-        
-        self.update()  # updates right away    
-    
-    def loadImages(self):
-        ''' simply loading the one image, converting it, and setting it '''
-        
-        self.imgMaster = pygame.image.load("maverick(einhander).png")
-        self.imgMaster = self.imgMaster.convert_alpha()
-        
-        # sets first image
-        self.image = self.imgMaster
-        self.rect = self.image.get_rect()        
-        
-    def update(self):
-        ''' runs every frame; periodic checks '''
-        
-        self.pause += 1
-        
-        # normal, static image
-        if self.pause >= self.delay and self.keepSwapping:
-
-            if self.invic == False:
-                self.image = self.imgMaster;
-                self.rect = self.image.get_rect()
-            # invincible
-            else:
-                
-                self.invicPause += 1
-                
-                # make a visible flicker
-                if self.invicPause == self.invicDelay:
-                    
-                    # user invincibility over
-                    if self.invicEnd == 12:
-                        self.invic = False
-                        self.invicEnd = 0
-                        self.invicPause = 0
-                        
-                    self.image = pygame.Surface((0, 0))
-                    self.invicPause = 0
-                    self.invicEnd += 1             
-                else:
-                    self.image = self.imgMaster;
-                    self.rect = self.image.get_rect()            
-            
-        # explosion; at collision
-        elif self.pause >= self.delay and self.stopAnimation == False:
-            
-            # sets maverick still
-            self.setDX(0)
-            self.setDY(0)
-                
-            # next image in frame sequence
-            self.image = self.explodeList[self.frame]
-            self.rect = self.image.get_rect()
-            
-            self.pause = 0
-            self.frame += 1
-            
-            # done cycling through explosion
-            if self.frame >= len(self.explodeList):
-                # user lost game; halt object and set to nothing
-                if self.lostGame:
-                    self.stopAnimation = True        
-                    self.image = pygame.Surface((0, 0))  # now there is no image
-                # reset maverick's coordinates and start again
-                else:
-                    self.keepSwapping = True
-                    self.invic = True
-                    self.x = self.INTIAL_X
-                    self.y = self.INTIAL_Y                      
-
-        self.calcVector()
-        self.calcPosition()        
-        self.checkBounds()        
-        
-        # actual coordinates; have to do manually since overwrote update method
-        self.rect.left = self.x 
-        self.rect.bottom = self.y
-        
-class Enemy(gameEngine.SuperSprite):
-    ''' 
-    Main sprite to dodge; generated randomly
-    
-    Notes
-        - each choice has different attack speed and look
-        - the enemy supports explosions when contacted with a bullet
-        - outOfBounds removes the sprite when no longer needed
-    '''
-    
-    def __init__(self, scene):
-        
-        gameEngine.SuperSprite.__init__(self, scene)
-        
-        self.loadImages()
-        
-        self.choice = random.randrange(0, 2)  # either 0 or 1
-        
-        self.image = self.enemyList[self.choice]
-        self.rect = self.image.get_rect()       
-        
-        # initial coordinates; based on image height
-        self.x = self.scene.size[0] + self.rect.width
-        self.y = random.randrange(self.rect.height, self.scene.size[1] - self.rect.height)
-        
-        self.setBoundAction(self.CONTINUE)
-        self.setDX(-7)  # speed toward user
-        
-        self.stop = False  # halt all movement
-        self.explode = False  # set explosion sequence
-        self.remove = False  # remove enemy from game
-        
-        # different pauses for different events
-        self.firePause = 0
-        self.movePause = 0
-        self.framePause = 0
-        self.frameDelay = 3
-        
-        self.frame = 0  # explosion frame
-        
-        self.moveRate = 1  # forces a decision at the beginning for which y direction to move
-        
-        # fire rates and initial pause dependent upon which type; choice 1 is the stronger enemy
-        if self.choice == 0:
-            self.fireRate = 45
-            self.pause = 35
-        elif self.choice == 1:
-            self.fireRate = 25
-            self.pause = 20        
-        else:
-            print("Something went wrong...")
-        
-        self.update()  # updates right away
-        
-    def loadImages(self):
-        ''' stores all the converted images in the source image for easy loading; both static image and explosions '''
-        
-        imgMaster = pygame.image.load("enemySheet(gregah.deviantart).png")
-        imgMaster = imgMaster.convert()
-        
-        self.enemyList = []
-        self.explodeList = []
-        
-        self.size = (85, 50)        
-        
-        offset = [(275, 300), (200, 75)]  # offsets of images to strip
-
-        # extracts and converts images
-        for i in range(2):
-            
-            tmpImg = pygame.Surface(self.size)
-            tmpImg.blit(imgMaster, (0, 0), (offset[i], self.size))  # extracts image from master image with given offset and size
-            transColor = tmpImg.get_at((1, 1))  # non-alpha transparency
-            tmpImg.set_colorkey(transColor)
-            
-            self.enemyList.append(tmpImg)
-
-        
-    def outOfBounds(self):
-        ''' merely checks if left the stage to the left; not necessary to check y coordinates'''
-        
-        outOfBounds = False
-        
-        # the object is completely off the stage (width included)
-        if self.x + self.rect.width <= 0:
-            outOfBounds = True
-        
-        return outOfBounds
-    
-    def update(self):
-        
-        self.firePause += 1
-        self.movePause += 1
-        
-        # move object if still set to move and perform other events
-        if self.stop == False:
-            
-            self.x += self.dx
-            self.y += self.dy        
-            
-            self.rect.center = (self.x, self.y)        
-        
-            # fire a bullet (done in the Game class)
-            if self.firePause > self.fireRate:
-                self.firePause = 0
-            
-            # randomly move up, down, or stay still
-            if self.movePause == self.moveRate:
-                
-                choice = random.randrange(0, 3)
-                
-                if choice == 0:
-                    self.setDY(-2)
-                elif choice == 1:
-                    self.setDY(2)
-                else:
-                    self.setDY(0)
-                    
-                self.moveRate = random.randrange(20, 30)
-        
-        # can explode even when set still
-        if self.explode:
-            
-            self.framePause += 1
-            
-            if self.framePause == self.frameDelay:
-                
-                self.framePause = 0                    
-                self.image = self.explodeList[self.frame]                           
-                self.frame += 1                     
-                
-                self.setDX(0)
-                self.setDY(0)                
-                
-                if self.frame >= len(self.explodeList):   
-                    self.image = pygame.Surface((0, 0))  # now there is no image   
-                    self.remove = True
-                    self.explode = False    
-            
-class Bullet(gameEngine.SuperSprite):
-    '''
-    Weapon for both user and enemy sprites
-    
-    Notes:
-        - only difference between the two are the colors and directions
-    '''
-    
-    def __init__(self, scene, x, y, isEnemy=False):
-        
-        gameEngine.SuperSprite.__init__(self, scene)
-        
-        self.size = (4, 4)  # adjust for tastes
-        color = (0, 0, 0)  # different colors if enemy or not
-        
-        self.x = x
-        self.y = y        
-        
-        if isEnemy:
-            color = (255, 0, 0)
-            self.setDX(-9)
-        else:
-            color = (0, 255, 255)
-            self.setDX(8)
-            
-        self.imageMaster = pygame.Surface(self.size)
-        radius = self.size[0] // 2
-        pygame.draw.circle(self.imageMaster, color, (radius, radius), radius)  # places circle at center
-        
-        self.setBoundAction(self.CONTINUE)
-        
-        # updates right away
-        self.update()
-        
-    def outOfBounds(self):
-        ''' merely checks if left the stage to the left or right'''
-        
-        outOfBounds = False
-        
-        # the object is completely off the stage (width included)
-        if self.x <= 0:
-            outOfBounds = True
-        elif self.x >= self.scene.size[1]:
-            outOfBounds = True
-        
-        return outOfBounds        
-        
-class Game(gameEngine.Scene):
-    ''' Main interface through which the user interacts '''
-    
-    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
-        
-        gameEngine.Scene.__init__(self)
-        self.background.fill((0, 0, 0))
-        
-        # color schema
-        self.BUTTON_FG = BUTTON_FG
-        self.BUTTON_BG = BUTTON_BG
-        
-        self.loadExplode()
-        self.maverick = Maverick(self, self.explodeList)
-        
-        self.enemyList = []  # to dodge and shoot
-        self.enemyBulletList = []  # to dodge
-        self.deadList = []  # explosion sequence
-        self.bulletList = []  # user's bullets
-        
-        self.lScore = gameEngine.Label(BUTTON_FG, BUTTON_BG)
-        self.lScore.size = (250, 40)
-        self.lScore.center = (self.size[0] / 2, 465)
-        
-        self.soExplode = pygame.mixer.Sound("explode.ogg")
-        
-        self.maverick.setBoundAction(self.maverick.CONTINUE)  # should not be needed; have just in case        
-        
-        self.sprites = [self.maverick, self.lScore]  # will be blit to the main surface
-        
-        self.delay = 4
-        self.timeDelay = 15  # time before the first enemy appears
-        self.difficulty = 0  # can be set through menu
-        
-        self.pause = 0
-        self.time = 0  
-        self.score = 0
-        self.globalTime = 0
-        self.lives = 5
-        
-        # end state booleans
-        self.lost = False
-        self.exit = False        
-        
-    def checkDestroy(self):
-        ''' checks if user destroyed an enemy and if the enemy has fully exploded '''
-        
-        # user bullet collides with enemy
-        for bullet in self.bulletList:
-            for enemy in self.enemyList:
-                
-                if bullet.collidesWith(enemy):
-                    
-                    # higher score for better enemies
-                    if enemy.choice == 0:
-                        self.score += 50
-                    elif enemy.choice == 1:
-                        self.score += 75
-                    
-                    # remove bullet completly
-                    self.bulletList.remove(bullet)
-                    self.sprites.remove(bullet)
-                    
-                    # set enemy death sequence
-                    enemy.explode = True
-                    self.soExplode.play()                    
-                    self.enemyList.remove(enemy)
-                    self.deadList.append(enemy)
-                    
-                    # clear screen
-                    self.setGroup(self.makeSpriteGroup(self.sprites))    
-                    self.screen.blit(self.background, (0, 0))    
-                    
-        # checks if the explosion on the enemy was complete
-        for enemy in self.deadList:
-            
-            if enemy.remove:
-            
-                # completely remove enemy
-                self.deadList.remove(enemy)
-                self.sprites.remove(enemy)
-                
-                # clear screen
-                self.setGroup(self.makeSpriteGroup(self.sprites))    
-                self.screen.blit(self.background, (0, 0))                  
-                    
-    def checkEnemyFire(self):
-        ''' checks if enemy has fired '''
-        
-        for enemy in self.enemyList:
-            
-            if enemy.firePause == enemy.fireRate:
-                
-                x = enemy.rect.left
-                y = enemy.rect.centery
-                
-                self.fireEnemy(x, y)
-        
-    def checkEvents(self):
-        ''' looks out for some basic events as the game plays out; most disabled when the player loses '''
-        
-        self.pause += 1  
-        self.time += 1      
-        self.globalTime += 1
-
-        self.checkLose()        
-        self.checkTime()
-        self.checkEnemyFire()
-            
-        self.checkOutOfBounds()
-        self.checkDestroy()
-                
-    def checkLose(self):
-        ''' checks all lose possibilities '''
-        
-        # collide with enemy; only occurs if the user did not die recently (keepSwapping)
-        if self.maverick.keepSwapping and self.maverick.invic == False:
-            
-            # enemy collides with user
-            for enemy in self.enemyList:
-                
-                if self.maverick.collidesWith(enemy):
-                    
-                    self.enemyList.remove(enemy)
-                    self.sprites.remove(enemy)
-                    
-                    self.setGroup(self.makeSpriteGroup(self.sprites))    
-                    self.screen.blit(self.background, (0, 0))                      
-                    
-                    self.lose()      
-                    
-            # enemy bullet collides with user                    
-            for enemyBullet in self.enemyBulletList:
-                            
-                if self.maverick.collidesWith(enemyBullet):
-                    
-                    self.enemyBulletList.remove(enemyBullet)
-                    self.sprites.remove(enemyBullet)
-                    
-                    self.setGroup(self.makeSpriteGroup(self.sprites))    
-                    self.screen.blit(self.background, (0, 0))                      
-                    
-                    self.lose()                                  
-                
-    def checkOutOfBounds(self):
-        ''' checks if enemy has left the map or user is on an edge'''
-        
-        for enemy in self.enemyList:
-            if enemy.outOfBounds():
-                self.enemyList.remove(enemy)             
-                self.sprites.remove(enemy)     
-                
-        if self.maverick.x <= 0:
-            self.maverick.x = 0
-            
-        if self.maverick.x >= self.size[0] - self.maverick.rect.width:
-            self.maverick.x = self.size[0] - self.maverick.rect.width
-            
-        if self.maverick.y <= self.maverick.rect.height:
-            self.maverick.y = self.maverick.rect.height
-            
-        if self.maverick.y >= self.size[1]:
-            self.maverick.y = self.size[1]
-            
-    def checkTime(self):
-        ''' generates a new enemy after a certain period of time '''
-        
-        if self.time % self.timeDelay == 0:
-            self.time = 0
-            self.generateEnemy()     
-            
-            # function used to determine the time range given the difficulty
-            timeFxn = int( 37 / (self.difficulty + 1) ) 
-            
-            self.timeDelay = random.randrange(timeFxn - 5, timeFxn + 5)
-        
-        # game becomes harder as the global time
-        if (self.globalTime % 250 == 0):
-            self.difficulty += 0.0625
-            
-    def doEvents(self, event):
-        ''' using event defined in scene class '''
-        
-        # proceeds only if the user did not lose a life recently; user movement
-        if self.maverick.keepSwapping:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_w:
-                    self.maverick.setDY(-4)
-                if event.key == pygame.K_s:
-                    self.maverick.setDY(4)
-                if event.key == pygame.K_a:
-                    self.maverick.setDX(-5)
-                if event.key == pygame.K_d:
-                    self.maverick.setDX(5)
-        
-        if event.type == pygame.KEYUP:
-            
-            # fire a bullet
-            if event.key == pygame.K_SPACE:
-                if self.maverick.keepSwapping:
-                    self.fire()  
-                    
-            # exit game session        
-            if event.key == pygame.K_ESCAPE:
-                self.exit = True   
-                    
-            # stop movement                    
-            if event.key == pygame.K_w:
-                self.maverick.setDY(0)
-            if event.key == pygame.K_s:
-                self.maverick.setDY(0)
-            if event.key == pygame.K_a:
-                self.maverick.setDX(0)
-            if event.key == pygame.K_d:
-                self.maverick.setDX(0)                
-                    
-    def fire(self):
-        ''' fires a projectile from the maverick '''
-        
-        x = int(self.maverick.rect.centerx + 10)
-        y = int(self.maverick.rect.centery + 10)
-        
-        bullet = Bullet(self, x, y)
-        
-        self.bulletList.append(bullet)
-        self.sprites.append(bullet)
-        
-        self.setGroup(self.makeSpriteGroup(self.sprites))    
-        self.screen.blit(self.background, (0, 0))      
-
-    def fireEnemy(self, x, y):        
-        ''' fires a projectile from the enemy '''
-        
-        bullet = Bullet(self, x, y, True)
-        
-        self.enemyBulletList.append(bullet)
-        self.sprites.append(bullet)
-        
-        self.setGroup(self.makeSpriteGroup(self.sprites))    
-        self.screen.blit(self.background, (0, 0))          
-        
-            
-    def generateEnemy(self):
-        ''' generates a new enemy ''' 
-        
-        enemy = Enemy(self)           
-        enemy.explodeList = self.explodeList      
-                    
-        self.enemyList.append(enemy)
-        self.sprites.append(enemy)
-        
-        self.setGroup(self.makeSpriteGroup(self.sprites))  # reset group on scene
-        self.screen.blit(self.background, (0, 0))  # clean scene
-        
-    def loadExplode(self):
-        ''' loads the default explosion set to be used for all objects '''
-        
-        self.explodeList = []
-            
-        imgSize = (64, 64)
-        offset = []
-        
-        imgMaster = pygame.image.load("explosionSheet.png")
-        imgMaster = imgMaster.convert_alpha()  # alpha transparency      
-        
-        for i in range(16):
-            
-            offset.append((i * 64, 128))
-            tmpImg = pygame.Surface(imgSize)
-            tmpImg.blit(imgMaster, (0, 0), (offset[i], imgSize))
-            
-            self.explodeList.append(tmpImg)        
-        
-    def lose(self):
-        ''' makes the user lose a life '''
-        
-        self.soExplode.play()        
-        
-        self.lives -= 1
-        self.lScore.text = "Lives: %d  Score: %d" % (self.lives, self.score)  
-        
-        # preps for the maverick explosion
-        self.maverick.keepSwapping = False
-        self.maverick.frame = 0
-        self.maverick.pause = 0     
-        
-        # game over!
-        if self.lives == 0:
-            self.maverick.lostGame = True
-            self.lost = True
-            self.stopMovement()
-               
-    def stopMovement(self):
-        ''' makes all sprites halt and prevents generation of new enemies '''
-        
-        # stops all moving sprites
-        self.maverick.setSpeed(0)
-        for enemy in self.enemyList:
-            enemy.stop = True
-            
-        for bullet in self.bulletList:
-            bullet.setSpeed(0)
-            
-        for bullet in self.enemyBulletList:
-            bullet.setSpeed(0)
-            
-        # preps for the maverick explosion
-        self.maverick.keepSwapping = False
-        self.maverick.frame = 0
-        self.maverick.pause = 0    
-        
-    def update(self):
-        ''' checks various things; overwrites the inherited scene method '''     
-        
-        if self.lost == False:   
-            self.lScore.text = "Lives: %d  Score: %d" % (self.lives, self.score)  
-            self.checkEvents()
-        # exit game session
-        elif self.exit:
-            self.stop()            
-        
-class Menu(gameEngine.Scene):
-    ''' Menu user interacts with before going ahead '''
-    
-    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
-    
-        gameEngine.Scene.__init__(self)
-        self.background.fill((0, 0, 0))
-        
-        self.BUTTON_FG = BUTTON_FG
-        self.BUTTON_BG = BUTTON_BG
-        
-        self.generateMenuItems()
-        
-        self.startGame = False
-        self.about = False
-        self.settings = False
-        
-        # to be passed to the game
-        self.diff = 0
-            
-    def generateMenuItems(self):
-        ''' creates menu items for user and puts them on the sprite list '''
-        
-        self.title = gameEngine.Label((178, 34, 34), (0, 0, 0))
-        
-        self.title.text = "Maverick"
-        self.title.center = (self.size[0] / 2, 85)
-        self.title.changeFont(35)
-        self.title.size = (200, 30)
-        
-        self.bList = []
-        sButtonText= ["Start", "Settings", "About"]
-        iButtonY = [(self.size[1] / 2) - 30, self.size[1] / 2, (self.size[1] / 2) + 30]
-        
-        ''' generates the menu buttons with everything similar expect text and position '''
-        for i in range(3):
-            button = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
-            button.text = sButtonText[i]
-            y = iButtonY[i]
-            
-            button.center = (self.size[0] / 2, y)
-            self.bList.append(button)
-            
-        # compiles sprite list 
-        self.sprites = [self.title]   
-        
-        for button in self.bList:
-            self.sprites.append(button)
-            
-    def reset(self):
-        self.startGame = False
-        self.about = False
-        
-    def update(self):
-        
-        # start game
-        if self.bList[0].clicked:
-            self.startGame = True
-            self.stop()        
-        elif self.bList[1].clicked:
-            self.settings = True
-            self.stop()
-        elif self.bList[2].clicked:
-            self.about = True
-            self.stop()
-        
-class Settings(gameEngine.Scene):
-    ''' Provides some options for the user '''
-    
-    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
-    
-        gameEngine.Scene.__init__(self)
-        self.background.fill((0, 0, 0))
-
-        self.BUTTON_FG = BUTTON_FG
-        self.BUTTON_BG = BUTTON_BG
-        
-        self.generateMenuItems()
-        
-    def generateMenuItems(self):
-        
-        self.title = gameEngine.Label((178, 34, 34) , (0, 0, 0))
-        self.title.text = "Settings"
-        self.title.changeFont(35)
-        self.title.size = (200, 60)
-        self.title.center = (self.size[0] / 2, 85)       
-        
-        self.lDiff = gameEngine.Label(self.BUTTON_FG, self.BUTTON_BG)
-        self.lDiff.text = "Difficulty"
-        self.lDiff.center = (self.size[0] / 2, (self.size[1] / 2) - (self.lDiff.size[1] / 2))
-        
-        self.sDiff = gameEngine.Scroller(0, 16, 1, self.BUTTON_FG, self.BUTTON_BG)
-        self.sDiff.center = (self.size[0] / 2, (self.size[1] / 2) + (self.lDiff.size[1] / 2))
-        
-        self.back = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
-        self.back.text = "Back"
-        self.back.center = (self.size[0] / 2, (self.size[1] / 2) + self.sDiff.size[1] + 80)
-        
-        self.sprites = [self.title, self.lDiff, self.sDiff, self.back]
-        
-    def update(self):
-        
-        # the difficulty is done really in 1/16 increments
-        self.diff = self.sDiff.value / 16
-        
-        if self.back.clicked:
-            self.stop()
-            
-
-class About(gameEngine.Scene):
-    ''' Tells user about the game'''
-    
-    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
-    
-        gameEngine.Scene.__init__(self)
-        self.background.fill((0, 0, 0))
-        
-        self.BUTTON_FG = BUTTON_FG
-        self.BUTTON_BG = BUTTON_BG        
-        
-        self.generateMenuItems()
-            
-    def generateMenuItems(self):
-        self.title = gameEngine.Label((178, 34, 34), (0, 0, 0))
-        self.title.text = "About"
-        self.title.center = (self.size[0] / 2, 85)
-        self.title.changeFont(35)
-        self.title.size = (200, 60)        
-        
-        self.about = gameEngine.MultiLabel(self.BUTTON_FG, self.BUTTON_BG)
-        self.about.changeFont(15);  
-        self.about.textLines = ["Maverick is a simple side-scroller shooter.",
-                                "Use WASD to move, SPACE to fire, and ESC once dead.", "Your maverick will be invicible shortly after death.", "",
-                                "Author: Jake Zatecky"]
-        self.about.center = (self.size[0] / 2, self.size[1] / 2)
-        self.about.size = (500, 35 * 5)
-        
-        self.back = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
-        self.back.text = "Back"
-        self.back.center = (self.size[0] / 2, (self.size[1] / 2) + self.about.size[1] + 40)
-        
-        self.sprites = [self.title, self.about, self.back]
-        
-    def update(self):
-        if self.back.clicked:
-            self.stop()
-        
-def main():
-    pygame.display.set_caption("Maverick")
-    
-    keepGoing= True
-    
-    while keepGoing:
-        game = Game()
-        game.start()
-            
-        if game.exitProgram:
-            keepGoing = False
-
-if __name__ == "__main__":
-    main()
-                
+'''
+Title: maverickEngine.py
+Author: Jake Zatecky
+Description:
+    A side-scrolling shooter game engine.
+'''
+
+
+import pygame, gameEngine, heapq, json, math, random, struct, time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # optional; only Game.entityState needs it
+
+pygame.init()
+pygame.mixer.init()
+
+atlas = None  # shared by every scene; see loadAtlas
+
+# files the atlas is packed from, and the rest a Game needs
+ATLAS_FILES = ("enemySheet(gregah.deviantart).png", "explosionSheet.png", 
+               "maverick(einhander).png")
+GAME_FILES = ("explode.ogg",)
+
+# the name the packed atlas is loaded under by gameEngine.assets
+ATLAS = "mavEngine.atlas"
+
+# held buttons for players without a keyboard; see Game.steer
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_FIRE = 16
+
+# enemy fire; see gameEngine.BulletPattern for the keys
+PATTERNS = {
+    "straight": {"speed": 9},
+    "spread": {"count": 3, "spread": 30, "speed": 8},
+    "aimedBurst": {"angle": "aim", "count": 2, "spread": 8, "speed": 9, "volleys": 3, "interval": 4},
+    "ring": {"count": 12, "spread": 360, "speed": 5},
+    "spiral": {"count": 4, "spread": 360, "speed": 5, "volleys": 8, "interval": 3, "turn": 11},
+}
+
+# enemy types; an enemy's choice indexes this list
+#   image: frame of the atlas "enemy" list
+#   speed: pixels per frame toward the player
+#   fireRate: frames between firings; pause: initial pause
+#   score: points for a kill
+#   path: how it moves up and down; one of PATHS
+#   patterns: pattern fired, one per whole step of difficulty (the last repeats)
+ARCHETYPES = [
+    {"name": "scout", "image": 0, "speed": 7, "fireRate": 45, "pause": 35, "score": 50, "path": "wander",
+     "patterns": ("straight", "straight", "spread", "aimedBurst", "ring")},
+    {"name": "gunship", "image": 1, "speed": 7, "fireRate": 25, "pause": 20, "score": 75, "path": "wander",
+     "patterns": ("straight", "spread", "aimedBurst", "spiral", "spiral")},
+    {"name": "dart", "image": 0, "speed": 11, "fireRate": 60, "pause": 40, "score": 30, "path": "straight",
+     "patterns": ("straight",)},
+    {"name": "weaver", "image": 1, "speed": 5, "fireRate": 35, "pause": 25, "score": 100, "path": "sine",
+     "patterns": ("spread", "spread", "aimedBurst", "ring")},
+]
+ARCHETYPE_INDEX = dict((archetype["name"], i) for (i, archetype) in enumerate(ARCHETYPES))
+
+# the first two turn up at random; the rest only through level scripts
+RANDOM_ARCHETYPES = 2
+
+# ways an enemy moves up and down: wander picks a random dy now and then, 
+# straight keeps level, sine weaves SINE_AMPLITUDE pixels a frame at most every SINE_PERIOD frames
+PATHS = ("wander", "straight", "sine")
+SINE_AMPLITUDE = 3
+SINE_PERIOD = 60
+
+# the menus wait up to this many ms for input between frames; see Scene.idleTimeout
+MENU_IDLE_TIMEOUT = 500
+
+
+def prefetchGame():
+    ''' starts loading everything a Game needs in the background, packing the atlas too; returns the futures '''
+    
+    futures = []
+    if atlas is None:
+        futures.append(fetchAtlas())
+    return futures + [gameEngine.assets.fetch(name) for name in GAME_FILES]
+
+
+def fetchAtlas():
+    ''' starts packing the atlas on the asset threads, once the display is set; returns the Future
+        its files are queued first, so the packing never waits on a load queued behind it
+    '''
+    
+    for name in ATLAS_FILES:
+        gameEngine.assets.fetch(name)
+    return gameEngine.assets.fetch(ATLAS, packAtlas)
+
+
+def loadAtlas():
+    ''' the one atlas every frame the game draws is packed into; waits for it if it is still being packed '''
+    
+    global atlas
+    
+    if atlas is None:
+        atlas = fetchAtlas().result()
+        
+        # kept here from now on; the files it was packed from are not needed again
+        for name in ATLAS_FILES + (ATLAS,):
+            gameEngine.assets.discard(name)
+        
+    return atlas
+
+
+def packAtlas(key=ATLAS):
+    ''' packs the atlas from the loaded ATLAS_FILES; the asset loader for ATLAS '''
+    
+    packed = gameEngine.Atlas()
+    
+    # enemies; non-alpha transparency taken from a corner pixel
+    enemySheet = gameEngine.assets.get("enemySheet(gregah.deviantart).png").convert()
+    offset = [(275, 300), (200, 75)]  # offsets of images to strip
+    for i in range(2):
+        tmpImg = enemySheet.subsurface((offset[i], (85, 50)))
+        tmpImg.set_colorkey(tmpImg.get_at((1, 1)))
+        packed.add("enemy%d" % i, tmpImg)
+        
+    # explosion sequence; drawn on black like the rest of the frames
+    explodeSheet = gameEngine.assets.get("explosionSheet.png").convert_alpha()
+    for i in range(16):
+        tmpImg = pygame.Surface((64, 64))
+        tmpImg.blit(explodeSheet, (0, 0), ((i * 64, 128), (64, 64)))
+        packed.add("explode%d" % i, tmpImg)
+    
+    packed.add("maverick", gameEngine.assets.get("maverick(einhander).png").convert_alpha())
+    
+    # bullets; only difference between the two is the color
+    for (name, color) in (("bullet", (0, 255, 255)), ("enemyBullet", (255, 0, 0))):
+        tmpImg = pygame.Surface((4, 4))
+        pygame.draw.circle(tmpImg, color, (2, 2), 2)
+        packed.add(name, tmpImg)
+    
+    packed.build()
+    return packed
+
+
+def readWaves(path):
+    '''
+    yields the waves of a level file one at a time, reading the file as it goes
+
+    a level file has one wave per line, as a JSON object, in order of "at";
+    blank lines and lines starting with # are skipped. Keys:
+        at: tick (frames since the game started, from 0) of the first spawn
+        enemy: archetype name, see ARCHETYPES
+        count: enemies in the wave (1)
+        spacing: ticks between them (10)
+        y: a y coordinate for all, or a list with one per enemy (random)
+        path, fireRate, speed: override the archetype's
+    a malformed wave raises ValueError naming the file and line
+    '''
+    
+    last = 0
+    with open(path) as stream:
+        for (number, line) in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            
+            try:
+                wave = json.loads(line)
+                if wave["enemy"] not in ARCHETYPE_INDEX:
+                    raise ValueError("unknown enemy %r" % wave["enemy"])
+                if wave.get("path", "wander") not in PATHS:
+                    raise ValueError("unknown path %r" % wave["path"])
+                if not isInteger(wave["at"]) or wave["at"] < 0:
+                    raise ValueError("at must be a tick, not %r" % (wave["at"],))
+                if wave["at"] < last:
+                    raise ValueError("waves out of order")
+                
+                count = wave.get("count", 1)
+                if not isInteger(count) or count < 1:
+                    raise ValueError("count must be a whole number above 0, not %r" % (count,))
+                for key in ("spacing", "fireRate"):
+                    if key in wave and (not isInteger(wave[key]) or wave[key] < 0):
+                        raise ValueError("%s must be a whole number of ticks, not %r" % (key, wave[key]))
+                if "speed" in wave and (not isNumber(wave["speed"]) or wave["speed"] < 0):
+                    raise ValueError("speed must be a number of pixels, not %r" % (wave["speed"],))
+                
+                ys = wave.get("y")
+                if isinstance(ys, list):
+                    if len(ys) != count:
+                        raise ValueError("y lists %d positions for %d enemies" % (len(ys), count))
+                else:
+                    ys = [ys]
+                if not all(y is None or isNumber(y) for y in ys):
+                    raise ValueError("y must be a number, a list of them or null, not %r" % (wave["y"],))
+            except (ValueError, KeyError, TypeError) as error:
+                raise ValueError("%s:%d: %s" % (path, number, error))
+            
+            last = wave["at"]
+            yield wave
+
+
+def isNumber(value):
+    ''' True for a JSON number; bool is an int to Python, but not to a level file '''
+    
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def isInteger(value):
+    ''' True for a whole JSON number '''
+    
+    return isNumber(value) and value == int(value)
+
+
+class LevelScript(object):
+    '''
+    spawns enemies from a level file, streamed
+
+    Waves are read from readWaves only as their time comes
+    within lookahead ticks, and a wave only becomes pending
+    spawns then, so a long level costs no more memory than a
+    few seconds of it.
+    '''
+    
+    def __init__(self, path, lookahead=90):
+        self.path = path
+        self.lookahead = lookahead
+        self.seek(0)
+        
+    def seek(self, tick):
+        ''' starts over and skips the spawns before tick, e.g. after a restore '''
+        
+        self.waves = readWaves(self.path)
+        self.nextWave = next(self.waves, None)
+        self.pending = []  # heap of (tick, order, spawn)
+        self.order = 0  # keeps spawns due on the same tick in file order
+        for spawn in self.due(tick - 1):
+            pass
+        
+    @property
+    def finished(self):
+        return self.nextWave is None and not self.pending
+        
+    def due(self, tick):
+        ''' yields the Enemy arguments of every spawn due by tick '''
+        
+        # waves starting within the lookahead become pending spawns
+        while self.nextWave is not None and self.nextWave["at"] <= tick + self.lookahead:
+            wave = self.nextWave
+            count = wave.get("count", 1)
+            ys = wave.get("y")
+            if not isinstance(ys, list):
+                ys = [ys] * count
+            
+            for i in range(count):
+                spawn = {"choice": ARCHETYPE_INDEX[wave["enemy"]], "y": ys[i], "path": wave.get("path"),
+                         "fireRate": wave.get("fireRate"), "speed": wave.get("speed")}
+                heapq.heappush(self.pending, (wave["at"] + i * wave.get("spacing", 10), self.order, spawn))
+                self.order += 1
+            self.nextWave = next(self.waves, None)
+        
+        while self.pending and self.pending[0][0] <= tick:
+            yield heapq.heappop(self.pending)[2]
+
+
+class Maverick(gameEngine.SuperSprite):
+    '''
+    Main user controlled object in game
+    
+    Notes:
+        - controlled by user through Game class
+        - has explosion sequence for when properly set
+        - maverick flickers when invicible
+    '''
+    
+    def __init__(self, scene, explodeList):
+        
+        gameEngine.SuperSprite.__init__(self, scene)
+        self.setMotion(self.VECTOR)  # moved through dx and dy only
+        
+        self.loadImages()
+        self.explodeList = explodeList  # received from parent
+        
+        # keeps track of the current animation; useful for explosion
+        self.pause = 0
+        self.frame = 0
+        self.delay = 3      
+        
+        # track's user invincibility as a result of his/her death
+        self.invicPause = 0
+        self.invicDelay = 3
+        self.invicEnd = 0  
+
+        # initial coordinates
+        self.INTIAL_X = 50
+        self.INTIAL_Y = self.scene.size[1] / 2
+        self.x = self.INTIAL_X
+        self.y = self.INTIAL_Y
+        
+        # tracks the swapping of original animation and animation all together
+        self.keepSwapping = True
+        self.stopAnimation = False
+        self.lostGame = False
+        self.invic = False  # invincibility; set true for a short while after revive
+        
+        self.update()  # updates right away    
+    
+    def loadImages(self):
+        ''' simply taking the one image from the atlas and setting it '''
+        
+        self.imgMaster = loadAtlas().get("maverick")
+        
+        # sets first image
+        self.image = self.imgMaster
+        self.rect = self.image.get_rect()        
+        
+    def update(self):
+        ''' runs every frame; periodic checks '''
+        
+        self.pause += 1
+        
+        # normal, static image
+        if self.pause >= self.delay and self.keepSwapping:
+
+            if self.invic == False:
+                self.image = self.imgMaster;
+                self.rect = self.image.get_rect()
+            # invincible
+            else:
+                
+                self.invicPause += 1
+                
+                # make a visible flicker
+                if self.invicPause == self.invicDelay:
+                    
+                    # user invincibility over
+                    if self.invicEnd == 12:
+                        self.invic = False
+                        self.invicEnd = 0
+                        self.invicPause = 0
+                        
+                    self.image = pygame.Surface((0, 0))
+                    self.invicPause = 0
+                    self.invicEnd += 1             
+                else:
+                    self.image = self.imgMaster;
+                    self.rect = self.image.get_rect()            
+            
+        # explosion; at collision
+        elif self.pause >= self.delay and self.stopAnimation == False:
+            
+            # sets maverick still
+            self.setDX(0)
+            self.setDY(0)
+                
+            # next image in frame sequence
+            self.image = self.explodeList[self.frame]
+            self.rect = self.image.get_rect()
+            
+            self.pause = 0
+            self.frame += self.scene.governor.explosionStep  # skips frames under load
+            
+            # done cycling through explosion
+            if self.frame >= len(self.explodeList):
+                # user lost game; halt object and set to nothing
+                if self.lostGame:
+                    self.stopAnimation = True        
+                    self.image = pygame.Surface((0, 0))  # now there is no image
+                # reset maverick's coordinates and start again
+                else:
+                    self.keepSwapping = True
+                    self.invic = True
+                    self.x = self.INTIAL_X
+                    self.y = self.INTIAL_Y                      
+
+        self.calcVector()
+        self.calcPosition()        
+        self.checkBounds()        
+        
+        # actual coordinates; have to do manually since overwrote update method
+        self.rect.left = self.x 
+        self.rect.bottom = self.y
+        
+class Enemy(gameEngine.SuperSprite):
+    ''' 
+    Main sprite to dodge; generated randomly
+    
+    Notes
+        - each choice is one of ARCHETYPES: look, speed, path and fire
+        - the enemy supports explosions when contacted with a bullet
+        - outOfBounds removes the sprite when no longer needed
+        - level scripts can set y, path, fireRate and speed; the archetype fills in the rest
+    '''
+    
+    def __init__(self, scene, choice=None, y=None, path=None, fireRate=None, speed=None):
+        
+        gameEngine.SuperSprite.__init__(self, scene)
+        
+        self.loadImages()
+        
+        if choice is None:
+            choice = self.scene.rng.randrange(0, RANDOM_ARCHETYPES)
+        self.choice = choice
+        archetype = ARCHETYPES[choice]
+        
+        self.image = self.enemyList[archetype["image"]]
+        self.rect = self.image.get_rect()       
+        
+        # initial coordinates; based on image height
+        self.x = self.scene.size[0] + self.rect.width
+        if y is None:
+            y = self.scene.rng.randrange(self.rect.height, self.scene.size[1] - self.rect.height)
+        self.y = y
+        
+        self.setBoundAction(self.CONTINUE)
+        if speed is None:
+            speed = archetype["speed"]
+        if path is None:
+            path = archetype["path"]
+        self.setDX(-speed)  # speed toward user
+        self.path = path
+        
+        self.stop = False  # halt all movement
+        self.explode = False  # set explosion sequence
+        self.remove = False  # remove enemy from game
+        
+        # different pauses for different events
+        self.firePause = 0
+        self.movePause = 0
+        self.framePause = 0
+        self.frameDelay = 3
+        
+        self.frame = 0  # explosion frame
+        
+        self.moveRate = 1  # forces a decision at the beginning for which y direction to move
+        
+        # fire rates and initial pause dependent upon which type
+        if fireRate is None:
+            fireRate = archetype["fireRate"]
+        self.fireRate = fireRate
+        self.pause = archetype["pause"]
+        
+        self.update()  # updates right away
+        
+    def loadImages(self):
+        ''' takes both the static images and explosions from the shared atlas '''
+        
+        self.enemyList = loadAtlas().getList("enemy")
+        self.explodeList = loadAtlas().getList("explode")
+        
+    def outOfBounds(self):
+        ''' merely checks if left the stage to the left; not necessary to check y coordinates'''
+        
+        outOfBounds = False
+        
+        # the object is completely off the stage (width included)
+        if self.x + self.rect.width <= 0:
+            outOfBounds = True
+        
+        return outOfBounds
+    
+    def update(self):
+        
+        self.firePause += 1
+        self.movePause += 1
+        
+        # move object if still set to move and perform other events
+        if self.stop == False:
+            
+            self.x += self.dx
+            self.y += self.dy        
+            
+            self.rect.center = (self.x, self.y)        
+        
+            # fire a bullet (done in the Game class)
+            if self.firePause > self.fireRate:
+                self.firePause = 0
+            
+            # randomly move up, down, or stay still
+            if self.path == "wander" and self.movePause == self.moveRate:
+                
+                choice = self.scene.rng.randrange(0, 3)
+                
+                if choice == 0:
+                    self.setDY(-2)
+                elif choice == 1:
+                    self.setDY(2)
+                else:
+                    self.setDY(0)
+                    
+                self.moveRate = self.scene.rng.randrange(20, 30)
+                
+            # weave about the starting line
+            elif self.path == "sine":
+                self.setDY(SINE_AMPLITUDE * math.cos(2 * math.pi * self.movePause / SINE_PERIOD))
+        
+        # can explode even when set still
+        if self.explode:
+            
+            self.framePause += 1
+            
+            if self.framePause == self.frameDelay:
+                
+                self.framePause = 0                    
+                self.image = self.explodeList[self.frame]                           
+                self.frame += self.scene.governor.explosionStep  # skips frames under load
+                
+                self.setDX(0)
+                self.setDY(0)                
+                
+                if self.frame >= len(self.explodeList):   
+                    self.endExplosion()
+    
+    def endExplosion(self):
+        ''' finishes the explosion sequence; the Game removes the enemy afterwards '''
+        
+        self.image = pygame.Surface((0, 0))  # now there is no image   
+        self.remove = True
+        self.explode = False    
+        self.sleep()  # nothing left to update; the Game removes it next tick
+            
+class Bullet(gameEngine.SuperSprite):
+    '''
+    Weapon for both user and enemy sprites
+    
+    Notes:
+        - only difference between the two are the colors and directions
+    '''
+    
+    def __init__(self, scene, x, y, isEnemy=False, velocity=None):
+        
+        gameEngine.SuperSprite.__init__(self, scene)
+        self.setMotion(self.VECTOR)  # flies straight; no angles needed
+        
+        self.size = (4, 4)  # matches the atlas frames
+        
+        self.x = x
+        self.y = y        
+        
+        # different images if enemy or not
+        if isEnemy:
+            self.imageMaster = loadAtlas().get("enemyBullet")
+            self.setDX(-9)
+        else:
+            self.imageMaster = loadAtlas().get("bullet")
+            self.setDX(8)
+            
+        # (dx, dy) for anything but straight ahead
+        if velocity is not None:
+            (self.dx, self.dy) = velocity
+        
+        self.setBoundAction(self.CONTINUE)
+        
+        # updates right away
+        self.update()
+        
+    def outOfBounds(self):
+        ''' checks if left the stage on any side; patterns fire up and down too '''
+        
+        outOfBounds = False
+        
+        # the object is completely off the stage (width included)
+        if self.x <= 0:
+            outOfBounds = True
+        elif self.x >= self.scene.size[0]:
+            outOfBounds = True
+        elif self.y <= 0:
+            outOfBounds = True
+        elif self.y - self.rect.height >= self.scene.size[1]:
+            outOfBounds = True
+        
+        return outOfBounds        
+        
+class Game(gameEngine.Scene):
+    ''' Main interface through which the user interacts '''
+    
+    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
+        
+        gameEngine.Scene.__init__(self)
+        self.background.fill((0, 0, 0))
+        
+        # color schema
+        self.BUTTON_FG = BUTTON_FG
+        self.BUTTON_BG = BUTTON_BG
+        
+        self.rng = random.Random()  # all game randomness; part of every snapshot
+        self.rewind = None  # RewindBuffer of recent snapshots; see enableRewind
+        self.entityBuffer = None  # rows handed out by entityState
+        self.level = None  # LevelScript the enemies come from; see loadLevel
+        
+        self.loadExplode()  # waits on the atlas if the menus are still packing it
+        self.maverick = Maverick(self, self.explodeList)
+        
+        # every maverick, enemy and bullet; enemyList and friends are views of it
+        self.registry = gameEngine.EntityRegistry(self.KINDS)
+        
+        self.lScore = gameEngine.Label(BUTTON_FG, BUTTON_BG)
+        self.lScore.size = (250, 40)
+        self.lScore.center = (self.size[0] / 2, self.size[1] - 15)
+        
+        self.soExplode = gameEngine.assets.get("explode.ogg")  # prefetched by the menus
+        
+        self.particles = gameEngine.ParticleSystem(self)  # debris on every explosion
+        self.emitter = gameEngine.PatternEmitter(PATTERNS, self.spawnEnemyBullets)  # enemy fire
+        
+        self.maverick.setBoundAction(self.maverick.CONTINUE)  # should not be needed; have just in case        
+        
+        self.registry.add(self.maverick, "player")
+        self.registry.group.add(self.lScore)  # drawn with the entities, below them
+        self.groups = [self.registry.group]  # will be blit to the main surface
+        self.sprites = []  # nothing else to draw
+        self.players = [self.maverick]  # more join through addPlayer
+        
+        self.delay = 4
+        self.timeDelay = 15  # time before the first enemy appears
+        self.difficulty = 0  # can be set through menu
+        
+        self.pause = 0
+        self.time = 0  
+        self.score = 0
+        self.globalTime = 0
+        self.lives = 5
+        
+        # end state booleans
+        self.lost = False
+        self.exit = False        
+        
+        # session totals; reported when the session ends
+        self.enemiesSpawned = 0
+        self.enemiesKilled = 0
+        self.bulletsFired = 0
+        self.enemyBulletsFired = 0
+        self.livesLost = 0
+        self.peakSprites = 0
+    
+    # registry kinds; "dead" are enemies still exploding
+    KINDS = ("player", "enemy", "dead", "bullet", "enemyBullet")
+    
+    # read only views of the registry, oldest first
+    @property
+    def enemyList(self):
+        return self.registry.list("enemy")  # to dodge and shoot
+    
+    @property
+    def enemyBulletList(self):
+        return self.registry.list("enemyBullet")  # to dodge
+    
+    @property
+    def deadList(self):
+        return self.registry.list("dead")  # explosion sequence
+    
+    @property
+    def bulletList(self):
+        return self.registry.list("bullet")  # user's bullets
+        
+    def addPlayer(self):
+        ''' adds another maverick, e.g. for a networked partner; steer it with steer() '''
+        
+        maverick = Maverick(self, self.explodeList)
+        maverick.setBoundAction(maverick.CONTINUE)
+        
+        # start below the other players
+        maverick.INTIAL_Y += 60 * len(self.players)
+        maverick.y = maverick.INTIAL_Y
+        
+        self.registry.add(maverick, "player")
+        self.players.append(maverick)
+        return maverick
+        
+    # snapshot layout; all little-endian, no surfaces, images are rebuilt on restore
+    SNAP_HEADER = struct.Struct("<4sBiiiiidii??BHIH")
+    SNAP_MAVERICK = struct.Struct("<Iddddiiiii????")
+    SNAP_ENEMY = struct.Struct("<BIBddddiiiiiiii???hhB")
+    SNAP_BULLET = struct.Struct("<BIdddd")
+    SNAP_FIRING = struct.Struct("<BIbii")
+    SNAP_RNG = struct.Struct("<i625I?d")
+    SNAP_VERSION = 5
+    
+    # entity kinds in a snapshot
+    SNAP_KINDS = ("enemy", "dead", "bullet", "enemyBullet")
+        
+    def snapshot(self):
+        ''' packs the whole simulation into bytes: counters, maverick, every entity and the rng '''
+        
+        header = self.SNAP_HEADER
+        
+        parts = [None]
+        for maverick in self.players:
+            parts.append(self.SNAP_MAVERICK.pack(
+                maverick.entityId, maverick.x, maverick.y, maverick.dx, maverick.dy,
+                maverick.pause, maverick.frame, maverick.delay, maverick.invicPause, maverick.invicEnd,
+                maverick.keepSwapping, maverick.stopAnimation, maverick.lostGame, maverick.invic))
+        
+        # entities in group order, so update and draw order survive a restore
+        count = 0
+        for sprite in self.registry.group:
+            kind = getattr(sprite, "kind", "player")
+            if kind == "player" or sprite.dying:
+                continue
+            kind = self.SNAP_KINDS.index(kind)
+            count += 1
+            
+            if kind < 2:
+                parts.append(self.SNAP_ENEMY.pack(
+                    kind, sprite.entityId, sprite.choice, sprite.x, sprite.y, sprite.dx, sprite.dy,
+                    sprite.firePause, sprite.movePause, sprite.framePause, sprite.frame,
+                    sprite.moveRate, sprite.fireRate, sprite.pause, sprite.frameDelay,
+                    sprite.stop, sprite.explode, sprite.remove, 
+                    sprite.rect.centerx, sprite.rect.centery, PATHS.index(sprite.path)))
+            else:
+                parts.append(self.SNAP_BULLET.pack(kind, sprite.entityId, sprite.x, sprite.y, sprite.dx, sprite.dy))
+        
+        # firings still going: pattern, source, target player, progress
+        patterns = sorted(self.emitter.patterns)
+        firings = [firing for firing in self.emitter.firings if not firing[1].dying]
+        for (pattern, source, target, tick, volley) in firings:
+            targetIndex = self.players.index(target) if target in self.players else -1
+            parts.append(self.SNAP_FIRING.pack(patterns.index(pattern.name), source.entityId,
+                                               targetIndex, tick, volley))
+        
+        (version, state, gauss) = self.rng.getstate()
+        parts.append(self.SNAP_RNG.pack(version, *state, gauss is not None, gauss or 0.0))
+        
+        parts[0] = header.pack(b"MAVS", self.SNAP_VERSION, self.pause, self.time, self.score, self.globalTime, 
+                               self.lives, self.difficulty, self.timeDelay, self.delay, 
+                               self.lost, self.exit, len(self.players), count, self.registry.nextId,
+                               len(firings))
+        return b"".join(parts)
+    
+    def restore(self, data):
+        ''' returns the game to a state made by snapshot(); existing sprites are reused where possible '''
+        
+        offset = 0
+        (magic, version, self.pause, self.time, self.score, self.globalTime, self.lives, 
+         self.difficulty, self.timeDelay, self.delay, self.lost, self.exit, 
+         playerCount, count, nextId, firingCount) = self.SNAP_HEADER.unpack_from(data, offset)
+        offset += self.SNAP_HEADER.size
+        
+        if magic != b"MAVS" or version != self.SNAP_VERSION:
+            raise ValueError("not a maverick snapshot")
+        
+        # sprites from the current state, reused before making new ones
+        enemyPool = self.registry.list("enemy") + self.registry.list("dead")
+        bulletPool = {False: self.registry.list("bullet"), True: self.registry.list("enemyBullet")}
+        
+        while len(self.players) < playerCount:
+            self.addPlayer()
+        del self.players[playerCount:]
+        self.registry.clear()
+        
+        for maverick in self.players:
+            (entityId, maverick.x, maverick.y, maverick.dx, maverick.dy,
+             maverick.pause, maverick.frame, maverick.delay, maverick.invicPause, maverick.invicEnd,
+             maverick.keepSwapping, maverick.stopAnimation, maverick.lostGame, 
+             maverick.invic) = self.SNAP_MAVERICK.unpack_from(data, offset)
+            offset += self.SNAP_MAVERICK.size
+            self.registry.add(maverick, "player", entityId)
+            
+            if maverick.stopAnimation:
+                maverick.image = pygame.Surface((0, 0))
+            elif maverick.keepSwapping == False and maverick.frame > 0:
+                maverick.image = self.explodeList[min(maverick.frame, len(self.explodeList)) - 1]
+            else:
+                maverick.image = maverick.imgMaster
+            maverick.rect = maverick.image.get_rect()
+            maverick.rect.left = maverick.x
+            maverick.rect.bottom = maverick.y
+        
+        for i in range(count):
+            kind = data[offset]
+            
+            if kind < 2:
+                if enemyPool:
+                    enemy = enemyPool.pop()
+                else:
+                    enemy = Enemy(self)
+                    enemy.explodeList = self.explodeList
+                    
+                (kind, entityId, enemy.choice, enemy.x, enemy.y, enemy.dx, enemy.dy,
+                 enemy.firePause, enemy.movePause, enemy.framePause, enemy.frame,
+                 enemy.moveRate, enemy.fireRate, enemy.pause, enemy.frameDelay,
+                 enemy.stop, enemy.explode, enemy.remove, 
+                 centerx, centery, path) = self.SNAP_ENEMY.unpack_from(data, offset)
+                offset += self.SNAP_ENEMY.size
+                enemy.updateVector()  # speed and direc to match
+                enemy.path = PATHS[path]
+                
+                if enemy.remove:
+                    enemy.image = pygame.Surface((0, 0))
+                elif enemy.frame > 0:
+                    enemy.image = self.explodeList[min(enemy.frame, len(self.explodeList)) - 1]
+                else:
+                    enemy.image = enemy.enemyList[ARCHETYPES[enemy.choice]["image"]]
+                enemy.rect = enemy.image.get_rect()
+                enemy.rect.center = (centerx, centery)
+                entity = enemy
+            else:
+                (kind, entityId, x, y, dx, dy) = self.SNAP_BULLET.unpack_from(data, offset)
+                offset += self.SNAP_BULLET.size
+                
+                isEnemy = kind == 3
+                if bulletPool[isEnemy]:
+                    bullet = bulletPool[isEnemy].pop()
+                else:
+                    bullet = Bullet(self, x, y, isEnemy)
+                    
+                (bullet.x, bullet.y, bullet.dx, bullet.dy) = (x, y, dx, dy)
+                bullet.rect.left = bullet.x
+                bullet.rect.bottom = bullet.y
+                entity = bullet
+            
+            self.registry.add(entity, self.SNAP_KINDS[kind], entityId)
+            if kind < 2 and entity.remove:
+                entity.sleep()  # finished exploding, as in endExplosion
+        self.registry.nextId = nextId
+        
+        patterns = sorted(self.emitter.patterns)
+        self.emitter.clear()
+        for i in range(firingCount):
+            (pattern, sourceId, targetIndex, tick, volley) = self.SNAP_FIRING.unpack_from(data, offset)
+            offset += self.SNAP_FIRING.size
+            
+            target = self.players[targetIndex] if targetIndex >= 0 else None
+            self.emitter.firings.append([self.emitter.patterns[patterns[pattern]], 
+                                         self.registry.get(sourceId), target, tick, volley])
+        
+        # last, so making new sprites above cannot disturb it
+        values = self.SNAP_RNG.unpack_from(data, offset)
+        gauss = None
+        if values[626]:
+            gauss = values[627]
+        self.rng.setstate((values[0], values[1:626], gauss))
+        
+        # the level stream cannot go back; it is read again up to now
+        if self.level is not None:
+            self.level.seek(self.globalTime)
+        
+        self.lScore.text = "Lives: %d  Score: %d" % (self.lives, self.score)  
+        
+    def loadLevel(self, path):
+        ''' spawns enemies from the level file at path (see readWaves) instead of at random '''
+        
+        self.level = LevelScript(path)
+        self.level.seek(self.globalTime)
+        
+    def enableRewind(self, seconds=5, slotSize=65536):
+        ''' keeps a snapshot of every tick for the last few seconds; BACKSPACE rewinds one second '''
+        
+        self.rewind = gameEngine.RewindBuffer(int(seconds * self.fps), slotSize)
+        
+    def rewindBy(self, ticks):
+        ''' restores the state from the given number of ticks ago (or the oldest kept) '''
+        
+        data = self.rewind.rewind(ticks)
+        if data is not None:
+            self.restore(data)
+        
+    def checkDestroy(self):
+        ''' checks if user destroyed an enemy and if the enemy has fully exploded '''
+        
+        enemies = self.registry.index["enemy"]
+        
+        # user bullet collides with enemy; the first enemy it touches takes the hit
+        for bullet in self.bulletList:
+            enemy = pygame.sprite.spritecollideany(bullet, enemies)
+            
+            if enemy is not None:
+                
+                # higher score for better enemies
+                self.score += ARCHETYPES[enemy.choice]["score"]
+                    
+                self.enemiesKilled += 1
+                if self.telemetry is not None:
+                    self.telemetry.emit("enemy_killed", choice=enemy.choice, score=self.score)
+                if self.tracer is not None:
+                    self.tracer.instant("enemy_killed", id=enemy.entityId, choice=enemy.choice)
+                
+                # remove bullet completly
+                self.registry.remove(bullet)
+                
+                # set enemy death sequence; it fires nothing more
+                self.emitter.stop(enemy)
+                enemy.explode = True
+                self.soExplode.play()                    
+                self.particles.emit(enemy.rect.center, 400)
+                self.registry.move(enemy, "dead")
+                self.capExplosions()
+                    
+        # checks if the explosion on the enemy was complete
+        for enemy in self.deadList:
+            
+            if enemy.remove:
+            
+                # completely remove enemy
+                self.registry.remove(enemy)
+                    
+    def capExplosions(self):
+        ''' cuts the oldest explosions short when the quality governor limits them '''
+        
+        maxExplosions = self.governor.maxExplosions
+        if maxExplosions is None:
+            return
+        
+        exploding = [enemy for enemy in self.deadList if enemy.explode]
+        for enemy in exploding[:len(exploding) - maxExplosions]:
+            enemy.endExplosion()
+                    
+    def checkEnemyFire(self):
+        ''' checks if enemy has fired; the pattern depends on the enemy and the difficulty '''
+        
+        step = int(self.difficulty)
+        
+        for enemy in self.enemyList:
+            
+            if enemy.firePause == enemy.fireRate:
+                patterns = ARCHETYPES[enemy.choice]["patterns"]
+                pattern = patterns[min(step, len(patterns) - 1)]
+                self.emitter.fire(pattern, enemy, self.nearestPlayer(enemy))
+        
+        # every firing, new or still going, in one pass
+        self.emitter.update()
+        
+    def nearestPlayer(self, sprite):
+        ''' the live maverick closest to sprite; aimed patterns aim at it '''
+        
+        (x, y) = sprite.rect.center
+        nearest = self.maverick
+        best = None
+        for maverick in self.players:
+            if not maverick.keepSwapping:
+                continue
+            (dx, dy) = (maverick.rect.centerx - x, maverick.rect.centery - y)
+            distance = dx * dx + dy * dy
+            if best is None or distance < best:
+                (nearest, best) = (maverick, distance)
+        return nearest
+        
+    def entityState(self):
+        ''' every live entity as a row of (kind, x, y, w, h), kind indexing KINDS and
+            x, y the top left of its rect; an int32 view of a buffer reused every call
+            needs NumPy
+        '''
+        
+        if numpy is None:
+            raise RuntimeError("Game.entityState needs NumPy")
+        
+        rows = []
+        for (index, kind) in enumerate(self.KINDS):
+            for entity in self.registry.list(kind):
+                rect = entity.rect
+                rows.append((index, rect.left, rect.top, rect.width, rect.height))
+        
+        # grows by doubling; the next call overwrites it
+        if self.entityBuffer is None or len(self.entityBuffer) < len(rows):
+            self.entityBuffer = numpy.zeros((max(64, 2 * len(rows)), 5), numpy.int32)
+        state = self.entityBuffer[:len(rows)]
+        if rows:
+            state[:] = rows
+        return state
+        
+    def checkEvents(self):
+        ''' looks out for some basic events as the game plays out; most disabled when the player loses '''
+        
+        self.pause += 1  
+        self.time += 1      
+        self.globalTime += 1
+
+        if self.tracer is None:
+            self.checkLose()        
+            self.checkTime()
+            self.checkEnemyFire()
+                
+            self.checkOutOfBounds()
+            self.checkDestroy()
+        else:
+            # same checks, each a span on the timeline
+            tracer = self.tracer
+            for check in (self.checkLose, self.checkTime, self.checkEnemyFire, 
+                          self.checkOutOfBounds, self.checkDestroy):
+                start = time.perf_counter()
+                check()
+                tracer.complete(check.__name__, start)
+                
+    def checkLose(self):
+        ''' checks all lose possibilities '''
+        
+        for maverick in self.players:
+        
+            # collide with enemy; only occurs if the user did not die recently (keepSwapping)
+            if maverick.keepSwapping and maverick.invic == False:
+                
+                # enemy or enemy bullet collides with user
+                for kind in ("enemy", "enemyBullet"):
+                    for entity in pygame.sprite.spritecollide(maverick, self.registry.index[kind], False):
+                        
+                        self.registry.remove(entity)
+                        self.lose(maverick)      
+                
+    def checkOutOfBounds(self):
+        ''' checks if enemies or bullets have left the map or user is on an edge'''
+        
+        for entities in (self.enemyList, self.bulletList, self.enemyBulletList):
+            for entity in entities:
+                if entity.outOfBounds():
+                    self.registry.remove(entity)
+                
+        for maverick in self.players:
+            if maverick.x <= 0:
+                maverick.x = 0
+                
+            if maverick.x >= self.size[0] - maverick.rect.width:
+                maverick.x = self.size[0] - maverick.rect.width
+                
+            if maverick.y <= maverick.rect.height:
+                maverick.y = maverick.rect.height
+                
+            if maverick.y >= self.size[1]:
+                maverick.y = self.size[1]
+            
+    def checkTime(self):
+        ''' generates new enemies: as the level script says, or after a random period of time '''
+        
+        if self.level is not None and not self.level.finished:
+            # checkEvents has counted this tick already; ticks count from 0
+            for spawn in self.level.due(self.globalTime - 1):
+                self.generateEnemy(spawn)
+                
+        # no level, or it is over: endless random enemies
+        elif self.time % self.timeDelay == 0:
+            self.time = 0
+            self.generateEnemy()     
+            
+            # function used to determine the time range given the difficulty
+            timeFxn = int( 37 / (self.difficulty + 1) ) 
+            
+            self.timeDelay = self.rng.randrange(timeFxn - 5, timeFxn + 5)
+        
+        # game becomes harder as the global time
+        if (self.globalTime % 250 == 0):
+            self.difficulty += 0.0625
+            
+    def doEvents(self, event):
+        ''' using event defined in scene class '''
+        
+        # proceeds only if the user did not lose a life recently; user movement
+        if self.maverick.keepSwapping:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_w:
+                    self.maverick.setDY(-4)
+                if event.key == pygame.K_s:
+                    self.maverick.setDY(4)
+                if event.key == pygame.K_a:
+                    self.maverick.setDX(-5)
+                if event.key == pygame.K_d:
+                    self.maverick.setDX(5)
+        
+        if event.type == pygame.KEYUP:
+            
+            # fire a bullet
+            if event.key == pygame.K_SPACE:
+                if self.maverick.keepSwapping:
+                    self.fire()  
+                    
+            # exit game session        
+            if event.key == pygame.K_ESCAPE:
+                self.exit = True   
+                
+            # debugging aid; only when rewind is enabled
+            if event.key == pygame.K_BACKSPACE and self.rewind is not None:
+                self.rewindBy(self.fps)
+                    
+            # stop movement                    
+            if event.key == pygame.K_w:
+                self.maverick.setDY(0)
+            if event.key == pygame.K_s:
+                self.maverick.setDY(0)
+            if event.key == pygame.K_a:
+                self.maverick.setDX(0)
+            if event.key == pygame.K_d:
+                self.maverick.setDX(0)                
+                    
+    def steer(self, maverick, buttons, previous=0):
+        ''' held-button version of doEvents for players without a keyboard
+            buttons and previous are masks of INPUT_* flags for this tick and the last one
+        '''
+        
+        (dx, dy) = self.steerVelocity((maverick.dx, maverick.dy), buttons, previous, maverick.keepSwapping)
+        if dx != maverick.dx:
+            maverick.setDX(dx)
+        if dy != maverick.dy:
+            maverick.setDY(dy)
+        
+        # fires on release, like SPACE
+        if previous & ~buttons & INPUT_FIRE and maverick.keepSwapping:
+            self.fire(maverick)
+            
+    @staticmethod
+    def steerVelocity(velocity, buttons, previous=0, canMove=True):
+        ''' the (dx, dy) steer() leaves a maverick moving at, from the (dx, dy) it had
+            canMove is whether the maverick is alive; the network partner predicts with this too
+        '''
+        
+        (dx, dy) = velocity
+        pressed = buttons & ~previous
+        released = previous & ~buttons
+        
+        # same rules as the keyboard: moving needs a live maverick, stopping does not
+        if canMove:
+            if pressed & INPUT_UP:
+                dy = -4
+            if pressed & INPUT_DOWN:
+                dy = 4
+            if pressed & INPUT_LEFT:
+                dx = -5
+            if pressed & INPUT_RIGHT:
+                dx = 5
+            
+        if released & (INPUT_UP | INPUT_DOWN):
+            dy = 0
+        if released & (INPUT_LEFT | INPUT_RIGHT):
+            dx = 0
+        return (dx, dy)
+        
+    def fire(self, maverick=None):
+        ''' fires a projectile from the maverick (the first player by default) '''
+        
+        if maverick is None:
+            maverick = self.maverick
+        
+        x = int(maverick.rect.centerx + 10)
+        y = int(maverick.rect.centery + 10)
+        
+        bullet = Bullet(self, x, y)
+        
+        self.bulletsFired += 1
+        if self.telemetry is not None:
+            self.telemetry.emit("bullet_fired", player=self.players.index(maverick))
+        if self.tracer is not None:
+            self.tracer.instant("bullet_fired", player=self.players.index(maverick))
+        
+        self.registry.add(bullet, "bullet")
+
+    def spawnEnemyBullets(self, xs, ys, dxs, dys):        
+        ''' makes the enemy projectiles the pattern emitter fired this tick '''
+        
+        registry = self.registry
+        for i in range(len(xs)):
+            registry.add(Bullet(self, xs[i], ys[i], True, (dxs[i], dys[i])), "enemyBullet")
+        
+        self.enemyBulletsFired += len(xs)
+        if self.telemetry is not None:
+            self.telemetry.emit("enemy_bullet_fired", count=len(xs))
+        if self.tracer is not None:
+            self.tracer.instant("enemy_bullet_fired", count=len(xs))
+        
+            
+    def generateEnemy(self, spawn=None):
+        ''' generates a new enemy; spawn holds Enemy arguments from a level script ''' 
+        
+        if spawn is None:
+            enemy = Enemy(self)
+        else:
+            enemy = Enemy(self, **spawn)
+        enemy.explodeList = self.explodeList      
+        
+        self.enemiesSpawned += 1
+        if self.telemetry is not None:
+            self.telemetry.emit("enemy_spawned", choice=enemy.choice, y=enemy.y)
+        if self.tracer is not None:
+            self.tracer.instant("enemy_spawned", choice=enemy.choice)
+                    
+        self.registry.add(enemy, "enemy")
+        
+    def loadExplode(self):
+        ''' loads the default explosion set to be used for all objects '''
+        
+        self.explodeList = loadAtlas().getList("explode")
+        
+    def lose(self, maverick=None):
+        ''' makes the user lose a life; lives are shared by all players '''
+        
+        if maverick is None:
+            maverick = self.maverick
+        
+        self.soExplode.play()        
+        self.particles.emit(maverick.rect.center, 1000, (2.0, 9.0), (20, 45))
+        
+        self.lives -= 1
+        self.livesLost += 1
+        self.lScore.text = "Lives: %d  Score: %d" % (self.lives, self.score)  
+        
+        if self.telemetry is not None:
+            self.telemetry.emit("life_lost", player=self.players.index(maverick), 
+                                lives=self.lives, score=self.score)
+        if self.tracer is not None:
+            self.tracer.instant("life_lost", player=self.players.index(maverick))
+        
+        # preps for the maverick explosion
+        maverick.keepSwapping = False
+        maverick.frame = 0
+        maverick.pause = 0     
+        
+        # game over!
+        if self.lives == 0:
+            for player in self.players:
+                player.lostGame = True
+            self.lost = True
+            self.stopMovement()
+            
+            if self.telemetry is not None:
+                self.telemetry.emit("game_over", score=self.score, ticks=self.globalTime)
+               
+    def stopMovement(self):
+        ''' makes all sprites halt and prevents generation of new enemies '''
+        
+        # stops all moving sprites and enemy fire
+        self.emitter.clear()
+        for maverick in self.players:
+            maverick.setSpeed(0)
+        for enemy in self.enemyList:
+            enemy.stop = True
+            
+        for bullet in self.bulletList:
+            bullet.setSpeed(0)
+            
+        for bullet in self.enemyBulletList:
+            bullet.setSpeed(0)
+            
+        # preps for the maverick explosion
+        for maverick in self.players:
+            maverick.keepSwapping = False
+            maverick.frame = 0
+            maverick.pause = 0    
+        
+    def update(self):
+        ''' checks various things; overwrites the inherited scene method '''     
+        
+        if self.lost == False:   
+            # refreshed less often when the quality governor is saving time
+            if self.globalTime % self.governor.hudInterval == 0:
+                self.lScore.text = "Lives: %d  Score: %d" % (self.lives, self.score)  
+            self.checkEvents()
+            self.registry.flush()  # removals made this tick
+            
+            if len(self.registry) > self.peakSprites:
+                self.peakSprites = len(self.registry)
+            
+            if self.rewind is not None:
+                self.rewind.push(self.snapshot())
+        # exit game session
+        elif self.exit:
+            self.stop()            
+            
+    def prepare(self):
+        ''' reports the session as it starts, once the menus have set the difficulty '''
+        
+        gameEngine.Scene.prepare(self)
+        if self.telemetry is not None:
+            self.telemetry.emit("session_start", difficulty=self.difficulty, lives=self.lives)
+        
+    def finish(self):
+        ''' reports the session once the game loop ends '''
+        
+        if self.telemetry is not None:
+            self.telemetry.emit("session_end", score=self.score, ticks=self.globalTime,
+                                livesLost=self.livesLost, enemiesSpawned=self.enemiesSpawned,
+                                enemiesKilled=self.enemiesKilled, bulletsFired=self.bulletsFired,
+                                enemyBulletsFired=self.enemyBulletsFired, peakSprites=self.peakSprites,
+                                frameTimes=self.profiler.stats())
+        
+class MenuScene(gameEngine.Scene):
+    '''
+    what Menu, Settings and About share: a black screen of buttons that
+    sleeps until the user does something (see Scene.idleTimeout), and
+    the assets of the next Game loading in the background meanwhile;
+    the Game waits on them only if it starts before they are done
+    '''
+    
+    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
+    
+        gameEngine.Scene.__init__(self)
+        self.background.fill((0, 0, 0))
+        
+        self.BUTTON_FG = BUTTON_FG
+        self.BUTTON_BG = BUTTON_BG
+        
+        self.prefetched = prefetchGame()
+        self.idleTimeout = MENU_IDLE_TIMEOUT
+        
+        self.generateMenuItems()
+        
+    def generateMenuItems(self):
+        ''' creates the scene's labels and buttons and puts them on the sprite list '''
+        
+class Menu(MenuScene):
+    ''' Menu user interacts with before going ahead '''
+    
+    def __init__(self, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
+    
+        MenuScene.__init__(self, BUTTON_FG, BUTTON_BG)
+        
+        self.startGame = False
+        self.about = False
+        self.settings = False
+        
+        # to be passed to the game
+        self.diff = 0
+            
+    def generateMenuItems(self):
+        ''' creates menu items for user and puts them on the sprite list '''
+        
+        self.title = gameEngine.Label((178, 34, 34), (0, 0, 0))
+        
+        self.title.text = "Maverick"
+        self.title.center = (self.size[0] / 2, 85)
+        self.title.changeFont(35)
+        self.title.size = (200, 30)
+        
+        self.bList = []
+        sButtonText= ["Start", "Settings", "About"]
+        iButtonY = [(self.size[1] / 2) - 30, self.size[1] / 2, (self.size[1] / 2) + 30]
+        
+        ''' generates the menu buttons with everything similar expect text and position '''
+        for i in range(3):
+            button = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
+            button.text = sButtonText[i]
+            y = iButtonY[i]
+            
+            button.center = (self.size[0] / 2, y)
+            self.bList.append(button)
+            
+        # compiles sprite list 
+        self.sprites = [self.title]   
+        
+        for button in self.bList:
+            self.sprites.append(button)
+            
+    def reset(self):
+        self.startGame = False
+        self.about = False
+        
+    def update(self):
+        
+        # start game
+        if self.bList[0].clicked:
+            self.startGame = True
+            self.stop()        
+        elif self.bList[1].clicked:
+            self.settings = True
+            self.stop()
+        elif self.bList[2].clicked:
+            self.about = True
+            self.stop()
+        
+class Settings(MenuScene):
+    ''' Provides some options for the user '''
+        
+    def generateMenuItems(self):
+        
+        self.title = gameEngine.Label((178, 34, 34) , (0, 0, 0))
+        self.title.text = "Settings"
+        self.title.changeFont(35)
+        self.title.size = (200, 60)
+        self.title.center = (self.size[0] / 2, 85)       
+        
+        self.lDiff = gameEngine.Label(self.BUTTON_FG, self.BUTTON_BG)
+        self.lDiff.text = "Difficulty"
+        self.lDiff.center = (self.size[0] / 2, (self.size[1] / 2) - (self.lDiff.size[1] / 2))
+        
+        self.sDiff = gameEngine.Scroller(0, 16, 1, self.BUTTON_FG, self.BUTTON_BG)
+        self.sDiff.center = (self.size[0] / 2, (self.size[1] / 2) + (self.lDiff.size[1] / 2))
+        
+        self.back = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
+        self.back.text = "Back"
+        self.back.center = (self.size[0] / 2, (self.size[1] / 2) + self.sDiff.size[1] + 80)
+        
+        self.sprites = [self.title, self.lDiff, self.sDiff, self.back]
+        
+    def update(self):
+        
+        # the difficulty is done really in 1/16 increments
+        self.diff = self.sDiff.value / 16
+        
+        if self.back.clicked:
+            self.stop()
+            
+
+class About(MenuScene):
+    ''' Tells user about the game'''
+            
+    def generateMenuItems(self):
+        self.title = gameEngine.Label((178, 34, 34), (0, 0, 0))
+        self.title.text = "About"
+        self.title.center = (self.size[0] / 2, 85)
+        self.title.changeFont(35)
+        self.title.size = (200, 60)        
+        
+        self.about = gameEngine.MultiLabel(self.BUTTON_FG, self.BUTTON_BG)
+        self.about.changeFont(15);  
+        self.about.textLines = ["Maverick is a simple side-scroller shooter.",
+                                "Use WASD to move, SPACE to fire, and ESC once dead.", "Your maverick will be invicible shortly after death.", "",
+                                "Author: Jake Zatecky"]
+        self.about.center = (self.size[0] / 2, self.size[1] / 2)
+        self.about.size = (500, 35 * 5)
+        
+        self.back = gameEngine.Button(False, self.BUTTON_FG, self.BUTTON_BG)
+        self.back.text = "Back"
+        self.back.center = (self.size[0] / 2, (self.size[1] / 2) + self.about.size[1] + 40)
+        
+        self.sprites = [self.title, self.about, self.back]
+        
+    def update(self):
+        if self.back.clicked:
+            self.stop()
+        
+def main():
+    pygame.display.set_caption("Maverick")
+    
+    keepGoing= True
+    
+    while keepGoing:
+        game = Game()
+        game.start()
+            
+        if game.exitProgram:
+            keepGoing = False
+
+if __name__ == "__main__":
+    main()
+                
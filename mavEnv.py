@@ -0,0 +1,211 @@
+'''
+Title: mavEnv.py
+Description:
+    Gym-style environments for training and evaluating agents
+    against the mavEngine.
+
+    VectorEnv runs several headless Games in lockstep: step()
+    takes one action per game and returns stacked NumPy
+    observations, rewards and done flags. An action is a mask
+    of the mavEngine INPUT_* flags held that tick, applied with
+    Game.steer, so it moves and fires exactly as the keyboard
+    does through doEvents. Needs NumPy.
+
+    Run on its own it measures steps per second on one core:
+
+    python mavEnv.py [--envs 8] [--steps 3000]
+'''
+
+import os
+
+# headless unless told otherwise; must happen before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, sys, time
+import numpy
+import mavEngine
+
+# every combination of the INPUT_* flags is a valid action
+ACTION_COUNT = 32
+
+# observation layout: the maverick, then the nearest enemies and enemy bullets
+PLAYER_FIELDS = 8  # x, y, dx, dy, alive, invincible, lives, difficulty
+ENEMY_SLOTS = 8  # x, y (relative to the maverick), dy, present
+BULLET_SLOTS = 16  # x, y (relative to the maverick), dx, dy, present
+OBSERVATION_SIZE = PLAYER_FIELDS + ENEMY_SLOTS * 4 + BULLET_SLOTS * 5
+
+
+def observe(game, out):
+    ''' writes the observation of game into out, a float32 array of OBSERVATION_SIZE '''
+
+    (width, height) = game.size
+    maverick = game.maverick
+    (x, y) = maverick.rect.center
+
+    out[:] = 0.0
+    out[0:PLAYER_FIELDS] = (x / width, y / height, maverick.dx / 10.0, maverick.dy / 10.0,
+                            maverick.keepSwapping, maverick.invic, game.lives / 5.0, game.difficulty)
+
+    offset = PLAYER_FIELDS
+    for (kind, slots, fields) in (("enemy", ENEMY_SLOTS, 4), ("enemyBullet", BULLET_SLOTS, 5)):
+        entities = game.registry.list(kind)
+        if entities:
+            # relative position and velocity, nearest first
+            rows = numpy.array([(entity.rect.centerx - x, entity.rect.centery - y, entity.dx, entity.dy)
+                                for entity in entities], numpy.float32)
+            nearest = numpy.argsort(rows[:, 0] ** 2 + rows[:, 1] ** 2)[:slots]
+            rows = rows[nearest]
+            rows[:, 0] /= width
+            rows[:, 1] /= height
+            rows[:, 2:] /= 10.0
+
+            block = out[offset:offset + slots * fields].reshape(slots, fields)
+            if fields == 4:
+                block[:len(rows), 0:2] = rows[:, 0:2]
+                block[:len(rows), 2] = rows[:, 3]  # enemies all fly left alike; dy tells them apart
+            else:
+                block[:len(rows), 0:4] = rows
+            block[:len(rows), fields - 1] = 1.0
+        offset += slots * fields
+
+class VectorEnv(object):
+    '''
+    N headless Games stepped in lockstep
+
+    reset() starts every game over and returns the observations;
+    step(actions) runs one tick of each game and returns
+    (observations, rewards, dones, info):
+        observations: float32 (N, OBSERVATION_SIZE); see observe()
+        rewards: float32 (N,); score gained, less lifePenalty per life lost
+        dones: bool (N,); the game was lost or ran maxSteps ticks
+        info: "score" and "livesLost" this tick, int32 (N,) each,
+              and "truncated", bool (N,), for games cut off by maxSteps
+
+    A game that is done starts over by itself; its row in the
+    observations is then the first of the new episode.
+    '''
+
+    def __init__(self, count=8, seed=0, difficulty=0.0, maxSteps=30 * 60 * 5, lifePenalty=100.0):
+        self.count = count
+        self.maxSteps = maxSteps
+        self.lifePenalty = lifePenalty
+        self.seed = seed
+        self.episodes = 0  # started so far; seeds each new one
+
+        self.games = []
+        for i in range(count):
+            game = mavEngine.Game()
+            game.difficulty = difficulty
+            game.governor.enabled = False  # the same work every tick, whatever the host
+            game.prepare()
+            self.games.append(game)
+
+        # every game starts over from this; restore is much cheaper than a new Game
+        self.initial = self.games[0].snapshot()
+
+        self.buttons = numpy.zeros(count, numpy.int32)  # held last tick, per game
+        self.steps = numpy.zeros(count, numpy.int32)  # this episode, per game
+        self.scores = numpy.zeros(count, numpy.int32)
+        self.lives = numpy.zeros(count, numpy.int32)
+        self.observations = numpy.zeros((count, OBSERVATION_SIZE), numpy.float32)
+
+    def reset(self):
+        ''' starts every game over; returns the observations '''
+
+        for i in range(self.count):
+            self.resetGame(i)
+        return self.observations.copy()
+
+    def resetGame(self, i):
+        ''' starts game i over, with the next seed '''
+
+        game = self.games[i]
+        game.restore(self.initial)
+        game.rng.seed(self.seed + self.episodes)
+        self.episodes += 1
+
+        self.buttons[i] = 0
+        self.steps[i] = 0
+        self.scores[i] = game.score
+        self.lives[i] = game.lives
+        observe(game, self.observations[i])
+
+    def step(self, actions):
+        ''' runs one tick of every game; actions holds one INPUT_* mask per game '''
+
+        actions = numpy.asarray(actions, numpy.int32)
+        if actions.shape != (self.count,):
+            raise ValueError("expected %d actions, got shape %s" % (self.count, actions.shape))
+
+        scores = numpy.zeros(self.count, numpy.int32)
+        livesLost = numpy.zeros(self.count, numpy.int32)
+        dones = numpy.zeros(self.count, bool)
+        truncated = numpy.zeros(self.count, bool)
+
+        for (i, game) in enumerate(self.games):
+            buttons = int(actions[i])
+            game.steer(game.maverick, buttons, int(self.buttons[i]))
+            self.buttons[i] = buttons
+
+            game.step()
+            self.steps[i] += 1
+
+            scores[i] = game.score - self.scores[i]
+            livesLost[i] = self.lives[i] - game.lives
+            self.scores[i] = game.score
+            self.lives[i] = game.lives
+
+            if game.lost:
+                dones[i] = True
+            elif self.steps[i] >= self.maxSteps:
+                dones[i] = truncated[i] = True
+
+            if dones[i]:
+                self.resetGame(i)
+            else:
+                observe(game, self.observations[i])
+
+        rewards = scores - livesLost * numpy.float32(self.lifePenalty)
+        info = {"score": scores, "livesLost": livesLost, "truncated": truncated}
+        return (self.observations.copy(), rewards.astype(numpy.float32), dones, info)
+
+    def close(self):
+        ''' lets the games go '''
+
+        for game in self.games:
+            game.collector.stop()
+        self.games = []
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Steps per second of the vectorized environment.")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=3000, help="lockstep ticks to run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VectorEnv(args.envs, args.seed)
+    env.reset()
+    rng = numpy.random.default_rng(args.seed)
+
+    episodes = 0
+    start = time.process_time()
+    for tick in range(args.steps):
+        # a random agent that holds each choice for a few ticks
+        if tick % 5 == 0:
+            actions = rng.integers(0, ACTION_COUNT, args.envs)
+        (observations, rewards, dones, info) = env.step(actions)
+        episodes += int(dones.sum())
+    elapsed = time.process_time() - start
+    env.close()
+
+    # one process, one core: CPU time is the per-core figure
+    steps = args.steps * args.envs
+    print("envs: %d" % args.envs)
+    print("steps: %d (%d episodes ended)" % (steps, episodes))
+    print("steps per second per core: %.0f" % (steps / elapsed))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
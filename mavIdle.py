@@ -0,0 +1,100 @@
+'''
+Title: mavIdle.py
+Description:
+    Idle check for the menus.
+
+    Shows each menu scene (Menu, Settings, About) for a few
+    seconds with nobody at the controls, once in idle mode 
+    (Scene.idleTimeout, as the game runs them) and once 
+    running every frame at fps, as gameplay does, and 
+    compares the two. Fails (exit status 1) if an idle menu
+    ran more frames than its timeout allows, drew more than
+    its first frame, spent more than --max-work of the 
+    every-frame loop's time in frame work, or used more than
+    --max-cpu of the every-frame loop's CPU.
+
+    python mavIdle.py [--seconds 3] [--max-work 0.25] [--max-cpu 0.75]
+'''
+
+import os
+
+# headless unless told otherwise; must happen before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, sys, time
+import pygame, mavEngine
+
+SCENES = (("menu", mavEngine.Menu), ("settings", mavEngine.Settings), ("about", mavEngine.About))
+
+
+def idle(scene, seconds):
+    '''
+    runs scene's start() for the given seconds of wall time, without input
+    returns (share of one core used, frames run, seconds of frame work)
+    '''
+
+    # the Game's files load on other threads meanwhile; not the menu's own work
+    for future in scene.prefetched:
+        future.result()
+    
+    # a QUIT from a timer ends it, the way closing the window would
+    pygame.event.clear()
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    scene.start()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    return (cpu / wall, scene.profiler.frameCount, scene.profiler.totalTime)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="How little the menus do while nobody touches them.")
+    parser.add_argument("--seconds", type=float, default=3, help="to show each menu, per mode")
+    parser.add_argument("--max-work", type=float, default=0.25,
+                        help="fail if an idle menu's frame work took more than this share of the every-frame loop's")
+    parser.add_argument("--max-cpu", type=float, default=0.75,
+                        help="fail if an idle menu used more than this share of the every-frame loop's CPU")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for (name, sceneClass) in SCENES:
+        scene = sceneClass()
+        (idleCpu, idleFrames, idleWork) = idle(scene, args.seconds)
+        drawn = scene.framesDrawn
+        # the first frame, one per timeout, and the QUIT that ends it
+        maxFrames = int(args.seconds * 1000 / scene.idleTimeout) + 2
+
+        scene = sceneClass()
+        scene.idleTimeout = None
+        (busyCpu, busyFrames, busyWork) = idle(scene, args.seconds)
+
+        print("%-8s idle: %5.2f%% cpu, %4d frames, %d drawn, %6.2f ms work   "
+              "every frame: %5.2f%% cpu, %4d frames, %6.2f ms work" %
+              (name, idleCpu * 100, idleFrames, drawn, idleWork * 1000, 
+               busyCpu * 100, busyFrames, busyWork * 1000))
+
+        if busyFrames <= maxFrames:
+            failures.append("%s ran only %d frames drawing every frame; too short to tell idle apart" %
+                            (name, busyFrames))
+        if idleFrames > maxFrames:
+            failures.append("%s ran %d frames with no input; at most %d expected" % (name, idleFrames, maxFrames))
+        if drawn != 1:
+            failures.append("%s drew %d frames with no input; expected 1" % (name, drawn))
+        if idleWork > busyWork * args.max_work:
+            failures.append("%s idle frame work was %.0f%% of drawing every frame (limit %.0f%%)" %
+                            (name, idleWork / busyWork * 100, args.max_work * 100))
+        if idleCpu > busyCpu * args.max_cpu:
+            failures.append("%s idle used %.0f%% of the CPU of drawing every frame (limit %.0f%%)" %
+                            (name, idleCpu / busyCpu * 100, args.max_cpu * 100))
+
+    for failure in failures:
+        print("FAIL: %s" % failure)
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,654 @@
+'''
+Title: mavNet.py
+Description:
+    Two-player networking for the mavEngine.
+
+    The host runs the one authoritative Game; the partner joins
+    over UDP, sends its held buttons every tick and draws the
+    entity state the host streams back. State packets are
+    delta-compressed against the last state the partner
+    acknowledged, and the partner predicts its own maverick
+    so movement feels immediate despite latency.
+
+    python mavNet.py host [--port 5077]
+    python mavNet.py join HOST [--port 5077]
+    python mavNet.py selftest [--latency 0.1] [--loss 0.1]
+'''
+
+import argparse, asyncio, collections, logging, random, struct, time
+import pygame, gameEngine, mavEngine
+
+log = logging.getLogger("mavNet")
+
+PORT = 5077
+
+MSG_INPUT = 1
+MSG_STATE = 2
+
+# input: type, newest input seq, last state tick received, count, then one byte of buttons
+# per input, newest last; a few old inputs ride along so a lost packet costs nothing
+INPUT_HEADER = struct.Struct("<BIIB")
+INPUT_REDUNDANCY = 8
+
+# state: type, tick, baseline tick (0 = full state), last partner input applied,
+# score, lives, lost, partner x, y, partner can move
+STATE_HEADER = struct.Struct("<BIIIiB?ff?")
+COUNT = struct.Struct("<H")
+
+# entity: id, kind, frame, center x, center y
+ENTITY = struct.Struct("<HBBhh")
+NET_ID = struct.Struct("<H")
+
+# entity kinds
+KIND_HOST = 0
+KIND_PARTNER = 1
+KIND_ENEMY = 2  # frame is the enemy image
+KIND_EXPLOSION = 3  # frame is the explosion image + 1
+KIND_BULLET = 4
+KIND_ENEMY_BULLET = 5
+
+# maverick frames: 0 is the ship, 1-16 the explosion, HIDDEN while flickering or gone
+HIDDEN = 255
+
+# sent states kept by the host, and received ones by the partner, as delta baselines
+HISTORY = 64
+
+
+class Link(object):
+    '''
+    Unreliable link simulation for testing over localhost
+
+    Notes:
+        - every outgoing datagram goes through send()
+        - drops datagrams with probability loss, delays the rest by latency + jitter
+        - counts bytes so bandwidth can be reported
+    '''
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+
+        self.bytesSent = 0
+        self.packetsSent = 0
+        self.packetsDropped = 0
+
+    def send(self, transport, data, address):
+
+        self.bytesSent += len(data)
+        self.packetsSent += 1
+
+        if self.loss and self.rng.random() < self.loss:
+            self.packetsDropped += 1
+            return
+
+        delay = self.latency
+        if self.jitter:
+            delay += self.rng.uniform(0, self.jitter)
+
+        if delay > 0:
+            asyncio.get_event_loop().call_later(delay, self.deliver, transport, data, address)
+        else:
+            transport.sendto(data, address)
+
+    def deliver(self, transport, data, address):
+        if not transport.is_closing():
+            transport.sendto(data, address)
+
+
+class Endpoint(asyncio.DatagramProtocol):
+    ''' hands datagrams to the owner's received(data, address) '''
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, address):
+        try:
+            self.owner.received(data, address)
+        except (struct.error, IndexError, KeyError):
+            log.warning("dropped malformed packet from %s", address)
+
+
+def entityTable(game):
+    ''' net id -> packed entity record for everything visible in the game '''
+
+    table = {}
+
+    for sprite in game.registry.group:
+
+        if getattr(sprite, "dying", False):
+            continue
+
+        if isinstance(sprite, mavEngine.Maverick):
+            kind = KIND_HOST if sprite is game.maverick else KIND_PARTNER
+            if sprite.image.get_width() == 0:
+                frame = HIDDEN
+            elif sprite.keepSwapping == False and sprite.frame > 0:
+                frame = min(sprite.frame, len(game.explodeList))
+            else:
+                frame = 0
+        elif isinstance(sprite, mavEngine.Enemy):
+            if sprite.remove:
+                continue
+            elif sprite.explode and sprite.frame > 0:
+                kind = KIND_EXPLOSION
+                frame = min(sprite.frame, len(game.explodeList))
+            else:
+                kind = KIND_ENEMY
+                frame = mavEngine.ARCHETYPES[sprite.choice]["image"]
+        elif isinstance(sprite, mavEngine.Bullet):
+            if sprite.kind == "enemyBullet":
+                kind = KIND_ENEMY_BULLET
+            else:
+                kind = KIND_BULLET
+            frame = 0
+        else:
+            continue  # HUD and the like are drawn by each side
+
+        # registry ids; wraps after 65535, long after old ids are gone
+        netId = sprite.entityId % 65536
+
+        (x, y) = sprite.rect.center
+        x = max(-32768, min(32767, x))
+        y = max(-32768, min(32767, y))
+        table[netId] = ENTITY.pack(netId, kind, frame, x, y)
+
+    return table
+
+
+class Host(object):
+    '''
+    Authoritative side of a two-player game
+
+    Notes:
+        - owns the Game; the partner is an extra maverick steered by received input
+        - call beforeTick() before and afterTick() after each simulation step
+        - reports bytes per tick and simulation step time
+    '''
+
+    def __init__(self, game, port=PORT, link=None):
+
+        self.game = game
+        self.port = port
+        self.link = link or Link()
+
+        self.partner = game.addPlayer()
+        self.partnerAddress = None
+        self.transport = None
+
+        self.inputs = collections.deque()  # (seq, buttons) not yet applied
+        self.lastSeq = 0  # newest partner input applied
+        self.buttons = 0  # partner buttons held now
+        self.ackTick = 0  # newest state the partner has
+
+        self.tick = 0
+        self.sent = collections.OrderedDict()  # tick -> entity table
+
+        self.stepStart = 0.0
+        self.stepTimes = collections.deque(maxlen=90)
+        self.tickBytes = collections.deque(maxlen=90)
+        self.lastReport = time.perf_counter()
+
+    async def open(self):
+        loop = asyncio.get_event_loop()
+        (self.transport, protocol) = await loop.create_datagram_endpoint(
+            lambda: Endpoint(self), local_addr=("0.0.0.0", self.port))
+
+        # port 0 asks the system for any free port
+        self.port = self.transport.get_extra_info("sockname")[1]
+        log.info("hosting on port %d", self.port)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    def received(self, data, address):
+
+        if data[0] != MSG_INPUT:
+            return
+
+        # first partner to speak takes the seat
+        if self.partnerAddress is None:
+            self.partnerAddress = address
+            log.info("partner joined from %s:%d", address[0], address[1])
+        elif address != self.partnerAddress:
+            return
+
+        (kind, seq, ackTick, count) = INPUT_HEADER.unpack_from(data)
+        buttons = data[INPUT_HEADER.size:INPUT_HEADER.size + count]
+
+        if ackTick > self.ackTick and ackTick in self.sent:
+            self.ackTick = ackTick
+
+        # queue only the inputs not seen yet, oldest first
+        queuedSeq = self.inputs[-1][0] if self.inputs else self.lastSeq
+        first = seq - len(buttons) + 1
+        for i in range(len(buttons)):
+            if first + i > queuedSeq:
+                self.inputs.append((first + i, buttons[i]))
+
+    def beforeTick(self):
+        ''' applies the partner input due this tick '''
+
+        self.stepStart = time.perf_counter()
+
+        # one input per tick; a backlog (after a stall) is worked off two at a time
+        due = 1
+        if len(self.inputs) > 4:
+            due = 2
+
+        while self.inputs and due:
+            (seq, buttons) = self.inputs.popleft()
+            self.game.steer(self.partner, buttons, self.buttons)
+            self.buttons = buttons
+            self.lastSeq = seq
+            due -= 1
+
+    def afterTick(self):
+        ''' streams the new state to the partner '''
+
+        self.stepTimes.append(time.perf_counter() - self.stepStart)
+        self.tick += 1
+
+        table = entityTable(self.game)
+        self.sent[self.tick] = table
+        while len(self.sent) > HISTORY:
+            self.sent.popitem(last=False)
+
+        if self.partnerAddress is not None:
+            packet = self.encode(table)
+            self.link.send(self.transport, packet, self.partnerAddress)
+            self.tickBytes.append(len(packet))
+
+        self.report()
+
+    def encode(self, table):
+        ''' state packet holding only what changed since the acknowledged state '''
+
+        baseline = self.sent.get(self.ackTick)
+        baseTick = self.ackTick
+        if baseline is None:
+            baseline = {}
+            baseTick = 0
+
+        changed = [record for (netId, record) in table.items() if baseline.get(netId) != record]
+        removed = [netId for netId in baseline if netId not in table]
+
+        partner = self.partner
+        parts = [STATE_HEADER.pack(MSG_STATE, self.tick, baseTick, self.lastSeq,
+                                   self.game.score, max(self.game.lives, 0), self.game.lost,
+                                   partner.x, partner.y, partner.keepSwapping),
+                 COUNT.pack(len(changed))]
+        parts.extend(changed)
+        parts.append(COUNT.pack(len(removed)))
+        parts.extend(NET_ID.pack(netId) for netId in removed)
+        return b"".join(parts)
+
+    def report(self):
+        ''' logs bandwidth and step time about once a second '''
+
+        now = time.perf_counter()
+        if now - self.lastReport < 1.0:
+            return
+        self.lastReport = now
+        log.info("tick %d: %s", self.tick, self.stats())
+
+    def stats(self):
+        ''' recent averages; bytes per state packet and milliseconds per step '''
+
+        bytesPerTick = 0.0
+        if self.tickBytes:
+            bytesPerTick = sum(self.tickBytes) / len(self.tickBytes)
+        stepMs = 0.0
+        if self.stepTimes:
+            stepMs = sum(self.stepTimes) * 1000 / len(self.stepTimes)
+        return {"bytesPerTick": bytesPerTick, "stepMs": stepMs,
+                "entities": len(self.sent.get(self.tick, ())),
+                "dropped": self.link.packetsDropped}
+
+
+class HostGame(mavEngine.Game):
+    ''' the Game as played on the host, with the partner's maverick in it '''
+
+    def __init__(self, port=PORT, link=None, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
+        mavEngine.Game.__init__(self, BUTTON_FG, BUTTON_BG)
+        self.host = Host(self, port, link)
+        self.stepped = False
+
+    def update(self):
+        # the last frame's sprite updates are done; stream that state first
+        if self.stepped:
+            self.host.afterTick()
+        self.stepped = True
+
+        self.host.beforeTick()
+        mavEngine.Game.update(self)
+
+
+class Client(object):
+    '''
+    Partner side of a two-player game
+
+    Notes:
+        - sendInput() once per tick with the held INPUT_* buttons
+        - entities holds the latest entity state, net id -> (kind, frame, x, y)
+        - predicted is where the partner's own maverick is drawn: the host's
+          position plus the inputs the host has not applied yet
+    '''
+
+    def __init__(self, address, size=(640, 480), link=None):
+
+        self.address = address
+        self.size = size
+        self.link = link or Link()
+        self.transport = None
+
+        self.seq = 0
+        self.pending = collections.deque()  # (seq, buttons) not yet applied by the host
+        self.history = collections.deque(maxlen=INPUT_REDUNDANCY)
+
+        self.tables = collections.OrderedDict()  # tick -> entity table
+        self.tick = 0
+        self.entities = {}
+
+        self.score = 0
+        self.lives = 0
+        self.lost = False
+
+        self.predicted = None  # (x, y) of the own maverick, None until the first state
+        self.velocity = (0, 0)  # its (dx, dy) as predicted
+        self.buttons = 0  # sent last
+        self.applied = ((0, 0), 0)  # (dx, dy) and buttons as of the last input the host applied
+        self.maverickSize = mavEngine.loadAtlas().get("maverick").get_size()
+        self.canMove = True
+        self.predictionError = 0.0  # distance corrected at the last state
+
+    async def open(self):
+        loop = asyncio.get_event_loop()
+        (self.transport, protocol) = await loop.create_datagram_endpoint(
+            lambda: Endpoint(self), remote_addr=self.address)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    def sendInput(self, buttons):
+        ''' sends this tick's buttons and predicts their effect locally '''
+
+        self.seq += 1
+        self.pending.append((self.seq, buttons))
+        self.history.append(buttons)
+
+        packet = INPUT_HEADER.pack(MSG_INPUT, self.seq, self.tick, len(self.history)) + bytes(self.history)
+        self.link.send(self.transport, packet, None)
+
+        if self.predicted is not None:
+            (self.predicted, self.velocity) = self.move(self.predicted, self.velocity, buttons, self.buttons)
+        self.buttons = buttons
+
+    def move(self, position, velocity, buttons, previous):
+        ''' one tick of maverick movement: Game.steer's velocity, then checkOutOfBounds' clamping
+            returns the new position and velocity
+        '''
+
+        velocity = mavEngine.Game.steerVelocity(velocity, buttons, previous, self.canMove)
+        if not self.canMove:
+            return (position, velocity)
+
+        (x, y) = position
+        x += velocity[0]
+        y += velocity[1]
+
+        # the edges match the host's clamping
+        (width, height) = self.maverickSize
+        x = max(0, min(x, self.size[0] - width))
+        y = max(height, min(y, self.size[1]))
+        return ((x, y), velocity)
+
+    def received(self, data, address):
+
+        if data[0] != MSG_STATE:
+            return
+
+        (kind, tick, baseTick, lastSeq, score, lives, lost,
+         x, y, canMove) = STATE_HEADER.unpack_from(data)
+
+        # late duplicate or reordered packet
+        if tick <= self.tick:
+            return
+
+        if baseTick:
+            baseline = self.tables.get(baseTick)
+            if baseline is None:
+                return  # baseline long gone; a later packet will do
+            table = dict(baseline)
+        else:
+            table = {}
+
+        offset = STATE_HEADER.size
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        for i in range(count):
+            record = ENTITY.unpack_from(data, offset)
+            offset += ENTITY.size
+            table[record[0]] = record[1:]
+
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        for i in range(count):
+            (netId,) = NET_ID.unpack_from(data, offset)
+            offset += NET_ID.size
+            table.pop(netId, None)
+
+        self.tables[tick] = table
+        while len(self.tables) > HISTORY:
+            self.tables.popitem(last=False)
+
+        self.tick = tick
+        self.entities = table
+        (self.score, self.lives, self.lost, self.canMove) = (score, lives, lost, canMove)
+
+        self.reconcile((x, y), lastSeq)
+
+    def reconcile(self, position, lastSeq):
+        ''' starts from the host's position and replays what it has not seen yet '''
+
+        # the host's velocity follows from the inputs it applied, as the position does not
+        (velocity, previous) = self.applied
+        while self.pending and self.pending[0][0] <= lastSeq:
+            (seq, buttons) = self.pending.popleft()
+            velocity = mavEngine.Game.steerVelocity(velocity, buttons, previous, self.canMove)
+            previous = buttons
+        self.applied = (velocity, previous)
+
+        predicted = position
+        for (seq, buttons) in self.pending:
+            (predicted, velocity) = self.move(predicted, velocity, buttons, previous)
+            previous = buttons
+
+        if self.predicted is not None:
+            self.predictionError = ((predicted[0] - self.predicted[0]) ** 2 +
+                                    (predicted[1] - self.predicted[1]) ** 2) ** 0.5
+        self.predicted = predicted
+        self.velocity = velocity
+
+
+class ClientScene(gameEngine.Scene):
+    ''' what the partner sees: the streamed entities, and its own maverick where prediction puts it '''
+
+    def __init__(self, address, link=None, BUTTON_FG=(0,200,0), BUTTON_BG=(201,201,201)):
+
+        gameEngine.Scene.__init__(self)
+        self.background.fill((0, 0, 0))
+
+        self.client = Client(address, self.size, link)
+
+        atlas = mavEngine.loadAtlas()
+        self.enemyImages = atlas.getList("enemy")
+        self.explodeImages = atlas.getList("explode")
+        self.maverickImage = atlas.get("maverick")
+        self.bulletImages = {KIND_BULLET: atlas.get("bullet"), KIND_ENEMY_BULLET: atlas.get("enemyBullet")}
+
+        self.lScore = gameEngine.Label(BUTTON_FG, BUTTON_BG)
+        self.lScore.size = (250, 40)
+        self.lScore.center = (self.size[0] / 2, self.size[1] - 15)
+        self.sprites = [self.lScore]
+
+    def update(self):
+
+        keys = pygame.key.get_pressed()
+        buttons = 0
+        if keys[pygame.K_w]:
+            buttons |= mavEngine.INPUT_UP
+        if keys[pygame.K_s]:
+            buttons |= mavEngine.INPUT_DOWN
+        if keys[pygame.K_a]:
+            buttons |= mavEngine.INPUT_LEFT
+        if keys[pygame.K_d]:
+            buttons |= mavEngine.INPUT_RIGHT
+        if keys[pygame.K_SPACE]:
+            buttons |= mavEngine.INPUT_FIRE
+        if keys[pygame.K_ESCAPE] and self.client.lost:
+            self.stop()
+
+        self.client.sendInput(buttons)
+        self.draw()
+
+        self.lScore.text = "Lives: %d  Score: %d" % (self.client.lives, self.client.score)
+
+    def draw(self):
+        ''' redraws the whole playfield from the entity table '''
+
+        self.screen.blit(self.background, (0, 0))
+
+        for (kind, frame, x, y) in self.client.entities.values():
+
+            if kind == KIND_HOST or kind == KIND_PARTNER:
+                if frame == HIDDEN:
+                    continue
+                elif frame:
+                    image = self.explodeImages[frame - 1]
+                else:
+                    image = self.maverickImage
+
+                # own maverick, where prediction says it is; positions are left/bottom
+                if kind == KIND_PARTNER and frame == 0 and self.client.predicted is not None:
+                    rect = image.get_rect()
+                    (rect.left, rect.bottom) = self.client.predicted
+                    self.screen.blit(image, rect)
+                    continue
+            elif kind == KIND_ENEMY:
+                image = self.enemyImages[frame]
+            elif kind == KIND_EXPLOSION:
+                image = self.explodeImages[frame - 1]
+            else:
+                image = self.bulletImages[kind]
+
+            rect = image.get_rect()
+            rect.center = (x, y)
+            self.screen.blit(image, rect)
+
+
+async def host(port):
+    game = HostGame(port)
+    await game.host.open()
+    try:
+        await game.startAsync()
+    finally:
+        game.host.close()
+
+async def join(address):
+    scene = ClientScene(address)
+    await scene.client.open()
+    try:
+        await scene.startAsync()
+    finally:
+        scene.client.close()
+
+async def selftest(seconds, latency, jitter, loss):
+    '''
+    runs a headless host and a bot partner over localhost with a lossy link
+    returns the host stats and the worst prediction error seen
+    '''
+
+    game = mavEngine.Game()
+    game.rng.seed(1)
+    host = Host(game, 0, Link(latency, jitter, loss, seed=2))
+    await host.open()
+
+    client = Client(("127.0.0.1", host.port), game.size, Link(latency, jitter, loss, seed=3))
+    await client.open()
+
+    game.prepare()
+    bot = random.Random(4)
+    buttons = 0
+    worstError = 0.0
+    frameTime = 1.0 / game.fps
+
+    try:
+        for tick in range(int(seconds * game.fps)):
+            start = time.perf_counter()
+
+            # a bot that wanders and fires
+            if tick % 10 == 0:
+                buttons = bot.choice([0, mavEngine.INPUT_UP, mavEngine.INPUT_DOWN,
+                                      mavEngine.INPUT_LEFT, mavEngine.INPUT_RIGHT])
+                buttons |= bot.choice([0, mavEngine.INPUT_FIRE])
+            client.sendInput(buttons)
+
+            host.beforeTick()
+            game.step()
+            host.afterTick()
+
+            worstError = max(worstError, client.predictionError)
+            await asyncio.sleep(max(0.0, frameTime - (time.perf_counter() - start)))
+
+        # let delayed packets land
+        await asyncio.sleep(latency + jitter + 0.05)
+    finally:
+        game.collector.stop()
+        client.close()
+        host.close()
+
+    stats = host.stats()
+    stats["clientTick"] = client.tick
+    stats["hostTick"] = host.tick
+    stats["worstPredictionError"] = worstError
+    stats["clientEntities"] = len(client.entities)
+    stats["hostEntities"] = len(entityTable(game))
+    return stats
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Two-player Maverick over UDP.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    hostParser = sub.add_parser("host", help="run the game and wait for a partner")
+    hostParser.add_argument("--port", type=int, default=PORT)
+
+    joinParser = sub.add_parser("join", help="join a host as the partner")
+    joinParser.add_argument("address")
+    joinParser.add_argument("--port", type=int, default=PORT)
+
+    testParser = sub.add_parser("selftest", help="headless host and bot partner over localhost")
+    testParser.add_argument("--seconds", type=float, default=5)
+    testParser.add_argument("--latency", type=float, default=0.05, help="one-way delay in seconds")
+    testParser.add_argument("--jitter", type=float, default=0.02)
+    testParser.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    pygame.display.set_caption("Maverick")
+
+    if args.mode == "host":
+        asyncio.run(host(args.port))
+    elif args.mode == "join":
+        asyncio.run(join((args.address, args.port)))
+    else:
+        stats = asyncio.run(selftest(args.seconds, args.latency, args.jitter, args.loss))
+        for key in sorted(stats):
+            print("%s: %s" % (key, stats[key]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+'''
+Title: mavSoak.py
+Description:
+    Soak test for the mavEngine.
+
+    Runs one headless Game for a long time with a bot at the
+    controls and an EntityAuditor watching it, then fails
+    (exit status 1) if entity counts kept growing, traced
+    memory grew past a limit, or frame times drifted.
+    A second, short run leaks one object every few samples on
+    purpose, and fails the soak if the auditor misses it.
+    With --max-allocations an AllocationTracker watches the
+    last frames too, and the run fails if they left more new
+    blocks per frame than that.
+
+    python mavSoak.py [--minutes 10] [--memory-growth 1.0] [--drift 0.5]
+                      [--max-allocations N] [--allocation-frames 60]
+'''
+
+import os
+
+# headless unless told otherwise; must happen before pygame starts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, logging, random, sys, tracemalloc
+import gameEngine, mavEngine
+
+log = logging.getLogger("mavSoak")
+
+WATCHED = ("enemyList", "bulletList", "enemyBulletList", "deadList")
+
+# the leak run: one object more every LEAK_EVERY ticks, flat in between, for LEAK_TICKS
+LEAK_EVERY = 90
+LEAK_TICKS = 900
+
+
+def soak(ticks, seed=1, warmup=300, interval=30, tracker=None, trackFrames=60, leakEvery=None):
+    '''
+    runs the game for the given number of ticks as fast as it will go
+    tracker, an AllocationTracker, watches trackFrames more ticks after them
+    leakEvery, in ticks, puts an object in game.leaked that often, watched as "leaked"
+    returns (auditor, traced memory after warmup, at the end,
+             mean frame ms early on, mean frame ms at the end)
+    '''
+
+    game = mavEngine.Game()
+    game.rng.seed(seed)
+    game.lives = 10 ** 6  # the bot dies; the session should not end
+    game.governor.enabled = False  # keep the workload constant
+    watched = WATCHED
+    if leakEvery is not None:
+        game.leaked = []
+        watched += ("leaked",)
+    game.auditor = gameEngine.EntityAuditor(game, watched, interval)
+    game.prepare()
+
+    bot = random.Random(seed)
+    buttons = previous = 0
+
+    # frame time averages over a tenth of the run, after warmup
+    span = max(1, (ticks - warmup) // 10)
+    early = late = 0.0
+    startMemory = 0
+
+    if tracker is None:
+        trackFrames = 0
+
+    for tick in range(ticks + trackFrames):
+
+        # a bot that wanders and keeps firing
+        if tick % 10 == 0:
+            buttons = bot.choice([0, mavEngine.INPUT_UP, mavEngine.INPUT_DOWN,
+                                  mavEngine.INPUT_LEFT, mavEngine.INPUT_RIGHT])
+        buttons ^= mavEngine.INPUT_FIRE
+        game.steer(game.maverick, buttons, previous)
+        previous = buttons
+
+        if leakEvery is not None and tick % leakEvery == 0:
+            game.leaked.append(object())
+
+        if tick == ticks:
+            # slow frames from here; kept out of the numbers above
+            endMemory = tracemalloc.get_traced_memory()[0]
+            tracker.attach(game.profiler)
+
+        game.step()
+        if tick >= ticks:
+            continue
+
+        frameTime = game.profiler.frameTimes[-1]
+        if tick == warmup:
+            startMemory = tracemalloc.get_traced_memory()[0]
+        if warmup <= tick < warmup + span:
+            early += frameTime / span
+        elif tick >= ticks - span:
+            late += frameTime / span
+
+        if tick % (game.fps * 60) == 0 and tick:
+            log.info("%d min: %s", tick // (game.fps * 60), game.auditor.counts)
+
+    game.collector.stop()
+    if tracker is not None:
+        tracker.detach()
+    else:
+        endMemory = tracemalloc.get_traced_memory()[0]
+    return (game.auditor, startMemory, endMemory, early * 1000, late * 1000)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Long headless run that fails on leaks or drift.")
+    parser.add_argument("--minutes", type=float, default=10, help="game time to simulate, at 30 ticks a second")
+    parser.add_argument("--memory-growth", type=float, default=1.0,
+                        help="traced memory allowed to grow after warmup, in MB")
+    parser.add_argument("--drift", type=float, default=0.5,
+                        help="allowed rise of the mean frame time, as a fraction of the early mean")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-allocations", type=int, default=None,
+                        help="new blocks each of the last frames may leave allocated (default: not checked)")
+    parser.add_argument("--allocation-frames", type=int, default=60,
+                        help="frames at the end the allocation check watches")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+
+    tracker = None
+    if args.max_allocations is not None:
+        tracker = gameEngine.AllocationTracker()
+
+    tracemalloc.start()
+    ticks = int(args.minutes * 60 * 30)
+    (auditor, startMemory, endMemory, early, late) = soak(ticks, args.seed, tracker=tracker,
+                                                           trackFrames=args.allocation_frames)
+    tracemalloc.stop()
+
+    # a leak in steps, which the auditor has to catch
+    (leakAuditor, leakStart, leakEnd, leakEarly, leakLate) = soak(LEAK_TICKS, args.seed, leakEvery=LEAK_EVERY)
+
+    growth = (endMemory - startMemory) / (1024.0 * 1024.0)
+    failures = []
+
+    if auditor.flagged:
+        failures.append("unbounded growth: %s" % ", ".join(sorted(auditor.flagged)))
+    if "leaked.object" not in leakAuditor.flagged:
+        failures.append("a leak of one object every %d ticks went unflagged" % LEAK_EVERY)
+    if growth > args.memory_growth:
+        failures.append("traced memory grew %.2f MB (limit %.2f MB)" % (growth, args.memory_growth))
+    # sub-millisecond frames are noisy; drift only counts past half a millisecond
+    if late > early * (1 + args.drift) and late - early > 0.5:
+        failures.append("frame time drifted from %.2f ms to %.2f ms" % (early, late))
+    if tracker is not None:
+        try:
+            tracker.check(args.max_allocations)
+        except AssertionError as error:
+            failures.append("allocations: %s" % error)
+
+    print("ticks: %d" % ticks)
+    print("memory growth: %.2f MB" % growth)
+    print("frame time: %.2f ms -> %.2f ms" % (early, late))
+    print("counts: %s" % auditor.counts)
+    print("leak run flagged: %s" % ", ".join(sorted(leakAuditor.flagged)))
+    print("memory by phase: %s" % auditor.phaseMemory)
+    profiler = auditor.scene.profiler
+    print("gc: %d pauses, %.2f ms total, worst %.2f ms" % 
+          (profiler.gcCount, profiler.gcTime * 1000, profiler.gcWorst * 1000))
+    if tracker is not None:
+        print("allocations: %.1f new blocks per frame" % tracker.perFrame())
+        for (phase, site, blocks, size) in tracker.top(5):
+            print("  %-8s %-24s %6.1f blocks %8.0f bytes per frame" % 
+                  (phase, site, blocks / float(tracker.frames), size / float(tracker.frames)))
+
+    for failure in failures:
+        print("FAIL: %s" % failure)
+    if not failures:
+        print("OK")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
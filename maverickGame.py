@@ -1,59 +1,123 @@
-'''
-Title: maverickGame.py
-Author: Jake Zatecky
-Description:
-    Implementation of the mavEngine.
-'''
-
-import pygame, mavEngine
-
-def main():
-    BUTTON_FG = (205, 133, 63)
-    BUTTON_BG = (0, 0, 0)
-
-    mavIcon = pygame.image.load("mavIcon.gif")
-    transColor = mavIcon.get_at((34, 0))  # non-alpha transparency
-    mavIcon.set_colorkey(transColor)
-
-    pygame.display.set_icon(mavIcon)  # attempt to change game icon
-    pygame.display.set_caption("Maverick")
-
-    keepGoing = True
-
-    diff = 0.0
-
-    while keepGoing:
-        menu = mavEngine.Menu(BUTTON_FG, BUTTON_BG)
-        menu.start()
-
-        if menu.startGame:
-            game = mavEngine.Game(BUTTON_FG, BUTTON_BG)
-            game.difficulty = diff
-            game.start()
-            menu.startGame = False
-
-            if game.exitProgram:
-                keepGoing = False
-
-        elif menu.about:
-            about = mavEngine.About(BUTTON_FG, BUTTON_BG)
-            about.start()
-
-            if about.exitProgram:
-                keepGoing = False
-
-        elif menu.settings:
-            settings = mavEngine.Settings(BUTTON_FG, BUTTON_BG)
-            settings.sDiff.value = (diff * 16)  # sets default difficulty value; have to convert back for user
-            settings.start()
-
-            diff = settings.diff
-
-            if settings.exitProgram:
-                keepGoing = False
-
-        else:
-            keepGoing = False
-
-if __name__ == "__main__":
-    main()
+'''
+Title: maverickGame.py
+Author: Jake Zatecky
+Description:
+    Implementation of the mavEngine.
+'''
+
+import argparse, logging
+import pygame, gameEngine, mavEngine
+
+def parseSize(text):
+    ''' parses WIDTHxHEIGHT, e.g. 640x480 '''
+    try:
+        (width, height) = text.lower().split("x")
+        return (int(width), int(height))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected WIDTHxHEIGHT, got %r" % text)
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Maverick, a simple side-scroller shooter.")
+    parser.add_argument("--resolution", type=parseSize, default=gameEngine.Scene.resolution,
+                        help="internal resolution the game renders at (default 640x480)")
+    parser.add_argument("--window", type=parseSize, default=None,
+                        help="window size; by default the framebuffer is scaled to fit the screen")
+    parser.add_argument("--fullscreen", action="store_true")
+    parser.add_argument("--no-vsync", dest="vsync", action="store_false")
+    parser.add_argument("--threaded", action="store_true",
+                        help="simulate on a worker thread while the main thread draws")
+    parser.add_argument("--level", metavar="PATH",
+                        help="spawn enemies from a level script, e.g. level1.jsonl, instead of at random")
+    parser.add_argument("--rewind", action="store_true",
+                        help="keep recent game states; BACKSPACE rewinds one second")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record gameplay: a directory of PNGs, or a raw stream file with --record-format raw")
+    parser.add_argument("--record-format", choices=("png", "raw"), default="png")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="write session events as JSON lines to PATH (rotated as it grows)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record a frame timeline and write it to PATH on exit (Chrome trace JSON)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log engine messages such as quality changes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    BUTTON_FG = (205, 133, 63)
+    BUTTON_BG = (0, 0, 0)
+
+    args = parseArgs(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+
+    # display settings shared by every scene
+    gameEngine.Scene.resolution = args.resolution
+    gameEngine.Scene.windowSize = args.window
+    gameEngine.Scene.fullscreen = args.fullscreen
+    gameEngine.Scene.vsync = args.vsync
+    gameEngine.Scene.threaded = args.threaded
+    if args.record:
+        gameEngine.Scene.recorder = gameEngine.FrameRecorder(args.record, args.record_format)
+    if args.telemetry:
+        gameEngine.Scene.telemetry = gameEngine.Telemetry(args.telemetry)
+    if args.trace:
+        gameEngine.Scene.tracer = gameEngine.Tracer()
+
+    # before the first scene opens the window
+    mavIcon = pygame.image.load("mavIcon.gif")
+    transColor = mavIcon.get_at((34, 0))  # non-alpha transparency
+    mavIcon.set_colorkey(transColor)
+
+    pygame.display.set_icon(mavIcon)  # attempt to change game icon
+    pygame.display.set_caption("Maverick")
+
+    keepGoing = True
+
+    diff = 0.0
+
+    while keepGoing:
+        menu = mavEngine.Menu(BUTTON_FG, BUTTON_BG)
+        menu.start()
+
+        if menu.startGame:
+            game = mavEngine.Game(BUTTON_FG, BUTTON_BG)
+            game.difficulty = diff
+            if args.level:
+                game.loadLevel(args.level)
+            if args.rewind:
+                game.enableRewind()
+            game.start()
+            menu.startGame = False
+
+            if game.exitProgram:
+                keepGoing = False
+
+        elif menu.about:
+            about = mavEngine.About(BUTTON_FG, BUTTON_BG)
+            about.start()
+
+            if about.exitProgram:
+                keepGoing = False
+
+        elif menu.settings:
+            settings = mavEngine.Settings(BUTTON_FG, BUTTON_BG)
+            settings.sDiff.value = (diff * 16)  # sets default difficulty value; have to convert back for user
+            settings.start()
+
+            diff = settings.diff
+
+            if settings.exitProgram:
+                keepGoing = False
+
+        else:
+            keepGoing = False
+
+    if gameEngine.Scene.recorder is not None:
+        gameEngine.Scene.recorder.close()
+    if gameEngine.Scene.telemetry is not None:
+        gameEngine.Scene.telemetry.close()
+    if gameEngine.Scene.tracer is not None:
+        gameEngine.Scene.tracer.dump(args.trace)
+
+if __name__ == "__main__":
+    main()